@@ -0,0 +1,130 @@
+"""
+Compare homework allocation: legacy min/main passes of Distribution vs the
+apportionment allocator.
+
+    python -m benchmarks.allocator --homeworks 100000 --reviewers 200
+"""
+
+import argparse
+import logging
+import random
+import time
+from datetime import datetime
+
+from lms.generals.models.distribution import DistributionParams
+from lms.utils.distribution.models import (
+    Distribution,
+    DistributionReviewer,
+    StudentHomework,
+)
+from lms.utils.distribution.simulation import (
+    synthetic_homeworks,
+    synthetic_reviewers,
+)
+
+log = logging.getLogger(__name__)
+
+
+def make_distribution(
+    homeworks: list[StudentHomework],
+    reviewers: list[DistributionReviewer],
+    seed: int,
+) -> Distribution:
+    return Distribution(
+        created_at=datetime.now(),
+        params=DistributionParams(name="bench", product_ids=[1], homeworks=[]),
+        homeworks=[],
+        reviewers=[r.copy() for r in reviewers],
+        filtered_homeworks=list(homeworks),
+        error_homeworks=[],
+        seed=seed,
+    )
+
+
+def legacy_distribute(distribution: Distribution) -> None:  # noqa: C901
+    homeworks = distribution.filtered_homeworks
+    reviewers = distribution.reviewers
+    for r in reviewers:
+        for _ in range(r.min_ - len(r.student_homeworks)):
+            if not homeworks:
+                break
+            r.student_homeworks.append(homeworks.pop())
+
+    homeworks_count = len(homeworks)
+    total_desired = sum(r.optimal_desired for r in reviewers)
+    total_max = sum(r.optimal_max for r in reviewers)
+    for r in reviewers:
+        if homeworks_count <= total_desired:
+            r.percent = r.optimal_desired / total_desired
+        else:
+            r.percent = r.optimal_max / total_max
+    if homeworks_count < total_desired or homeworks_count < total_max:
+        actual = 0
+        for r in reviewers:
+            r.actual = int(r.percent * homeworks_count)
+            actual += r.actual
+        r_ind = 0
+        for _ in range(homeworks_count - actual):
+            while reviewers[r_ind].actual >= reviewers[r_ind].optimal_desired:
+                r_ind = (r_ind + 1) % len(reviewers)
+            reviewers[r_ind].actual += 1
+    else:
+        for r in reviewers:
+            r.actual = r.optimal_max
+
+    total_actual = sum(r.actual for r in reviewers)
+    hws = homeworks[:total_actual]
+    count = 5
+    while len(hws) and count > 0:
+        k = 0
+        while k < len(hws):
+            hw = hws.pop()
+            for r in reviewers:
+                if r.actual > len(r.student_homeworks):
+                    r.student_homeworks.append(hw)
+                    hw = None  # type: ignore[assignment]
+                    break
+            if hw is not None:
+                hws.insert(0, hw)
+                k += 1
+        count -= 1
+    homeworks.clear()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--homeworks", type=int, default=100_000)
+    parser.add_argument("--reviewers", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("lms").setLevel(logging.WARNING)
+    rnd = random.Random(args.seed)
+    homeworks = synthetic_homeworks(args.homeworks)
+    reviewers = synthetic_reviewers(args.reviewers, args.homeworks, rnd)
+    log.info("homeworks=%d reviewers=%d", args.homeworks, args.reviewers)
+
+    distribution = make_distribution(homeworks, reviewers, args.seed)
+    started = time.perf_counter()
+    distribution.distribute()
+    new_time = time.perf_counter() - started
+    log.info(
+        "allocator: %.4fs (overflow %d)",
+        new_time,
+        len(distribution.error_homeworks),
+    )
+    if args.skip_legacy:
+        return
+
+    distribution = make_distribution(homeworks, reviewers, args.seed)
+    started = time.perf_counter()
+    legacy_distribute(distribution)
+    old_time = time.perf_counter() - started
+    log.info("legacy:    %.4fs", old_time)
+    log.info("speedup:   x%.1f", old_time / new_time)
+
+
+if __name__ == "__main__":
+    main()
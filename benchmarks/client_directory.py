@@ -0,0 +1,97 @@
+"""
+Compare Soho client lookup during distribution: legacy nested scan vs
+ClientDirectory built once per run.
+
+    python -m benchmarks.client_directory --clients 50000 --homeworks 5000
+"""
+
+import argparse
+import logging
+import random
+import time
+from collections.abc import Callable, Sequence
+
+from lms.adapters.soho.soho import ClientSchema
+from lms.utils.distribution.clients import ClientDirectory
+
+log = logging.getLogger(__name__)
+
+
+def make_clients(count: int) -> list[ClientSchema]:
+    return [
+        ClientSchema.model_validate(
+            {
+                "id": i,
+                "firstName": f"First{i}",
+                "lastName": f"Last{i}",
+                "emails": [f"client{i}@example.com"],
+                "vkId": 1_000_000 + i,
+            }
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def legacy_lookup(
+    clients: Sequence[ClientSchema],
+    soho_ids: Sequence[int],
+) -> dict[int, ClientSchema]:
+    result = {}
+    for soho_id in soho_ids:
+        for client in clients:
+            if client.id == soho_id:
+                result[client.id] = client
+                break
+    return result
+
+
+def directory_lookup(
+    clients: Sequence[ClientSchema],
+    soho_ids: Sequence[int],
+) -> dict[int, ClientSchema]:
+    directory = ClientDirectory.from_clients(clients)
+    result = {}
+    for soho_id in soho_ids:
+        client = directory.get(soho_id)
+        if client is not None:
+            result[client.id] = client
+    return result
+
+
+def measure(
+    func: Callable[[Sequence[ClientSchema], Sequence[int]], dict],
+    clients: Sequence[ClientSchema],
+    soho_ids: Sequence[int],
+) -> tuple[float, dict]:
+    started = time.perf_counter()
+    result = func(clients, soho_ids)
+    return time.perf_counter() - started, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=50_000)
+    parser.add_argument("--homeworks", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    clients = make_clients(args.clients)
+    rnd.shuffle(clients)
+    soho_ids = [rnd.randint(1, args.clients) for _ in range(args.homeworks)]
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    log.info("clients=%d homeworks=%d", args.clients, args.homeworks)
+    new_time, new_result = measure(directory_lookup, clients, soho_ids)
+    log.info("directory: %.4fs", new_time)
+    if args.skip_legacy:
+        return
+    old_time, old_result = measure(legacy_lookup, clients, soho_ids)
+    log.info("legacy:    %.4fs", old_time)
+    assert old_result == new_result
+    log.info("speedup:   x%.1f", old_time / new_time)
+
+
+if __name__ == "__main__":
+    main()
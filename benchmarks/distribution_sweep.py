@@ -0,0 +1,120 @@
+"""
+Sweep Distribution.distribute() over homework and reviewer counts and catch
+allocator regressions against a saved baseline.
+
+    python -m benchmarks.distribution_sweep --save-baseline sweep.json
+    python -m benchmarks.distribution_sweep --baseline sweep.json
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import random
+import sys
+from pathlib import Path
+
+from lms.utils.distribution.simulation import (
+    SimulationResult,
+    simulate,
+    synthetic_homeworks,
+    synthetic_reviewers,
+)
+
+log = logging.getLogger(__name__)
+
+HOMEWORKS = (1_000, 10_000, 100_000)
+REVIEWERS = (10, 50, 200)
+
+
+def run_case(homeworks: int, reviewers: int, seed: int) -> SimulationResult:
+    rnd = random.Random(seed)
+    return simulate(
+        homeworks=synthetic_homeworks(homeworks),
+        reviewers=synthetic_reviewers(reviewers, homeworks, rnd),
+        seed=seed,
+    )
+
+
+def sweep(
+    homeworks: list[int],
+    reviewers: list[int],
+    repeat: int,
+    seed: int,
+) -> dict[str, float]:
+    timings = {}
+    for hw_count, r_count in itertools.product(homeworks, reviewers):
+        results = [run_case(hw_count, r_count, seed) for _ in range(repeat)]
+        best = min(results, key=lambda r: r.duration)
+        key = f"{hw_count}x{r_count}"
+        timings[key] = best.duration
+        log.info(
+            "%-12s %.4fs  overflow=%-6d jain=%.4f below_min=%d above_max=%d",
+            key,
+            best.duration,
+            best.overflow,
+            best.fairness.jain_index,
+            best.fairness.below_min,
+            best.fairness.above_max,
+        )
+    return timings
+
+
+def compare(
+    timings: dict[str, float],
+    baseline: dict[str, float],
+    tolerance: float,
+    min_delta: float,
+) -> list[str]:
+    regressions = []
+    for key, duration in timings.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        # Millisecond-sized cases are mostly noise, so a slowdown has to be
+        # both relative and absolute to count
+        slower = duration - expected
+        if slower > expected * tolerance and slower > min_delta:
+            regressions.append(f"{key}: {duration:.4f}s vs {expected:.4f}s")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--homeworks", type=int, nargs="+", default=list(HOMEWORKS))
+    parser.add_argument("--reviewers", type=int, nargs="+", default=list(REVIEWERS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed slowdown against the baseline, 0.5 is +50%%",
+    )
+    parser.add_argument("--min-delta", type=float, default=0.01)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("lms").setLevel(logging.WARNING)
+    timings = sweep(
+        homeworks=args.homeworks,
+        reviewers=args.reviewers,
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(timings, indent=2))
+        log.info("baseline saved to %s", args.save_baseline)
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare(timings, baseline, args.tolerance, args.min_delta)
+        for regression in regressions:
+            log.error("regression %s", regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
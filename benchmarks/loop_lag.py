@@ -0,0 +1,87 @@
+"""
+Measure how long the event loop is blocked while a big distribution is
+allocated through the process pool, against running it on the loop.
+
+    python -m benchmarks.loop_lag --homeworks 150000 --reviewers 100
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from lms.generals.models.distribution import DistributionParams
+from lms.logic.distribute_homeworks import Distributor
+from lms.utils.distribution.models import Distribution
+from lms.utils.distribution.simulation import (
+    synthetic_homeworks,
+    synthetic_reviewers,
+)
+from lms.utils.loop_lag import measure_loop_lag
+
+log = logging.getLogger(__name__)
+
+
+def make_distribution(homeworks: int, reviewers: int, seed: int) -> Distribution:
+    return Distribution(
+        created_at=datetime.now(),
+        params=DistributionParams(name="bench", product_ids=[1], homeworks=[]),
+        homeworks=[],
+        reviewers=synthetic_reviewers(reviewers, homeworks, random.Random(seed)),
+        filtered_homeworks=synthetic_homeworks(homeworks),
+        error_homeworks=[],
+        seed=seed,
+    )
+
+
+async def measure(homeworks: int, reviewers: int, seed: int) -> tuple[float, float]:
+    distribution = make_distribution(homeworks, reviewers, seed)
+    started = time.perf_counter()
+    distribution.distribute()
+    blocking = time.perf_counter() - started
+
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        distributor = Distributor(
+            uow=None,  # type: ignore[arg-type]
+            google_sheets=None,  # type: ignore[arg-type]
+            google_drive=None,  # type: ignore[arg-type]
+            soho=None,  # type: ignore[arg-type]
+            executor=executor,
+        )
+        # The first task pays for the worker start
+        await distributor._distribute(make_distribution(10, 1, seed))
+        distribution = make_distribution(homeworks, reviewers, seed)
+        async with measure_loop_lag() as lag:
+            await distributor._distribute(distribution)
+    return blocking, lag.max
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--homeworks", type=int, default=150_000)
+    parser.add_argument("--reviewers", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--max-ratio",
+        type=float,
+        default=0.5,
+        help="Allowed worst loop lag as a share of the blocking run",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("lms").setLevel(logging.WARNING)
+    blocking, lag = asyncio.run(measure(args.homeworks, args.reviewers, args.seed))
+    log.info("on the loop     %.4fs", blocking)
+    log.info("worst loop lag  %.4fs", lag)
+    if lag > blocking * args.max_ratio:
+        log.error("regression: the loop is blocked for %.0f%%", 100 * lag / blocking)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
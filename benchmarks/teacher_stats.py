@@ -0,0 +1,225 @@
+"""
+Compare teacher product lookup for enrollment: rating ordered by correlated
+teacher_assignment counts vs counters stored in teacher_product_stats.
+
+Drops and recreates every table, point it at a scratch database.
+
+    python -m benchmarks.teacher_stats --pg-dsn $APP_PG_DSN --assignments 100000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import desc, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from lms.adapters.db.models import (
+    Base,
+    Offer,
+    Product,
+    ProductGroup,
+    Student,
+    StudentProduct,
+    Subject,
+    Teacher,
+    TeacherAssignment,
+    TeacherProduct,
+)
+from lms.adapters.db.repositories.teacher_product import TeacherProductRepository
+from lms.adapters.db.repositories.teacher_product_stats import (
+    TeacherProductStatsRepository,
+)
+from lms.adapters.db.utils import create_async_engine, create_async_session_factory
+from lms.generals.enums import TeacherType
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 10_000
+
+
+def chunked(rows: Sequence[dict[str, Any]]) -> Iterable[Sequence[dict[str, Any]]]:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        yield rows[start : start + CHUNK_SIZE]
+
+
+async def seed(
+    session: AsyncSession,
+    rnd: random.Random,
+    products: int,
+    teachers: int,
+    assignments: int,
+) -> list[int]:
+    await session.execute(insert(Subject), [{"id": 1, "name": "Subject"}])
+    await session.execute(
+        insert(ProductGroup), [{"id": 1, "name": "Group", "eng_name": "group"}]
+    )
+    product_ids = list(range(1, products + 1))
+    await session.execute(
+        insert(Product),
+        [
+            {"id": i, "subject_id": 1, "product_group_id": 1, "name": f"Product{i}"}
+            for i in product_ids
+        ],
+    )
+    await session.execute(
+        insert(Offer),
+        [
+            {"id": i, "product_id": i, "name": f"Offer{i}", "cohort": 0}
+            for i in product_ids
+        ],
+    )
+    await session.execute(
+        insert(Teacher),
+        [{"id": i, "vk_id": i} for i in range(1, products * teachers + 1)],
+    )
+    await session.execute(
+        insert(TeacherProduct),
+        [
+            {
+                "id": i,
+                "teacher_id": i,
+                "product_id": (i - 1) // teachers + 1,
+                "type": TeacherType.CURATOR,
+                "max_students": rnd.randint(50, 500),
+                "average_grade": rnd.uniform(3, 5),
+            }
+            for i in range(1, products * teachers + 1)
+        ],
+    )
+
+    now = datetime.now()
+    student_rows, student_product_rows, assignment_rows = [], [], []
+    for i in range(1, assignments + 1):
+        teacher_product_id = rnd.randint(1, products * teachers)
+        product_id = (teacher_product_id - 1) // teachers + 1
+        removed_at = None
+        if rnd.random() < 0.2:
+            removed_at = now - timedelta(days=rnd.randint(0, 60))
+        student_rows.append({"id": i, "vk_id": i})
+        student_product_rows.append(
+            {
+                "id": i,
+                "student_id": i,
+                "product_id": product_id,
+                "teacher_product_id": teacher_product_id,
+                "teacher_type": TeacherType.CURATOR,
+                "offer_id": product_id,
+                "cohort": 0,
+            }
+        )
+        assignment_rows.append(
+            {
+                "student_product_id": i,
+                "teacher_product_id": teacher_product_id,
+                "removed_at": removed_at,
+            }
+        )
+    for model, rows in (
+        (Student, student_rows),
+        (StudentProduct, student_product_rows),
+        (TeacherAssignment, assignment_rows),
+    ):
+        for chunk in chunked(rows):
+            await session.execute(insert(model), chunk)
+
+    await TeacherProductStatsRepository(session).recalculate()
+    await session.commit()
+    return product_ids
+
+
+async def legacy_lookup(session: AsyncSession, product_id: int) -> int:
+    teacher_product_id = await session.scalar(
+        select(TeacherProduct.id)
+        .where(
+            TeacherProduct.product_id == product_id,
+            TeacherProduct.type == TeacherType.CURATOR,
+            TeacherProduct.max_students > 0,
+            TeacherProduct.is_active.is_(True),
+        )
+        .order_by(desc(TeacherProduct.rating_coef), TeacherProduct.id)
+        .limit(1)
+    )
+    assert teacher_product_id is not None
+    return teacher_product_id
+
+
+async def stats_lookup(session: AsyncSession, product_id: int) -> int:
+    teacher_product = await TeacherProductRepository(session).reserve_for_enroll(
+        product_id=product_id,
+        teacher_type=TeacherType.CURATOR,
+    )
+    return teacher_product.id
+
+
+async def measure(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    func: Callable[[AsyncSession, int], Awaitable[int]],
+    product_ids: Sequence[int],
+    repeat: int,
+) -> tuple[float, list[int]]:
+    async with sessionmaker() as session:
+        await func(session, product_ids[0])
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = [await func(session, product_id) for product_id in product_ids]
+        return time.perf_counter() - started, result
+
+
+async def amain(args: argparse.Namespace) -> None:
+    rnd = random.Random(args.seed)
+    async with create_async_engine(connection_uri=args.pg_dsn) as engine:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        sessionmaker = create_async_session_factory(engine=engine)
+
+        started = time.perf_counter()
+        async with sessionmaker() as session:
+            product_ids = await seed(
+                session, rnd, args.products, args.teachers, args.assignments
+            )
+        log.info("seeded in %.1fs", time.perf_counter() - started)
+
+        new_time, new_result = await measure(
+            sessionmaker, stats_lookup, product_ids, args.repeat
+        )
+        log.info("stats:   %.4fs", new_time)
+        old_time, old_result = await measure(
+            sessionmaker, legacy_lookup, product_ids, args.repeat
+        )
+        log.info("legacy:  %.4fs", old_time)
+        assert old_result == new_result
+        log.info("speedup: x%.1f", old_time / new_time)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pg-dsn", default=os.environ.get("APP_PG_DSN"))
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--teachers", type=int, default=50)
+    parser.add_argument("--assignments", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.pg_dsn:
+        parser.error("pass --pg-dsn or set APP_PG_DSN")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    log.info(
+        "products=%d teachers=%d assignments=%d",
+        args.products,
+        args.teachers,
+        args.assignments,
+    )
+    asyncio.run(amain(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    Iterable,
+    Mapping,
+)
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, field
+from typing import Any, Final, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+log = logging.getLogger(__name__)
+
+# Filled by the triggers of the entity_cache_notify migration
+ENTITY_CACHE_CHANNEL: Final = "entity_cache"
+
+_MISSING: Final = object()
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class CacheRegion:
+    name: str
+    tables: frozenset[str]
+    ttl: float
+    max_size: int
+    clock: Callable[[], float] = time.monotonic
+    hits: int = 0
+    misses: int = 0
+    # Bumped on clear, so a row loaded before an invalidation is not stored
+    generation: int = 0
+    _entries: OrderedDict[Hashable, tuple[float, Any]] = field(
+        init=False, default_factory=OrderedDict
+    )
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self.clock():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, generation: int) -> None:
+        if generation != self.generation:
+            return
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class EntityCache:
+    # Process-local cache of rarely changed reference rows shared by the
+    # units of work of one process. Every write to the tables is announced
+    # with NOTIFY, so a region is dropped as soon as one of its tables
+    # changes in any process, the ttl only bounds missed notifications
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        self._clock = clock
+        self._regions: dict[str, CacheRegion] = {}
+        # Nothing is served until the listener is connected
+        self.enabled = False
+
+    def region(self, name: str, tables: Iterable[str]) -> CacheRegion | None:
+        if not self.enabled:
+            return None
+        region = self._regions.get(name)
+        if region is None:
+            region = self._regions[name] = CacheRegion(
+                name=name,
+                tables=frozenset(tables),
+                ttl=self._ttl,
+                max_size=self._max_size,
+                clock=self._clock,
+            )
+        return region
+
+    def evict(self, name: str) -> None:
+        region = self._regions.get(name)
+        if region is not None:
+            region.clear()
+
+    def invalidate(self, table: str) -> None:
+        for region in self._regions.values():
+            if table in region.tables:
+                region.clear()
+
+    def clear(self) -> None:
+        for region in self._regions.values():
+            region.clear()
+
+    def stats(self) -> Mapping[str, Mapping[str, int]]:
+        return {
+            name: {"hits": r.hits, "misses": r.misses, "size": len(r)}
+            for name, r in self._regions.items()
+        }
+
+
+class CacheScope:
+    # The cache as seen by one unit of work: tables it has written bypass
+    # the cache until commit, which drops them for the whole process.
+    # Every unit of work gets its own copy of a cached value, so changing
+    # an entity in place never leaks into the others
+    def __init__(self, cache: EntityCache | None = None) -> None:
+        self._cache = cache
+        self._written: set[str] = set()
+        # Regions filled by this scope, dropped again if it rolls back
+        self._filled: set[str] = set()
+
+    async def read_through(
+        self,
+        name: str,
+        tables: Iterable[str],
+        key: Hashable,
+        load: Callable[[], Awaitable[T]],
+    ) -> T:
+        tables = frozenset(tables)
+        region = None
+        if self._cache is not None and not tables & self._written:
+            region = self._cache.region(name, tables)
+        if region is None:
+            return await load()
+        value = region.get(key)
+        if value is not _MISSING:
+            return copy.deepcopy(value)
+        generation = region.generation
+        value = await load()
+        region.set(key, copy.deepcopy(value), generation)
+        self._filled.add(name)
+        return value
+
+    def written(self, table: str) -> None:
+        self._written.add(table)
+
+    def commit(self) -> None:
+        if self._cache is not None:
+            for table in self._written:
+                self._cache.invalidate(table)
+        self._written.clear()
+        self._filled.clear()
+
+    def rollback(self) -> None:
+        if self._cache is not None:
+            for name in self._filled:
+                self._cache.evict(name)
+        self._written.clear()
+        self._filled.clear()
+
+
+@asynccontextmanager
+async def listen_entity_changes(
+    engine: AsyncEngine,
+    cache: EntityCache,
+    ping_interval: float = 30,
+    reconnect_pause: float = 5,
+) -> AsyncIterator[EntityCache]:
+    task = asyncio.create_task(_listen(engine, cache, ping_interval, reconnect_pause))
+    try:
+        yield cache
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        cache.enabled = False
+
+
+async def _listen(
+    engine: AsyncEngine,
+    cache: EntityCache,
+    ping_interval: float,
+    reconnect_pause: float,
+) -> None:
+    def on_notify(_conn: Any, _pid: int, _channel: str, table: str) -> None:
+        cache.invalidate(table)
+
+    while True:
+        try:
+            async with engine.connect() as conn:
+                raw = (await conn.get_raw_connection()).driver_connection
+                await raw.add_listener(ENTITY_CACHE_CHANNEL, on_notify)
+                try:
+                    # Changes made while nobody was listening are unknown
+                    cache.clear()
+                    cache.enabled = True
+                    log.info("Entity cache is listening for changes")
+                    while True:
+                        await asyncio.sleep(ping_interval)
+                        # Outside of a transaction, notifications are only
+                        # delivered to idle sessions
+                        await raw.execute("SELECT 1")
+                finally:
+                    cache.enabled = False
+                    with suppress(Exception):
+                        await raw.remove_listener(ENTITY_CACHE_CHANNEL, on_notify)
+        except Exception:
+            log.exception("Entity cache listener failed, cache is disabled")
+        await asyncio.sleep(reconnect_pause)
@@ -5,3 +5,9 @@ from os import environ
 @dataclass(frozen=True, slots=True, kw_only=True)
 class DatabaseConfig:
     dsn: str = field(default_factory=lambda: environ["APP_DATABASE_DSN"])
+    cache_ttl: int = field(
+        default_factory=lambda: int(environ.get("APP_DATABASE_CACHE_TTL", "600"))
+    )
+    cache_max_size: int = field(
+        default_factory=lambda: int(environ.get("APP_DATABASE_CACHE_MAX_SIZE", "10000"))
+    )
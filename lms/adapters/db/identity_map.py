@@ -0,0 +1,26 @@
+from collections.abc import Hashable
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class IdentityMap:
+    # Entities read during one unit of work, keyed by their type and id, so
+    # repeated reads of the same row do not go to the database again
+    def __init__(self) -> None:
+        self._objects: dict[tuple[type[BaseModel], Hashable], Any] = {}
+
+    def get(self, model_type: type[T], key: Hashable) -> T | None:
+        return self._objects.get((model_type, key))
+
+    def add(self, obj: T) -> T:
+        self._objects[(type(obj), obj.id)] = obj  # type: ignore[attr-defined]
+        return obj
+
+    def discard(self, model_type: type[BaseModel], key: Hashable) -> None:
+        self._objects.pop((model_type, key), None)
+
+    def clear(self) -> None:
+        self._objects.clear()
@@ -0,0 +1,41 @@
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "5c1f0e7d2a91"
+down_revision: str | None = "2022d1d2f309"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "soho_client",
+        sa.Column("id", sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column(
+            "emails",
+            postgresql.ARRAY(sa.String(length=128)),
+            server_default="{}",
+            nullable=False,
+        ),
+        sa.Column("vk_id", sa.BigInteger(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("first_name", sa.String(length=128), nullable=False),
+        sa.Column("last_name", sa.String(length=128), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk__soho_client")),
+    )
+    op.create_index(
+        op.f("ix__soho_client__vk_id"), "soho_client", ["vk_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix__soho_client__vk_id"), table_name="soho_client")
+    op.drop_table("soho_client")
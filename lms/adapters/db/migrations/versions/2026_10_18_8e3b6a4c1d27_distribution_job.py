@@ -0,0 +1,92 @@
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "8e3b6a4c1d27"
+down_revision: str | None = "5c1f0e7d2a91"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "distribution_job",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("subject_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "PENDING",
+                "RUNNING",
+                "SUCCEEDED",
+                "FAILED",
+                name="distribution_job_status",
+            ),
+            nullable=False,
+        ),
+        sa.Column("params", postgresql.JSON(astext_type=sa.Text()), nullable=False),
+        sa.Column(
+            "stages",
+            postgresql.JSON(astext_type=sa.Text()),
+            server_default="[]",
+            nullable=False,
+        ),
+        sa.Column("error", sa.String(length=4096), nullable=True),
+        sa.Column("distribution_id", sa.Integer(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["distribution_id"],
+            ["distribution.id"],
+            name=op.f("fk__distribution_job__distribution_id__distribution"),
+            ondelete="SET NULL",
+        ),
+        sa.ForeignKeyConstraint(
+            ["subject_id"],
+            ["subject.id"],
+            name=op.f("fk__distribution_job__subject_id__subject"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk__distribution_job")),
+    )
+    op.create_index(
+        "ix__distribution_job__running_subject_id",
+        "distribution_job",
+        ["subject_id"],
+        unique=True,
+        postgresql_where=sa.text("status = 'RUNNING'"),
+    )
+    op.create_index(
+        op.f("ix__distribution_job__status"),
+        "distribution_job",
+        ["status"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix__distribution_job__subject_id"),
+        "distribution_job",
+        ["subject_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f("ix__distribution_job__subject_id"), table_name="distribution_job"
+    )
+    op.drop_index(op.f("ix__distribution_job__status"), table_name="distribution_job")
+    op.drop_index(
+        "ix__distribution_job__running_subject_id",
+        table_name="distribution_job",
+        postgresql_where=sa.text("status = 'RUNNING'"),
+    )
+    op.drop_table("distribution_job")
+    sa.Enum(name="distribution_job_status").drop(op.get_bind(), checkfirst=False)
@@ -0,0 +1,38 @@
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "a6c2e9d47b31"
+down_revision: str | None = "f3d7a9b05c18"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "idempotency_key",
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("response", postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("key", name=op.f("pk__idempotency_key")),
+    )
+    op.create_index(
+        op.f("ix__idempotency_key__expires_at"),
+        "idempotency_key",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix__idempotency_key__expires_at"), table_name="idempotency_key")
+    op.drop_table("idempotency_key")
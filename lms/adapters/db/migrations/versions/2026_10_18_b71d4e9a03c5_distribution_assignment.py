@@ -0,0 +1,101 @@
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "b71d4e9a03c5"
+down_revision: str | None = "8e3b6a4c1d27"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "distribution_assignment",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("distribution_id", sa.Integer(), nullable=False),
+        sa.Column("reviewer_id", sa.Integer(), nullable=True),
+        sa.Column("homework_id", sa.Integer(), nullable=False),
+        sa.Column("student_homework_id", sa.BigInteger(), nullable=True),
+        sa.Column("student_soho_id", sa.BigInteger(), nullable=False),
+        sa.Column("student_vk_id", sa.BigInteger(), nullable=False),
+        sa.Column("submission_url", sa.String(length=1024), nullable=False),
+        sa.Column("error_message", sa.String(length=256), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["distribution_id"],
+            ["distribution.id"],
+            name=op.f("fk__distribution_assignment__distribution_id__distribution"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["reviewer_id"],
+            ["reviewer.id"],
+            name=op.f("fk__distribution_assignment__reviewer_id__reviewer"),
+            ondelete="SET NULL",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk__distribution_assignment")),
+    )
+    op.create_index(
+        op.f("ix__distribution_assignment__distribution_id"),
+        "distribution_assignment",
+        ["distribution_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix__distribution_assignment__homework_id"),
+        "distribution_assignment",
+        ["homework_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix__distribution_assignment__reviewer_id"),
+        "distribution_assignment",
+        ["reviewer_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix__distribution_assignment__student_soho_id"),
+        "distribution_assignment",
+        ["student_soho_id"],
+        unique=False,
+    )
+    op.alter_column(
+        "distribution",
+        "data",
+        existing_type=postgresql.JSON(astext_type=sa.Text()),
+        nullable=True,
+    )
+
+
+def downgrade() -> None:
+    op.execute("UPDATE distribution SET data = '{}' WHERE data IS NULL")
+    op.alter_column(
+        "distribution",
+        "data",
+        existing_type=postgresql.JSON(astext_type=sa.Text()),
+        nullable=False,
+    )
+    op.drop_index(
+        op.f("ix__distribution_assignment__student_soho_id"),
+        table_name="distribution_assignment",
+    )
+    op.drop_index(
+        op.f("ix__distribution_assignment__reviewer_id"),
+        table_name="distribution_assignment",
+    )
+    op.drop_index(
+        op.f("ix__distribution_assignment__homework_id"),
+        table_name="distribution_assignment",
+    )
+    op.drop_index(
+        op.f("ix__distribution_assignment__distribution_id"),
+        table_name="distribution_assignment",
+    )
+    op.drop_table("distribution_assignment")
@@ -0,0 +1,37 @@
+from collections.abc import Sequence
+
+from alembic import op
+
+revision: str = "b7d3f0e58a42"
+down_revision: str | None = "a6c2e9d47b31"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLES = ("offer", "product", "subject", "flow", "flow_product", "setting")
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE FUNCTION notify_entity_cache() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('entity_cache', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}__notify_entity_cache
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_entity_cache()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER {table}__notify_entity_cache ON {table}")
+    op.execute("DROP FUNCTION notify_entity_cache()")
@@ -0,0 +1,30 @@
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "c3f1a7d95e20"
+down_revision: str | None = "b71d4e9a03c5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "offer",
+        sa.Column("is_premium", sa.Boolean(), server_default="false", nullable=False),
+    )
+    op.add_column(
+        "reviewer",
+        sa.Column("is_premium", sa.Boolean(), server_default="false", nullable=False),
+    )
+    op.add_column(
+        "reviewer",
+        sa.Column("recheck", sa.Boolean(), server_default="false", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("reviewer", "recheck")
+    op.drop_column("reviewer", "is_premium")
+    op.drop_column("offer", "is_premium")
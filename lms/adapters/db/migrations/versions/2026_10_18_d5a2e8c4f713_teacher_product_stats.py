@@ -0,0 +1,54 @@
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "d5a2e8c4f713"
+down_revision: str | None = "c3f1a7d95e20"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "teacher_product_stats",
+        sa.Column("teacher_product_id", sa.Integer(), nullable=False),
+        sa.Column("actual_students", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("total_students", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("removal_students", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["teacher_product_id"],
+            ["teacher_product.id"],
+            name=op.f("fk__teacher_product_stats__teacher_product_id__teacher_product"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "teacher_product_id", name=op.f("pk__teacher_product_stats")
+        ),
+    )
+    op.execute(
+        """
+        INSERT INTO teacher_product_stats (
+            teacher_product_id, actual_students, total_students, removal_students
+        )
+        SELECT
+            teacher_product_id,
+            COUNT(*) FILTER (WHERE removed_at IS NULL),
+            COUNT(*),
+            COUNT(*) FILTER (
+                WHERE removed_at > CURRENT_TIMESTAMP - interval '1 month'
+            )
+        FROM teacher_assignment
+        GROUP BY teacher_product_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("teacher_product_stats")
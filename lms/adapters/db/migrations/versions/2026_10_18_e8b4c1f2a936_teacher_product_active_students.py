@@ -0,0 +1,33 @@
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "e8b4c1f2a936"
+down_revision: str | None = "d5a2e8c4f713"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "teacher_product",
+        sa.Column("active_students", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE teacher_product
+        SET active_students = tmp.active_students
+        FROM (
+            SELECT teacher_product_id, COUNT(*) AS active_students
+            FROM student_product
+            WHERE expulsion_at IS NULL
+            GROUP BY teacher_product_id
+        ) tmp
+        WHERE teacher_product.id = tmp.teacher_product_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("teacher_product", "active_students")
@@ -0,0 +1,72 @@
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "f3d7a9b05c18"
+down_revision: str | None = "e8b4c1f2a936"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "outbox_message",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "kind",
+            postgresql.ENUM(
+                "SEND_TEACHER",
+                "TEACHER_OVERFLOW_ALERT",
+                name="outbox_message_kind",
+            ),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "PENDING",
+                "SENT",
+                "FAILED",
+                name="outbox_message_status",
+            ),
+            server_default="PENDING",
+            nullable=False,
+        ),
+        sa.Column("payload", postgresql.JSON(astext_type=sa.Text()), nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "available_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.Column("error", sa.String(length=4096), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk__outbox_message")),
+    )
+    op.create_index(
+        "ix__outbox_message__pending_available_at",
+        "outbox_message",
+        ["available_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix__outbox_message__pending_available_at",
+        table_name="outbox_message",
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.drop_table("outbox_message")
+    sa.Enum(name="outbox_message_status").drop(op.get_bind(), checkfirst=False)
+    sa.Enum(name="outbox_message_kind").drop(op.get_bind(), checkfirst=False)
@@ -11,6 +11,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
@@ -19,7 +20,7 @@ from sqlalchemy import (
     select,
     text,
 )
-from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.dialects.postgresql import ARRAY, JSON
 from sqlalchemy.orm import (
     Mapped,
     column_property,
@@ -30,7 +31,12 @@ from sqlalchemy.orm import (
 from lms.adapters.db.base import Base
 from lms.adapters.db.mixins import NameMixin, TimestampMixin
 from lms.adapters.db.utils import make_pg_enum
-from lms.generals.enums import TeacherType
+from lms.generals.enums import (
+    DistributionJobStatus,
+    OutboxMessageKind,
+    OutboxMessageStatus,
+    TeacherType,
+)
 
 
 class Student(TimestampMixin, NameMixin, Base):
@@ -58,6 +64,19 @@ class SohoAccount(TimestampMixin, Base):
         return f"<Soho id={self.id} email={self.email} student_id={self.email}>"
 
 
+class SohoClient(TimestampMixin, NameMixin, Base):
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=False)
+    emails: Mapped[list[str]] = mapped_column(
+        ARRAY(String(128)),
+        nullable=False,
+        server_default="{}",
+    )
+    vk_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True, index=True)
+
+    def __repr__(self) -> str:
+        return f"<SohoClient id={self.id} vk_id={self.vk_id}>"
+
+
 class Subject(TimestampMixin, Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String, index=True, nullable=False)
@@ -156,6 +175,12 @@ class Offer(TimestampMixin, Base):
         nullable=True,
         default=None,
     )
+    is_premium: Mapped[bool] = mapped_column(
+        Boolean,
+        default=False,
+        nullable=False,
+        server_default="false",
+    )
 
     product: Mapped[Product] = relationship("Product")
 
@@ -228,6 +253,14 @@ class TeacherProduct(TimestampMixin, Base):
     max_students: Mapped[int] = mapped_column(Integer, default=100, nullable=False)
     average_grade: Mapped[float] = mapped_column(Float, default=5, nullable=False)
     grade_counter: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Not expelled student products of the teacher, kept by the enroll, expulse
+    # and change-teacher logic and reconciled by the cron
+    active_students: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+    )
 
     actual_students: Mapped[int] = column_property(
         select(
@@ -404,6 +437,25 @@ class TeacherProductFlow(Base):
     )
 
 
+class TeacherProductStats(TimestampMixin, Base):
+    # Assignment counters behind TeacherProduct.rating_coef, kept up to date
+    # by TeacherAssignmentRepository and recalculated by the cron
+    teacher_product_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("teacher_product.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    actual_students: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    total_students: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    removal_students: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
+
 class Reviewer(Base, NameMixin, TimestampMixin):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     subject_id: Mapped[int] = mapped_column(
@@ -423,6 +475,18 @@ class Reviewer(Base, NameMixin, TimestampMixin):
     )
     abs_max: Mapped[int] = mapped_column(Integer, default=1000, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    is_premium: Mapped[bool] = mapped_column(
+        Boolean,
+        default=False,
+        nullable=False,
+        server_default="false",
+    )
+    recheck: Mapped[bool] = mapped_column(
+        Boolean,
+        default=False,
+        nullable=False,
+        server_default="false",
+    )
 
     subject: Mapped[Subject] = relationship("Subject")
 
@@ -472,9 +536,139 @@ class Distribution(TimestampMixin, Base):
         ForeignKey("subject.id"),
         nullable=False,
     )
-    data: Mapped[dict[str, Any]] = mapped_column(
+    data: Mapped[dict[str, Any] | None] = mapped_column(
         JSON,
+        nullable=True,
+    )
+
+    subject: Mapped[Subject] = relationship("Subject")
+
+
+class DistributionAssignment(TimestampMixin, Base):
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    distribution_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("distribution.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
+    )
+    reviewer_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("reviewer.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
+    homework_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    student_homework_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    student_soho_id: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        index=True,
     )
+    student_vk_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    submission_url: Mapped[str] = mapped_column(String(1024), nullable=False)
+    error_message: Mapped[str | None] = mapped_column(String(256), nullable=True)
+
+    distribution: Mapped[Distribution] = relationship("Distribution")
+    reviewer: Mapped[Reviewer | None] = relationship("Reviewer")
+
+
+class DistributionJob(TimestampMixin, Base):
+    __table_args__ = (
+        Index(
+            "ix__distribution_job__running_subject_id",
+            "subject_id",
+            unique=True,
+            postgresql_where=text("status = 'RUNNING'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    subject_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("subject.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    status: Mapped[DistributionJobStatus] = mapped_column(
+        make_pg_enum(
+            DistributionJobStatus, name="distribution_job_status", schema=None
+        ),
+        default=DistributionJobStatus.PENDING.value,
+        nullable=False,
+        index=True,
+    )
+    params: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    stages: Mapped[list[dict[str, Any]]] = mapped_column(
+        JSON,
+        nullable=False,
+        server_default="[]",
+    )
+    error: Mapped[str | None] = mapped_column(String(4096), nullable=True)
+    distribution_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("distribution.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     subject: Mapped[Subject] = relationship("Subject")
+    distribution: Mapped[Distribution | None] = relationship("Distribution")
+
+
+class OutboxMessage(TimestampMixin, Base):
+    # Side effects of a transaction, written with it and delivered later by
+    # the outbox worker
+    __table_args__ = (
+        Index(
+            "ix__outbox_message__pending_available_at",
+            "available_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    kind: Mapped[OutboxMessageKind] = mapped_column(
+        make_pg_enum(OutboxMessageKind, name="outbox_message_kind", schema=None),
+        nullable=False,
+    )
+    status: Mapped[OutboxMessageStatus] = mapped_column(
+        make_pg_enum(OutboxMessageStatus, name="outbox_message_status", schema=None),
+        default=OutboxMessageStatus.PENDING.value,
+        server_default=OutboxMessageStatus.PENDING.value,
+        nullable=False,
+    )
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+    )
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+        nullable=False,
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    error: Mapped[str | None] = mapped_column(String(4096), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<OutboxMessage {self.id} {self.kind} {self.status}>"
+
+
+class IdempotencyKey(TimestampMixin, Base):
+    # Responses of webhooks that are retried by their senders, a retry with
+    # the same key gets the stored response until the key expires
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    response: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        index=True,
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<IdempotencyKey {self.key}>"
@@ -22,7 +22,11 @@ class DistributionRepository(Repository[DistributionDb]):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(model=DistributionDb, session=session)
 
-    async def create(self, subject_id: int, data: dict[str, Any]) -> Distribution:
+    async def create(
+        self,
+        subject_id: int,
+        data: dict[str, Any] | None,
+    ) -> Distribution:
         query = (
             insert(DistributionDb)
             .values(
@@ -35,7 +39,6 @@ class DistributionRepository(Repository[DistributionDb]):
             result: ScalarResult[DistributionDb] = await self._session.scalars(query)
             await self._session.flush()
         except IntegrityError as e:
-            await self._session.rollback()
             self._raise_error(e)
         else:
             return Distribution.model_validate(result.one())
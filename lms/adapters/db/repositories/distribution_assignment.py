@@ -0,0 +1,133 @@
+import logging
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import NoReturn
+
+from sqlalchemy import BigInteger, Integer, any_, bindparam, func, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lms.adapters.db.models import Distribution as DistributionDb
+from lms.adapters.db.models import DistributionAssignment as DistributionAssignmentDb
+from lms.adapters.db.repositories.base import PaginateMixin, Repository
+from lms.exceptions import LMSError
+from lms.generals.models.distribution import (
+    CreateDistributionAssignmentModel,
+    DistributionAssignment,
+    ReviewerWorkload,
+)
+from lms.generals.models.pagination import Pagination
+
+log = logging.getLogger(__name__)
+
+
+class DistributionAssignmentRepository(
+    PaginateMixin,
+    Repository[DistributionAssignmentDb],
+):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(model=DistributionAssignmentDb, session=session)
+
+    async def create_many(
+        self,
+        distribution_id: int,
+        assignments: Iterable[CreateDistributionAssignmentModel],
+    ) -> int:
+        values = [
+            {"distribution_id": distribution_id, **assignment.model_dump()}
+            for assignment in assignments
+        ]
+        if not values:
+            return 0
+        try:
+            await self._session.execute(insert(DistributionAssignmentDb), values)
+        except IntegrityError as e:
+            self._raise_error(e)
+        return len(values)
+
+    async def read_last_assignments(
+        self,
+        student_soho_ids: Iterable[int],
+        homework_ids: Iterable[int],
+    ) -> Sequence[DistributionAssignment]:
+        # Latest reviewed assignment per (student, homework) pair
+        soho_ids_param = bindparam(
+            "soho_ids", list(set(student_soho_ids)), type_=ARRAY(BigInteger)
+        )
+        homework_ids_param = bindparam(
+            "homework_ids", list(set(homework_ids)), type_=ARRAY(Integer)
+        )
+        query = (
+            select(DistributionAssignmentDb)
+            .distinct(
+                DistributionAssignmentDb.student_soho_id,
+                DistributionAssignmentDb.homework_id,
+            )
+            .where(
+                DistributionAssignmentDb.student_soho_id == any_(soho_ids_param),
+                DistributionAssignmentDb.homework_id == any_(homework_ids_param),
+                DistributionAssignmentDb.reviewer_id.is_not(None),
+            )
+            .order_by(
+                DistributionAssignmentDb.student_soho_id,
+                DistributionAssignmentDb.homework_id,
+                DistributionAssignmentDb.created_at.desc(),
+                DistributionAssignmentDb.id.desc(),
+            )
+        )
+        rows = await self._session.scalars(query)
+        return [DistributionAssignment.model_validate(row) for row in rows]
+
+    async def reviewer_workload(
+        self,
+        reviewer_id: int,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+    ) -> Sequence[ReviewerWorkload]:
+        query = (
+            select(
+                DistributionDb.id.label("distribution_id"),
+                DistributionDb.subject_id,
+                DistributionDb.created_at,
+                func.count(DistributionAssignmentDb.id).label("homeworks"),
+            )
+            .join(
+                DistributionAssignmentDb,
+                DistributionAssignmentDb.distribution_id == DistributionDb.id,
+            )
+            .where(DistributionAssignmentDb.reviewer_id == reviewer_id)
+            .group_by(DistributionDb.id)
+            .order_by(DistributionDb.created_at.desc())
+        )
+        if date_from is not None:
+            query = query.where(DistributionDb.created_at >= date_from)
+        if date_to is not None:
+            query = query.where(DistributionDb.created_at < date_to)
+        rows = (await self._session.execute(query)).all()
+        return [ReviewerWorkload.model_validate(row._mapping) for row in rows]
+
+    async def paginate_by_student(
+        self,
+        student_soho_id: int,
+        page: int,
+        page_size: int,
+    ) -> Pagination[DistributionAssignment]:
+        query = (
+            select(DistributionAssignmentDb)
+            .where(DistributionAssignmentDb.student_soho_id == student_soho_id)
+            .order_by(
+                DistributionAssignmentDb.created_at.desc(),
+                DistributionAssignmentDb.id,
+            )
+        )
+        return await self._paginate(
+            query=query,
+            page=page,
+            page_size=page_size,
+            model_type=DistributionAssignment,
+        )
+
+    def _raise_error(self, e: DBAPIError) -> NoReturn:
+        log.exception("Error has occurred")
+        raise LMSError from e
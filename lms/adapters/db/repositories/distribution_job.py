@@ -0,0 +1,145 @@
+import logging
+from collections.abc import Sequence
+from datetime import datetime
+from typing import NoReturn
+
+from sqlalchemy import ScalarResult, insert, select, update
+from sqlalchemy.exc import DBAPIError, IntegrityError, NoResultFound
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lms.adapters.db.models import DistributionJob as DistributionJobDb
+from lms.adapters.db.repositories.base import Repository
+from lms.exceptions import DistributionJobNotFoundError, LMSError
+from lms.exceptions.base import EntityNotFoundError
+from lms.generals.enums import DistributionJobStatus
+from lms.generals.models.distribution import DistributionJob, DistributionParams
+from lms.utils.stages import Stage
+
+log = logging.getLogger(__name__)
+
+
+class DistributionJobRepository(Repository[DistributionJobDb]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(model=DistributionJobDb, session=session)
+
+    async def create(
+        self,
+        subject_id: int,
+        params: DistributionParams,
+    ) -> DistributionJob:
+        query = (
+            insert(DistributionJobDb)
+            .values(
+                subject_id=subject_id,
+                status=DistributionJobStatus.PENDING,
+                params=params.model_dump(mode="json"),
+                stages=[],
+            )
+            .returning(DistributionJobDb)
+        )
+        try:
+            result: ScalarResult[DistributionJobDb] = await self._session.scalars(query)
+            await self._session.flush()
+        except IntegrityError as e:
+            self._raise_error(e)
+        else:
+            return DistributionJob.model_validate(result.one())
+
+    async def read_by_id(self, job_id: int) -> DistributionJob:
+        try:
+            obj = await self._read_by_id(job_id)
+        except EntityNotFoundError as e:
+            raise DistributionJobNotFoundError from e
+        return DistributionJob.model_validate(obj)
+
+    async def claim_next(self) -> DistributionJob | None:
+        running_subjects = select(DistributionJobDb.subject_id).where(
+            DistributionJobDb.status == DistributionJobStatus.RUNNING
+        )
+        query = (
+            select(DistributionJobDb.id)
+            .where(
+                DistributionJobDb.status == DistributionJobStatus.PENDING,
+                DistributionJobDb.subject_id.not_in(running_subjects),
+            )
+            .order_by(DistributionJobDb.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job_id = (await self._session.scalars(query)).first()
+        if job_id is None:
+            return None
+        try:
+            async with self._session.begin_nested():
+                obj = await self._update(
+                    DistributionJobDb.id == job_id,
+                    status=DistributionJobStatus.RUNNING,
+                    started_at=datetime.now(),
+                    finished_at=None,
+                    error=None,
+                )
+        except IntegrityError:
+            # Another worker has just started a job for the same subject
+            return None
+        return DistributionJob.model_validate(obj)
+
+    async def update_stages(self, job_id: int, stages: Sequence[Stage]) -> None:
+        await self._update_job(
+            job_id,
+            stages=[stage.model_dump(mode="json") for stage in stages],
+        )
+
+    async def finish(
+        self,
+        job_id: int,
+        status: DistributionJobStatus,
+        distribution_id: int | None = None,
+        error: str | None = None,
+    ) -> DistributionJob:
+        obj = await self._update_job(
+            job_id,
+            status=status,
+            distribution_id=distribution_id,
+            error=error,
+            finished_at=datetime.now(),
+        )
+        return DistributionJob.model_validate(obj)
+
+    async def heartbeat(self, job_ids: Sequence[int]) -> None:
+        query = (
+            update(DistributionJobDb)
+            .where(
+                DistributionJobDb.id.in_(job_ids),
+                DistributionJobDb.status == DistributionJobStatus.RUNNING,
+            )
+            .values(updated_at=datetime.now())
+        )
+        await self._session.execute(query)
+        await self._session.flush()
+
+    async def fail_stale(self, updated_before: datetime, error: str) -> int:
+        query = (
+            update(DistributionJobDb)
+            .where(
+                DistributionJobDb.status == DistributionJobStatus.RUNNING,
+                DistributionJobDb.updated_at < updated_before,
+            )
+            .values(
+                status=DistributionJobStatus.FAILED,
+                error=error,
+                finished_at=datetime.now(),
+            )
+        )
+        result = await self._session.execute(query)
+        await self._session.flush()
+        return result.rowcount  # type: ignore[attr-defined]
+
+    async def _update_job(self, job_id: int, **values: object) -> DistributionJobDb:
+        try:
+            return await self._update(DistributionJobDb.id == job_id, **values)
+        except NoResultFound as e:
+            raise DistributionJobNotFoundError from e
+
+    def _raise_error(self, e: DBAPIError) -> NoReturn:
+        log.exception("Error has occurred")
+        raise LMSError from e
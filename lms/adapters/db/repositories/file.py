@@ -43,7 +43,6 @@ class FileRepository(Repository[VerifiedWorkFileDb]):
             )
             await self._session.flush()
         except IntegrityError as e:
-            await self._session.rollback()
             self._raise_error(e)
         else:
             return VerifiedWorkFile.model_validate(result.one())
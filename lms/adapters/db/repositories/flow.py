@@ -1,6 +1,10 @@
-from sqlalchemy import select
+from collections.abc import Iterable, Mapping
+
+from sqlalchemy import BigInteger, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from lms.adapters.db.cache import CacheScope
 from lms.adapters.db.models import Flow as FlowDb
 from lms.adapters.db.models import FlowProduct as FlowProductDb
 from lms.adapters.db.repositories.base import Repository
@@ -8,10 +12,32 @@ from lms.generals.models.flow import Flow
 
 
 class FlowRepository(Repository[FlowDb]):
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, cache: CacheScope | None = None) -> None:
         super().__init__(model=FlowDb, session=session)
+        self._cache = cache or CacheScope()
 
     async def get_by_soho_id(self, soho_flow_id: int) -> Flow | None:
+        return await self._cache.read_through(
+            "flow_by_soho_id",
+            ("flow", "flow_product"),
+            soho_flow_id,
+            lambda: self._load_by_soho_id(soho_flow_id),
+        )
+
+    async def get_by_soho_ids(self, soho_flow_ids: Iterable[int]) -> Mapping[int, Flow]:
+        soho_ids_param = bindparam(
+            "soho_ids", list(set(soho_flow_ids)), type_=ARRAY(BigInteger)
+        )
+        query = (
+            select(FlowProductDb.soho_id, FlowDb)
+            .select_from(FlowDb)
+            .join(FlowProductDb, FlowDb.id == FlowProductDb.flow_id)
+            .where(FlowProductDb.soho_id == any_(soho_ids_param))
+        )
+        rows = (await self._session.execute(query)).all()
+        return {soho_id: Flow.model_validate(obj) for soho_id, obj in rows}
+
+    async def _load_by_soho_id(self, soho_flow_id: int) -> Flow | None:
         query = (
             select(FlowDb)
             .join(FlowProductDb, FlowDb.id == FlowProductDb.flow_id)
@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import delete, func, null, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lms.adapters.db.models import IdempotencyKey as IdempotencyKeyDb
+from lms.adapters.db.repositories.base import Repository
+from lms.generals.models.idempotency import IdempotencyKey
+
+
+class IdempotencyKeyRepository(Repository[IdempotencyKeyDb]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(model=IdempotencyKeyDb, session=session)
+
+    async def claim(self, key: str, request_hash: str, expires_at: datetime) -> bool:
+        # A concurrent request with the same key waits on the primary key
+        # until the first one commits and then finds its response, expired
+        # keys are taken over
+        stmt = insert(IdempotencyKeyDb).values(
+            key=key,
+            request_hash=request_hash,
+            expires_at=expires_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IdempotencyKeyDb.key],
+            set_={
+                "request_hash": stmt.excluded.request_hash,
+                "response": null(),
+                "expires_at": stmt.excluded.expires_at,
+                "updated_at": func.now(),
+            },
+            where=IdempotencyKeyDb.expires_at <= datetime.now(),
+        ).returning(IdempotencyKeyDb.key)
+        return (await self._session.scalar(stmt)) is not None
+
+    async def read(self, key: str) -> IdempotencyKey | None:
+        query = select(IdempotencyKeyDb).where(IdempotencyKeyDb.key == key)
+        obj = await self._session.scalar(query)
+        if obj is None:
+            return None
+        return IdempotencyKey.model_validate(obj)
+
+    async def save_response(self, key: str, response: dict[str, Any]) -> None:
+        query = (
+            update(IdempotencyKeyDb)
+            .where(IdempotencyKeyDb.key == key)
+            .values(response=response)
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.execute(query)
+
+    async def delete_expired(self) -> int:
+        query = delete(IdempotencyKeyDb).where(
+            IdempotencyKeyDb.expires_at <= datetime.now()
+        )
+        result = await self._session.execute(query)
+        return result.rowcount  # type: ignore[attr-defined]
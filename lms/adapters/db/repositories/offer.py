@@ -1,19 +1,83 @@
+from collections.abc import Iterable, Mapping
+
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from lms.adapters.db.cache import CacheScope
+from lms.adapters.db.identity_map import IdentityMap
 from lms.adapters.db.models import Offer as OfferDb
+from lms.adapters.db.models import Product as ProductDb
+from lms.adapters.db.models import Subject as SubjectDb
 from lms.adapters.db.repositories.base import Repository
 from lms.exceptions.base import EntityNotFoundError
 from lms.exceptions.product import OfferNotFoundError
 from lms.generals.models.offer import Offer
+from lms.generals.models.product import Product
+from lms.generals.models.subject import Subject
 
 
 class OfferRepository(Repository[OfferDb]):
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        identity_map: IdentityMap | None = None,
+        cache: CacheScope | None = None,
+    ) -> None:
         super().__init__(model=OfferDb, session=session)
+        self._identity_map = identity_map or IdentityMap()
+        self._cache = cache or CacheScope()
 
     async def read_by_id(self, offer_id: int) -> Offer:
+        if offer := self._identity_map.get(Offer, offer_id):
+            return offer
+        offer = await self._cache.read_through(
+            "offer", ("offer",), offer_id, lambda: self._load(offer_id)
+        )
+        return self._identity_map.add(offer)
+
+    async def read_with_subject(self, offer_id: int) -> tuple[Offer, Subject]:
+        offer = self._identity_map.get(Offer, offer_id)
+        product = offer and self._identity_map.get(Product, offer.product_id)
+        subject = product and self._identity_map.get(Subject, product.subject_id)
+        if offer and subject:
+            return offer, subject
+        offer, product, subject = await self._cache.read_through(
+            "offer_with_subject",
+            ("offer", "product", "subject"),
+            offer_id,
+            lambda: self._load_with_subject(offer_id),
+        )
+        self._identity_map.add(product)
+        return self._identity_map.add(offer), self._identity_map.add(subject)
+
+    async def read_by_ids(self, offer_ids: Iterable[int]) -> Mapping[int, Offer]:
+        offer_ids_param = bindparam(
+            "offer_ids", list(set(offer_ids)), type_=ARRAY(Integer)
+        )
+        query = select(OfferDb).where(OfferDb.id == any_(offer_ids_param))
+        objs = await self._session.scalars(query)
+        return {obj.id: Offer.model_validate(obj) for obj in objs}
+
+    async def _load(self, offer_id: int) -> Offer:
         try:
             obj = await self._read_by_id(object_id=offer_id)
         except EntityNotFoundError as e:
             raise OfferNotFoundError(offer_id=offer_id) from e
         return Offer.model_validate(obj)
+
+    async def _load_with_subject(self, offer_id: int) -> tuple[Offer, Product, Subject]:
+        query = (
+            select(OfferDb, ProductDb, SubjectDb)
+            .join(ProductDb, ProductDb.id == OfferDb.product_id)
+            .join(SubjectDb, SubjectDb.id == ProductDb.subject_id)
+            .where(OfferDb.id == offer_id)
+        )
+        row = (await self._session.execute(query)).one_or_none()
+        if row is None:
+            raise OfferNotFoundError(offer_id=offer_id)
+        return (
+            Offer.model_validate(row.Offer),
+            Product.model_validate(row.Product),
+            Subject.model_validate(row.Subject),
+        )
@@ -0,0 +1,98 @@
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timedelta
+
+from sqlalchemy import BigInteger, any_, bindparam, delete, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lms.adapters.db.models import OutboxMessage as OutboxMessageDb
+from lms.adapters.db.repositories.base import Repository
+from lms.generals.enums import OutboxMessageStatus
+from lms.generals.models.outbox import OutboxMessage, OutboxPayload
+
+
+class OutboxRepository(Repository[OutboxMessageDb]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(model=OutboxMessageDb, session=session)
+
+    async def add(self, payloads: Iterable[OutboxPayload]) -> None:
+        values = [
+            {"kind": payload.KIND, "payload": payload.model_dump(mode="json")}
+            for payload in payloads
+        ]
+        if values:
+            await self._session.execute(insert(OutboxMessageDb), values)
+
+    async def claim(self, limit: int, lease: timedelta) -> Sequence[OutboxMessage]:
+        # Claimed messages are hidden from other workers for the lease, so
+        # messages of a crashed worker are picked up again after it
+        now = datetime.now()
+        available = (
+            select(OutboxMessageDb.id)
+            .where(
+                OutboxMessageDb.status == OutboxMessageStatus.PENDING,
+                OutboxMessageDb.available_at <= now,
+            )
+            .order_by(OutboxMessageDb.available_at, OutboxMessageDb.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        query = (
+            update(OutboxMessageDb)
+            .where(OutboxMessageDb.id.in_(available.scalar_subquery()))
+            .values(available_at=now + lease)
+            .returning(OutboxMessageDb)
+            .execution_options(synchronize_session=False)
+        )
+        objs = (await self._session.scalars(query)).all()
+        return sorted(
+            (OutboxMessage.model_validate(obj) for obj in objs),
+            key=lambda message: message.id,
+        )
+
+    async def mark_sent(self, message_ids: Sequence[int]) -> None:
+        if not message_ids:
+            return
+        ids_param = bindparam("ids", list(message_ids), type_=ARRAY(BigInteger))
+        query = (
+            update(OutboxMessageDb)
+            .where(OutboxMessageDb.id == any_(ids_param))
+            .values(
+                status=OutboxMessageStatus.SENT,
+                attempts=OutboxMessageDb.attempts + 1,
+                sent_at=datetime.now(),
+                error=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.execute(query)
+
+    async def mark_failed(
+        self,
+        message_id: int,
+        error: str,
+        retry_at: datetime | None,
+    ) -> None:
+        values: dict[str, object] = {
+            "attempts": OutboxMessageDb.attempts + 1,
+            "error": error,
+        }
+        if retry_at is None:
+            values["status"] = OutboxMessageStatus.FAILED
+        else:
+            values["available_at"] = retry_at
+        query = (
+            update(OutboxMessageDb)
+            .where(OutboxMessageDb.id == message_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.execute(query)
+
+    async def delete_sent(self, sent_before: datetime) -> int:
+        query = delete(OutboxMessageDb).where(
+            OutboxMessageDb.status == OutboxMessageStatus.SENT,
+            OutboxMessageDb.sent_at < sent_before,
+        )
+        result = await self._session.execute(query)
+        return result.rowcount  # type: ignore[attr-defined]
@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from lms.adapters.db.cache import CacheScope
 from lms.adapters.db.models import Offer as OfferDb
 from lms.adapters.db.models import Product as ProductDb
 from lms.adapters.db.repositories.base import PaginateMixin, Repository
@@ -15,8 +16,9 @@ from lms.generals.models.product import Product
 
 
 class ProductRepository(PaginateMixin, Repository[ProductDb]):
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, cache: CacheScope | None = None) -> None:
         super().__init__(model=ProductDb, session=session)
+        self._cache = cache or CacheScope()
 
     async def paginate(self, page: int, page_size: int) -> Pagination[Product]:
         query = select(ProductDb).order_by(ProductDb.id)
@@ -28,11 +30,9 @@ class ProductRepository(PaginateMixin, Repository[ProductDb]):
         )
 
     async def read_by_id(self, product_id: int) -> Product:
-        try:
-            obj = await self._read_by_id(product_id)
-            return Product.model_validate(obj)
-        except EntityNotFoundError as e:
-            raise ProductNotFoundError from e
+        return await self._cache.read_through(
+            "product", ("product",), product_id, lambda: self._load(product_id)
+        )
 
     async def find_product_by_offer(self, offer_id: int) -> Product:
         stmt = (
@@ -54,3 +54,10 @@ class ProductRepository(PaginateMixin, Repository[ProductDb]):
         )
         result = await self._session.scalars(stmt)
         return [Product.model_validate(obj) for obj in result]
+
+    async def _load(self, product_id: int) -> Product:
+        try:
+            obj = await self._read_by_id(product_id)
+            return Product.model_validate(obj)
+        except EntityNotFoundError as e:
+            raise ProductNotFoundError from e
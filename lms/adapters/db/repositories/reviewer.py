@@ -25,6 +25,8 @@ class ReviewerRepository(Repository[ReviewerDb]):
                 min_=new_reviewer.min_,
                 abs_max=new_reviewer.abs_max,
                 is_active=new_reviewer.is_active,
+                is_premium=new_reviewer.is_premium,
+                recheck=new_reviewer.recheck,
             )
             .returning(ReviewerDb)
         )
@@ -1,20 +1,40 @@
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from lms.adapters.db.cache import CacheScope
 from lms.adapters.db.models import Setting as SettingDb
 from lms.adapters.db.repositories.base import Repository
 from lms.generals.models.setting import Setting
 
 
 class SettingRepository(Repository[SettingDb]):
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, cache: CacheScope | None = None) -> None:
         super().__init__(model=SettingDb, session=session)
+        self._cache = cache or CacheScope()
 
     async def get(self, key: str) -> str | None:
-        query = select(SettingDb).filter_by(key=key)
-        setting = (await self._session.scalars(query)).first()
-        return setting.value if setting else None
+        return await self._cache.read_through(
+            "setting", ("setting",), key, lambda: self._load(key)
+        )
 
     async def update(self, key: str, value: str) -> Setting:
+        self._cache.written("setting")
         obj = await self._update(SettingDb.key == key, value=value)
         return Setting.model_validate(obj)
+
+    async def set(self, key: str, value: str, description: str = "") -> Setting:
+        self._cache.written("setting")
+        query = insert(SettingDb).values(key=key, value=value, description=description)
+        query = query.on_conflict_do_update(
+            index_elements=[SettingDb.key],
+            set_={"value": query.excluded.value, "updated_at": func.now()},
+        ).returning(SettingDb)
+        obj = (await self._session.scalars(query)).one()
+        await self._session.flush()
+        return Setting.model_validate(obj)
+
+    async def _load(self, key: str) -> str | None:
+        query = select(SettingDb).filter_by(key=key)
+        setting = (await self._session.scalars(query)).first()
+        return setting.value if setting else None
@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Iterable
 from typing import NoReturn
 
 from sqlalchemy import ScalarResult, insert
@@ -9,7 +10,7 @@ from lms.adapters.db.models import SohoAccount as SohoAccountDb
 from lms.adapters.db.repositories.base import Repository
 from lms.exceptions import LMSError, SohoNotFoundError
 from lms.exceptions.base import EntityNotFoundError
-from lms.generals.models.soho import SohoAccount
+from lms.generals.models.soho import CreateSohoAccountModel, SohoAccount
 
 log = logging.getLogger(__name__)
 
@@ -39,11 +40,21 @@ class SohoRepository(Repository[SohoAccountDb]):
             result: ScalarResult[SohoAccountDb] = await self._session.scalars(query)
             await self._session.flush()
         except IntegrityError as e:
-            await self._session.rollback()
             self._raise_error(e)
         else:
             return SohoAccount.model_validate(result.one())
 
+    async def create_many(self, accounts: Iterable[CreateSohoAccountModel]) -> int:
+        values = [account.model_dump() for account in accounts]
+        if not values:
+            return 0
+        try:
+            await self._session.execute(insert(SohoAccountDb), values)
+            await self._session.flush()
+        except IntegrityError as e:
+            self._raise_error(e)
+        return len(values)
+
     def _raise_error(self, e: DBAPIError) -> NoReturn:
         log.exception("An error has occurred")
         raise LMSError from e
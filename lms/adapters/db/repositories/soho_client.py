@@ -0,0 +1,61 @@
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lms.adapters.db.models import SohoClient as SohoClientDb
+from lms.adapters.db.repositories.base import Repository
+from lms.generals.models.soho import SohoClient
+from lms.utils.distribution.clients import SohoClientLike
+
+
+class SohoClientRepository(Repository[SohoClientDb]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(model=SohoClientDb, session=session)
+
+    async def read_by_ids(self, soho_ids: Iterable[int]) -> Sequence[SohoClient]:
+        ids = list(set(soho_ids))
+        if not ids:
+            return []
+        query = select(SohoClientDb).where(SohoClientDb.id.in_(ids))
+        objs = (await self._session.scalars(query)).all()
+        return [SohoClient.model_validate(obj) for obj in objs]
+
+    async def count(self) -> int:
+        query = select(func.count()).select_from(SohoClientDb)
+        return (await self._session.execute(query)).scalar_one()
+
+    async def upsert_many(self, clients: Iterable[SohoClientLike]) -> int:
+        values = {
+            client.id: {
+                "id": client.id,
+                "first_name": client.first_name,
+                "last_name": client.last_name,
+                "emails": list(client.emails),
+                "vk_id": client.vk_id,
+            }
+            for client in clients
+        }
+        if not values:
+            return 0
+        query = insert(SohoClientDb).values(list(values.values()))
+        query = query.on_conflict_do_update(
+            index_elements=[SohoClientDb.id],
+            set_={
+                "first_name": query.excluded.first_name,
+                "last_name": query.excluded.last_name,
+                "emails": query.excluded.emails,
+                "vk_id": query.excluded.vk_id,
+                "updated_at": func.now(),
+            },
+            where=(
+                SohoClientDb.first_name.is_distinct_from(query.excluded.first_name)
+                | SohoClientDb.last_name.is_distinct_from(query.excluded.last_name)
+                | SohoClientDb.emails.is_distinct_from(query.excluded.emails)
+                | SohoClientDb.vk_id.is_distinct_from(query.excluded.vk_id)
+            ),
+        )
+        await self._session.execute(query)
+        await self._session.flush()
+        return len(values)
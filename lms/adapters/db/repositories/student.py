@@ -1,7 +1,9 @@
 import logging
+from collections.abc import Iterable, Mapping, Sequence
 from typing import NoReturn
 
-from sqlalchemy import ScalarResult, insert, select
+from sqlalchemy import BigInteger, ScalarResult, any_, bindparam, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import DBAPIError, IntegrityError, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,7 +11,7 @@ from lms.adapters.db.models import Student as StudentDb
 from lms.adapters.db.repositories.base import Repository
 from lms.exceptions import LMSError, StudentNotFoundError, StudentVKIDAlreadyUsedError
 from lms.exceptions.base import EntityNotFoundError
-from lms.generals.models.student import Student
+from lms.generals.models.student import NewStudent, Student
 
 log = logging.getLogger(__name__)
 
@@ -23,6 +25,12 @@ class StudentRepository(Repository[StudentDb]):
         obj = (await self._session.scalars(stmt)).one_or_none()
         return Student.model_validate(obj) if obj else None
 
+    async def read_by_vk_ids(self, vk_ids: Iterable[int]) -> Mapping[int, Student]:
+        vk_ids_param = bindparam("vk_ids", list(set(vk_ids)), type_=ARRAY(BigInteger))
+        stmt = select(StudentDb).where(StudentDb.vk_id == any_(vk_ids_param))
+        objs = await self._session.scalars(stmt)
+        return {obj.vk_id: Student.model_validate(obj) for obj in objs}
+
     async def read_by_id(self, student_id: int) -> Student:
         try:
             student = await self._read_by_id(student_id)
@@ -45,19 +53,38 @@ class StudentRepository(Repository[StudentDb]):
             result: ScalarResult[StudentDb] = await self._session.scalars(query)
             await self._session.flush()
         except IntegrityError as e:
-            await self._session.rollback()
             self._raise_error(e)
         else:
             return Student.model_validate(result.one())
 
+    async def create_many(
+        self,
+        new_students: Iterable[NewStudent],
+    ) -> Sequence[Student]:
+        values = [
+            {
+                "vk_id": new_student.vk_id,
+                "first_name": new_student.first_name or "",
+                "last_name": new_student.last_name or "",
+            }
+            for new_student in new_students
+        ]
+        if not values:
+            return []
+        query = insert(StudentDb).returning(StudentDb, sort_by_parameter_order=True)
+        try:
+            objs = (await self._session.scalars(query, values)).all()
+            await self._session.flush()
+        except IntegrityError as e:
+            self._raise_error(e)
+        return [Student.model_validate(obj) for obj in objs]
+
     async def update_vk_id(self, student_id: int, vk_id: int) -> Student:
         try:
             obj = await self._update(StudentDb.id == student_id, vk_id=vk_id)
         except NoResultFound:
-            await self._session.rollback()
             raise StudentNotFoundError
         except IntegrityError as e:
-            await self._session.rollback()
             self._raise_error(e)
         return Student.model_validate(obj)
 
@@ -1,9 +1,27 @@
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import datetime
 from typing import Any
 
-from sqlalchemy import func, insert, select
-from sqlalchemy.exc import IntegrityError, NoResultFound
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    and_,
+    any_,
+    bindparam,
+    func,
+    insert,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError, MultipleResultsFound, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from lms.adapters.db.models import Offer as OfferDb
+from lms.adapters.db.models import Product as ProductDb
+from lms.adapters.db.models import SohoAccount as SohoAccountDb
+from lms.adapters.db.models import Student as StudentDb
 from lms.adapters.db.models import (
     StudentProduct as StudentProductDb,
 )
@@ -11,7 +29,12 @@ from lms.adapters.db.repositories.base import Repository
 from lms.exceptions import StudentProductNotFoundError
 from lms.exceptions.base import EntityNotFoundError
 from lms.generals.enums import TeacherType
-from lms.generals.models.student_product import StudentProduct
+from lms.generals.models.student_product import (
+    CreateStudentProductModel,
+    GradeTarget,
+    StudentEnrollment,
+    StudentProduct,
+)
 
 
 class StudentProductRepository(Repository[StudentProductDb]):
@@ -37,6 +60,66 @@ class StudentProductRepository(Repository[StudentProductDb]):
             StudentProduct.model_validate(student_product) if student_product else None
         )
 
+    async def find_by_students_and_products(
+        self,
+        student_ids: Iterable[int],
+        product_ids: Iterable[int],
+    ) -> Mapping[tuple[int, int], StudentProduct]:
+        student_ids_param = bindparam(
+            "student_ids", list(set(student_ids)), type_=ARRAY(Integer)
+        )
+        product_ids_param = bindparam(
+            "product_ids", list(set(product_ids)), type_=ARRAY(Integer)
+        )
+        query = select(StudentProductDb).where(
+            StudentProductDb.student_id == any_(student_ids_param),
+            StudentProductDb.product_id == any_(product_ids_param),
+        )
+        objs = await self._session.scalars(query)
+        return {
+            (obj.student_id, obj.product_id): StudentProduct.model_validate(obj)
+            for obj in objs
+        }
+
+    async def read_enrollments(
+        self,
+        product_ids: Iterable[int],
+        soho_ids: Iterable[int],
+        vk_ids: Iterable[int],
+    ) -> Sequence[StudentEnrollment]:
+        # Arrays are bound as single parameters, so the query stays the same
+        # for any number of submissions
+        product_ids_param = bindparam(
+            "product_ids", list(set(product_ids)), type_=ARRAY(Integer)
+        )
+        soho_ids_param = bindparam(
+            "soho_ids", list(set(soho_ids)), type_=ARRAY(BigInteger)
+        )
+        vk_ids_param = bindparam("vk_ids", list(set(vk_ids)), type_=ARRAY(BigInteger))
+        query = (
+            select(
+                SohoAccountDb.id.label("soho_id"),
+                StudentDb.id.label("student_id"),
+                StudentDb.vk_id,
+                StudentProductDb.product_id,
+                StudentProductDb.flow_id,
+                StudentProductDb.expulsion_at,
+                OfferDb.is_premium,
+            )
+            .join(StudentDb, StudentDb.id == StudentProductDb.student_id)
+            .join(OfferDb, OfferDb.id == StudentProductDb.offer_id)
+            .outerjoin(SohoAccountDb, SohoAccountDb.student_id == StudentDb.id)
+            .where(
+                StudentProductDb.product_id == any_(product_ids_param),
+                or_(
+                    SohoAccountDb.id == any_(soho_ids_param),
+                    StudentDb.vk_id == any_(vk_ids_param),
+                ),
+            )
+        )
+        rows = (await self._session.execute(query)).all()
+        return [StudentEnrollment.model_validate(row._mapping) for row in rows]
+
     async def create(
         self,
         student_id: int,
@@ -64,10 +147,26 @@ class StudentProductRepository(Repository[StudentProductDb]):
             obj = (await self._session.scalars(query)).one()
             await self._session.flush()
         except IntegrityError as e:
-            await self._session.rollback()
             self._raise_error(e)
         return StudentProduct.model_validate(obj)
 
+    async def create_many(
+        self,
+        student_products: Iterable[CreateStudentProductModel],
+    ) -> Sequence[StudentProduct]:
+        values = [student_product.model_dump() for student_product in student_products]
+        if not values:
+            return []
+        query = insert(StudentProductDb).returning(
+            StudentProductDb, sort_by_parameter_order=True
+        )
+        try:
+            objs = (await self._session.scalars(query, values)).all()
+            await self._session.flush()
+        except IntegrityError as e:
+            self._raise_error(e)
+        return [StudentProduct.model_validate(obj) for obj in objs]
+
     async def update(self, student_product_id: int, **kwargs: Any) -> StudentProduct:
         try:
             obj = await self._update(
@@ -75,13 +174,76 @@ class StudentProductRepository(Repository[StudentProductDb]):
                 **kwargs,
             )
         except NoResultFound as e:
-            await self._session.rollback()
             raise StudentProductNotFoundError from e
         return StudentProduct.model_validate(obj)
 
-    async def calculate_active_students(self, teacher_product_id: int) -> int:
-        stmt = select(func.count(StudentProductDb.id)).filter(
-            StudentProductDb.teacher_product_id == teacher_product_id,
+    async def find_for_grading(
+        self, keys: Sequence[tuple[int, int]]
+    ) -> Mapping[tuple[int, int], GradeTarget]:
+        # Resolves (soho_id, product_id) pairs down to the teacher product
+        # in one query, missing links are reported per pair
+        keys = list(dict.fromkeys(keys))
+        soho_ids_param = bindparam(
+            "soho_ids", [soho_id for soho_id, _ in keys], type_=ARRAY(BigInteger)
+        )
+        product_ids_param = bindparam(
+            "product_ids", [product_id for _, product_id in keys], type_=ARRAY(Integer)
+        )
+        requested = (
+            func.unnest(soho_ids_param, product_ids_param)
+            .table_valued("soho_id", "product_id")
+            .render_derived(name="requested")
+        )
+        query = (
+            select(
+                requested.c.soho_id,
+                requested.c.product_id,
+                SohoAccountDb.id.is_not(None).label("soho_found"),
+                ProductDb.id.is_not(None).label("product_found"),
+                StudentProductDb.id.label("student_product_id"),
+                StudentProductDb.teacher_product_id,
+            )
+            .select_from(requested)
+            .outerjoin(SohoAccountDb, SohoAccountDb.id == requested.c.soho_id)
+            .outerjoin(ProductDb, ProductDb.id == requested.c.product_id)
+            .outerjoin(
+                StudentProductDb,
+                and_(
+                    StudentProductDb.student_id == SohoAccountDb.student_id,
+                    StudentProductDb.product_id == ProductDb.id,
+                ),
+            )
+        )
+        targets: dict[tuple[int, int], GradeTarget] = {}
+        for row in (await self._session.execute(query)).mappings():
+            key = (row["soho_id"], row["product_id"])
+            if key in targets:
+                # Never picks one of several student products, as the single
+                # pair lookup with one_or_none() did not either
+                raise MultipleResultsFound(
+                    f"Several student products for soho {key[0]}, product {key[1]}"
+                )
+            targets[key] = GradeTarget.model_validate(row)
+        return targets
+
+    async def set_teacher_grades(
+        self, grades: Mapping[int, int], graded_at: datetime
+    ) -> None:
+        # student_product_id -> grade
+        if not grades:
+            return
+        graded = (
+            func.unnest(
+                bindparam("ids", list(grades), type_=ARRAY(Integer)),
+                bindparam("grades", list(grades.values()), type_=ARRAY(Integer)),
+            )
+            .table_valued("id", "grade")
+            .render_derived(name="graded")
+        )
+        stmt = (
+            update(StudentProductDb)
+            .where(StudentProductDb.id == graded.c.id)
+            .values(teacher_grade=graded.c.grade, teacher_graded_at=graded_at)
+            .execution_options(synchronize_session=False)
         )
-        res = await self._session.scalar(stmt)
-        return res if res is not None else 0
+        await self._session.execute(stmt)
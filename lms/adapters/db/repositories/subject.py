@@ -1,21 +1,32 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Mapping, Sequence
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from lms.adapters.db.cache import CacheScope
+from lms.adapters.db.identity_map import IdentityMap
 from lms.adapters.db.models import Product as ProductDb
 from lms.adapters.db.models import Subject as SubjectDb
 from lms.adapters.db.repositories.base import PaginateMixin, Repository
 from lms.exceptions import EntityNotFoundError, SubjectNotFoundError
 from lms.generals.models.pagination import Pagination
+from lms.generals.models.product import Product
 from lms.generals.models.subject import ShortSubject, Subject
 
 
 class SubjectRepository(PaginateMixin, Repository[SubjectDb]):
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        identity_map: IdentityMap | None = None,
+        cache: CacheScope | None = None,
+    ) -> None:
         super().__init__(model=SubjectDb, session=session)
+        self._identity_map = identity_map or IdentityMap()
+        self._cache = cache or CacheScope()
 
     async def paginate(self, page: int, page_size: int) -> Pagination[ShortSubject]:
         query = select(SubjectDb).order_by(SubjectDb.id)
@@ -27,22 +38,23 @@ class SubjectRepository(PaginateMixin, Repository[SubjectDb]):
         )
 
     async def read_by_id(self, subject_id: int) -> Subject:
-        try:
-            obj = await self._read_by_id(subject_id)
-        except EntityNotFoundError as e:
-            raise SubjectNotFoundError from e
-        return Subject.model_validate(obj)
+        if subject := self._identity_map.get(Subject, subject_id):
+            return subject
+        subject = await self._cache.read_through(
+            "subject", ("subject",), subject_id, lambda: self._load(subject_id)
+        )
+        return self._identity_map.add(subject)
 
     async def update(self, id_: int, **kwargs: Any) -> Subject:
+        self._cache.written("subject")
         try:
             obj = await self._update(
                 SubjectDb.id == id_,
                 **kwargs,
             )
         except NoResultFound as e:
-            await self._session.rollback()
             raise SubjectNotFoundError from e
-        return Subject.model_validate(obj)
+        return self._identity_map.add(Subject.model_validate(obj))
 
     async def read_all(self) -> Sequence[Subject]:
         query = select(SubjectDb).order_by(SubjectDb.id)
@@ -50,6 +62,40 @@ class SubjectRepository(PaginateMixin, Repository[SubjectDb]):
         return [Subject.model_validate(obj) for obj in result]
 
     async def find_by_product(self, product_id: int) -> Subject:
+        product = self._identity_map.get(Product, product_id)
+        if product and (subject := self._identity_map.get(Subject, product.subject_id)):
+            return subject
+        subject = await self._cache.read_through(
+            "subject_by_product",
+            ("product", "subject"),
+            product_id,
+            lambda: self._load_by_product(product_id),
+        )
+        return self._identity_map.add(subject)
+
+    async def find_by_products(
+        self, product_ids: Iterable[int]
+    ) -> Mapping[int, Subject]:
+        product_ids_param = bindparam(
+            "product_ids", list(set(product_ids)), type_=ARRAY(Integer)
+        )
+        stmt = (
+            select(ProductDb.id, SubjectDb)
+            .select_from(SubjectDb)
+            .join(ProductDb, SubjectDb.id == ProductDb.subject_id)
+            .where(ProductDb.id == any_(product_ids_param))
+        )
+        rows = (await self._session.execute(stmt)).all()
+        return {product_id: Subject.model_validate(obj) for product_id, obj in rows}
+
+    async def _load(self, subject_id: int) -> Subject:
+        try:
+            obj = await self._read_by_id(subject_id)
+        except EntityNotFoundError as e:
+            raise SubjectNotFoundError from e
+        return Subject.model_validate(obj)
+
+    async def _load_by_product(self, product_id: int) -> Subject:
         stmt = (
             select(SubjectDb)
             .join(ProductDb, SubjectDb.id == ProductDb.subject_id)
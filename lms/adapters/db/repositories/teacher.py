@@ -2,16 +2,23 @@ from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from lms.adapters.db.identity_map import IdentityMap
 from lms.adapters.db.models import Teacher as TeacherDb
 from lms.adapters.db.models import TeacherProduct as TeacherProductDb
 from lms.adapters.db.repositories.base import Repository
 from lms.exceptions import TeacherNotFoundError
 from lms.generals.models.teacher import Teacher
+from lms.generals.models.teacher_product import TeacherProduct
 
 
 class TeacherRepository(Repository[TeacherDb]):
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        identity_map: IdentityMap | None = None,
+    ) -> None:
         super().__init__(model=TeacherDb, session=session)
+        self._identity_map = identity_map or IdentityMap()
 
     async def read_by_vk_id(self, vk_id: int) -> Teacher:
         stmt = select(TeacherDb).filter_by(vk_id=vk_id)
@@ -19,12 +26,17 @@ class TeacherRepository(Repository[TeacherDb]):
             obj = (await self._session.scalars(stmt)).one()
         except NoResultFound as e:
             raise TeacherNotFoundError from e
-        return Teacher.model_validate(obj)
+        return self._identity_map.add(Teacher.model_validate(obj))
 
     async def find_teacher_by_teacher_product(
         self,
         teacher_product_id: int,
     ) -> Teacher:
+        teacher_product = self._identity_map.get(TeacherProduct, teacher_product_id)
+        if teacher_product and (
+            teacher := self._identity_map.get(Teacher, teacher_product.teacher_id)
+        ):
+            return teacher
         stmt = (
             select(TeacherDb)
             .join(TeacherProductDb, TeacherDb.id == TeacherProductDb.teacher_id)
@@ -34,4 +46,4 @@ class TeacherRepository(Repository[TeacherDb]):
             obj = (await self._session.scalars(stmt)).one()
         except NoResultFound as e:
             raise TeacherNotFoundError from e
-        return Teacher.model_validate(obj)
+        return self._identity_map.add(Teacher.model_validate(obj))
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from datetime import datetime
 from typing import Any
 
@@ -7,12 +8,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from lms.adapters.db.models import TeacherAssignment
 from lms.adapters.db.repositories.base import Repository
+from lms.adapters.db.repositories.teacher_product_stats import (
+    ASSIGNED,
+    REMOVED,
+    StatsChange,
+    TeacherProductStatsRepository,
+)
 from lms.exceptions import TeacherAssignmentNotFoundError
 
 
 class TeacherAssignmentRepository(Repository[TeacherAssignment]):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(model=TeacherAssignment, session=session)
+        self._stats = TeacherProductStatsRepository(session=session)
 
     async def create(
         self,
@@ -32,12 +40,32 @@ class TeacherAssignmentRepository(Repository[TeacherAssignment]):
         query = insert(TeacherAssignment).values(**values).returning(TeacherAssignment)
         try:
             result: ScalarResult[TeacherAssignment] = await self._session.scalars(query)
+            obj = result.one()
             await self._session.flush()
         except IntegrityError as e:
-            await self._session.rollback()
             self._raise_error(e)
-        else:
-            return result.one()
+        change = ASSIGNED if removed_at is None else StatsChange(total=1, removal=1)
+        await self._stats.apply([(teacher_product_id, change)])
+        return obj
+
+    async def create_many(self, assignments: Mapping[int, int]) -> int:
+        # student_product_id -> teacher_product_id
+        values = [
+            {
+                "student_product_id": student_product_id,
+                "teacher_product_id": teacher_product_id,
+            }
+            for student_product_id, teacher_product_id in assignments.items()
+        ]
+        if not values:
+            return 0
+        try:
+            await self._session.execute(insert(TeacherAssignment), values)
+            await self._session.flush()
+        except IntegrityError as e:
+            self._raise_error(e)
+        await self._stats.apply((id_, ASSIGNED) for id_ in assignments.values())
+        return len(values)
 
     async def update(
         self,
@@ -47,7 +75,6 @@ class TeacherAssignmentRepository(Repository[TeacherAssignment]):
         try:
             return await self._update(*args, **kwargs)
         except NoResultFound as e:
-            await self._session.rollback()
             raise TeacherAssignmentNotFoundError from e
 
     async def expulse_student(
@@ -60,6 +87,7 @@ class TeacherAssignmentRepository(Repository[TeacherAssignment]):
             TeacherAssignment.removed_at.is_(None),
             removed_at=now,
         )
+        await self._stats.apply([(teacher_product_id, REMOVED)])
 
     async def expulse_student_safety(
         self,
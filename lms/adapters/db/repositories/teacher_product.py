@@ -1,31 +1,78 @@
-from sqlalchemy import desc, select, text, update
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+
+from sqlalchemy import (
+    Integer,
+    Select,
+    any_,
+    bindparam,
+    case,
+    desc,
+    func,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from lms.adapters.db.identity_map import IdentityMap
+from lms.adapters.db.models import StudentProduct as StudentProductDb
+from lms.adapters.db.models import Teacher as TeacherDb
 from lms.adapters.db.models import (
     TeacherProduct as TeacherProductDb,
 )
 from lms.adapters.db.models import (
     TeacherProductFlow as TeacherProductFlowDb,
 )
+from lms.adapters.db.models import (
+    TeacherProductStats as TeacherProductStatsDb,
+)
 from lms.adapters.db.repositories.base import Repository
+from lms.adapters.db.repositories.teacher_product_stats import enroll_rating_coef
 from lms.exceptions import TeacherProductNotFoundError
 from lms.exceptions.base import EntityNotFoundError
 from lms.generals.enums import TeacherType
+from lms.generals.models.teacher import Teacher
 from lms.generals.models.teacher_dashboard import TeacherDashboardRow
-from lms.generals.models.teacher_product import TeacherProduct
+from lms.generals.models.teacher_product import EnrollCandidate, TeacherProduct
+
+# The rating column properties count teacher_assignment rows with correlated
+# subqueries, enrollment reads the counters from teacher_product_stats instead
+_WITHOUT_RATING = tuple(
+    defer(column)
+    for column in (
+        TeacherProductDb.actual_students,
+        TeacherProductDb.total_students,
+        TeacherProductDb.removal_students,
+        TeacherProductDb.fullness,
+        TeacherProductDb.removability,
+        TeacherProductDb.rating_coef,
+    )
+)
 
 
 class TeacherProductRepository(Repository[TeacherProductDb]):
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        identity_map: IdentityMap | None = None,
+    ) -> None:
         super().__init__(model=TeacherProductDb, session=session)
+        self._identity_map = identity_map or IdentityMap()
 
     async def read_by_id(self, teacher_product_id: int) -> TeacherProduct:
+        if teacher_product := self._identity_map.get(
+            TeacherProduct, teacher_product_id
+        ):
+            return teacher_product
         try:
             obj = await self._read_by_id(teacher_product_id)
         except EntityNotFoundError as e:
             raise TeacherProductNotFoundError from e
-        return TeacherProduct.model_validate(obj)
+        return self._load(obj)
 
     async def find_by_teacher_and_product(
         self, teacher_id: int, product_id: int
@@ -37,16 +84,19 @@ class TeacherProductRepository(Repository[TeacherProductDb]):
             obj = (await self._session.scalars(stmt)).one()
         except NoResultFound as e:
             raise TeacherProductNotFoundError from e
-        return TeacherProduct.model_validate(obj)
+        return self._load(obj)
 
-    async def get_for_enroll(
+    async def reserve_for_enroll(
         self,
         product_id: int,
         teacher_type: TeacherType,
         flow_id: int | None = None,
     ) -> TeacherProduct:
+        # The picked row stays locked until commit, concurrent enrollments skip
+        # it and take the next best teacher instead of all reading the same
+        # rating. Only when every candidate is taken do they wait for a lock
         if flow_id is not None:
-            teacher_product = await self._search_with_flow(
+            teacher_product = await self._reserve(
                 product_id=product_id,
                 teacher_type=teacher_type,
                 flow_id=flow_id,
@@ -54,69 +104,204 @@ class TeacherProductRepository(Repository[TeacherProductDb]):
             if teacher_product is not None:
                 return teacher_product
 
-        return await self._search_without_flow(
+        teacher_product = await self._reserve(
             product_id=product_id, teacher_type=teacher_type
         )
+        if teacher_product is None:
+            raise TeacherProductNotFoundError
+        return teacher_product
 
-    async def _search_with_flow(
-        self, product_id: int, teacher_type: TeacherType, flow_id: int
-    ) -> TeacherProduct | None:
+    async def reserve_candidates(
+        self, product_ids: Iterable[int]
+    ) -> Sequence[EnrollCandidate]:
+        product_ids_param = bindparam(
+            "product_ids", list(set(product_ids)), type_=ARRAY(Integer)
+        )
+        # Locked in id order before the counters are read, so a concurrent
+        # batch for the same products waits and then sees this one's students
+        await self._session.execute(
+            select(TeacherProductDb.id)
+            .where(
+                TeacherProductDb.product_id == any_(product_ids_param),
+                TeacherProductDb.max_students > 0,
+                TeacherProductDb.is_active.is_(True),
+            )
+            .order_by(TeacherProductDb.id)
+            .with_for_update(key_share=True)
+        )
+        flow_ids = (
+            select(func.array_agg(TeacherProductFlowDb.flow_id))
+            .where(TeacherProductFlowDb.teacher_product_id == TeacherProductDb.id)
+            .scalar_subquery()
+        )
         query = (
-            select(TeacherProductDb)
-            .join(
-                TeacherProductFlowDb,
-                TeacherProductFlowDb.teacher_product_id == TeacherProductDb.id,
+            select(
+                TeacherProductDb.id,
+                TeacherProductDb.teacher_id,
+                TeacherProductDb.product_id,
+                TeacherProductDb.type,
+                TeacherProductDb.max_students,
+                TeacherProductDb.average_grade,
+                func.coalesce(TeacherProductStatsDb.actual_students, 0).label(
+                    "actual_students"
+                ),
+                func.coalesce(TeacherProductStatsDb.total_students, 0).label(
+                    "total_students"
+                ),
+                func.coalesce(TeacherProductStatsDb.removal_students, 0).label(
+                    "removal_students"
+                ),
+                flow_ids.label("flow_ids"),
+                TeacherDb.vk_id.label("teacher_vk_id"),
+                func.concat(TeacherDb.first_name, " ", TeacherDb.last_name).label(
+                    "teacher_name"
+                ),
+            )
+            .join(TeacherDb, TeacherDb.id == TeacherProductDb.teacher_id)
+            .outerjoin(
+                TeacherProductStatsDb,
+                TeacherProductStatsDb.teacher_product_id == TeacherProductDb.id,
             )
             .where(
-                TeacherProductDb.product_id == product_id,
-                TeacherProductDb.type == teacher_type,
+                TeacherProductDb.product_id == any_(product_ids_param),
                 TeacherProductDb.max_students > 0,
                 TeacherProductDb.is_active.is_(True),
-                TeacherProductFlowDb.flow_id == flow_id,
             )
-            .order_by(desc(TeacherProductDb.rating_coef))
-            .limit(1)
+            .order_by(TeacherProductDb.id)
         )
+        rows = (await self._session.execute(query)).all()
+        return [
+            EnrollCandidate.model_validate(
+                {**row._mapping, "flow_ids": row.flow_ids or ()}
+            )
+            for row in rows
+        ]
 
-        obj = (await self._session.scalars(query)).first()
-        return TeacherProduct.model_validate(obj) if obj else None
+    async def _reserve(
+        self,
+        product_id: int,
+        teacher_type: TeacherType,
+        flow_id: int | None = None,
+    ) -> TeacherProduct | None:
+        for skip_locked in (True, False):
+            query = self._search_query(
+                product_id=product_id,
+                teacher_type=teacher_type,
+                flow_id=flow_id,
+            ).with_for_update(
+                of=TeacherProductDb, key_share=True, skip_locked=skip_locked
+            )
+            obj = (await self._session.scalars(query)).first()
+            if obj is not None:
+                return self._load(obj)
+        return None
 
-    async def _search_without_flow(
+    def _search_query(
         self,
         product_id: int,
         teacher_type: TeacherType,
-    ) -> TeacherProduct:
+        flow_id: int | None,
+    ) -> Select[tuple[TeacherProductDb]]:
         query = (
             select(TeacherProductDb)
+            .options(*_WITHOUT_RATING)
+            .outerjoin(
+                TeacherProductStatsDb,
+                TeacherProductStatsDb.teacher_product_id == TeacherProductDb.id,
+            )
             .where(
                 TeacherProductDb.product_id == product_id,
                 TeacherProductDb.type == teacher_type,
                 TeacherProductDb.max_students > 0,
                 TeacherProductDb.is_active.is_(True),
             )
-            .order_by(desc(TeacherProductDb.rating_coef))
+            .order_by(desc(enroll_rating_coef()), TeacherProductDb.id)
             .limit(1)
         )
+        if flow_id is not None:
+            query = query.join(
+                TeacherProductFlowDb,
+                TeacherProductFlowDb.teacher_product_id == TeacherProductDb.id,
+            ).where(TeacherProductFlowDb.flow_id == flow_id)
+        return query
 
-        obj = (await self._session.scalars(query)).first()
-        if obj is None:
-            raise TeacherProductNotFoundError
-        return TeacherProduct.model_validate(obj)
-
-    async def update_average_grade(
-        self, teacher_product_id: int, average_grade: float, counter: int
-    ) -> None:
+    async def add_grades(self, grades: Iterable[tuple[int, int]]) -> None:
+        # (teacher_product_id, grade) pairs are folded into the running mean
+        # by the database, so concurrent grades do not overwrite each other
+        sums: defaultdict[int, int] = defaultdict(int)
+        counts: Counter[int] = Counter()
+        for teacher_product_id, grade in grades:
+            sums[teacher_product_id] += grade
+            counts[teacher_product_id] += 1
+        if not counts:
+            return
+        ids_param = bindparam("ids", list(counts), type_=ARRAY(Integer))
+        counter = TeacherProductDb.grade_counter + case(
+            counts, value=TeacherProductDb.id
+        )
         stmt = (
             update(TeacherProductDb)
-            .where(
-                TeacherProductDb.id == teacher_product_id,
-            )
+            .where(TeacherProductDb.id == any_(ids_param))
             .values(
-                average_grade=average_grade,
+                average_grade=(
+                    TeacherProductDb.average_grade * TeacherProductDb.grade_counter
+                    + case(sums, value=TeacherProductDb.id)
+                )
+                / counter,
                 grade_counter=counter,
             )
+            .execution_options(synchronize_session=False)
         )
         await self._session.execute(stmt)
+        for id_ in counts:
+            self._identity_map.discard(TeacherProduct, id_)
+
+    async def add_active_students(
+        self, changes: Mapping[int, int]
+    ) -> Mapping[int, int]:
+        # teacher_product_id -> change, returns the updated counters
+        changes = {id_: change for id_, change in changes.items() if change}
+        if not changes:
+            return {}
+        ids_param = bindparam("ids", list(changes), type_=ARRAY(Integer))
+        stmt = (
+            update(TeacherProductDb)
+            .where(TeacherProductDb.id == any_(ids_param))
+            .values(
+                active_students=TeacherProductDb.active_students
+                + case(changes, value=TeacherProductDb.id)
+            )
+            .returning(TeacherProductDb.id, TeacherProductDb.active_students)
+        )
+        active_students: dict[int, int] = dict(
+            (await self._session.execute(stmt)).tuples().all()
+        )
+        for id_, count in active_students.items():
+            if teacher_product := self._identity_map.get(TeacherProduct, id_):
+                self._identity_map.add(
+                    teacher_product.model_copy(update={"active_students": count})
+                )
+        return active_students
+
+    async def reconcile_active_students(self) -> int:
+        counted = (
+            select(func.count())
+            .where(
+                StudentProductDb.teacher_product_id == TeacherProductDb.id,
+                StudentProductDb.expulsion_at.is_(None),
+            )
+            .scalar_subquery()
+        )
+        stmt = (
+            update(TeacherProductDb)
+            .where(TeacherProductDb.active_students != counted)
+            .values(active_students=counted)
+            .returning(TeacherProductDb.id)
+        )
+        fixed = (await self._session.scalars(stmt)).all()
+        for id_ in fixed:
+            self._identity_map.discard(TeacherProduct, id_)
+        return len(fixed)
 
     async def get_dashboard_data(self, product_id: int) -> list[TeacherDashboardRow]:
         stmt = """
@@ -127,10 +312,7 @@ class TeacherProductRepository(Repository[TeacherProductDb]):
                 teacher_product.is_active,
                 teacher_product.type,
                 teacher_product.max_students,
-                CASE
-                    WHEN tmp.filled IS NOT NULL THEN tmp.filled
-                    ELSE 0
-                END AS filled,
+                teacher_product.active_students,
                 teacher_product.average_grade,
                 teacher_product.grade_counter,
                 CASE
@@ -139,12 +321,6 @@ class TeacherProductRepository(Repository[TeacherProductDb]):
                 END AS flows
             FROM teacher_product
             JOIN teacher ON teacher_product.teacher_id = teacher.id
-            LEFT JOIN (
-                SELECT
-                    teacher_product_id,
-                    COUNT(*) AS filled
-                FROM student_product GROUP BY teacher_product_id
-            ) tmp ON teacher_product.id = tmp.teacher_product_id
             LEFT JOIN (
                 SELECT
                     teacher_product_id,
@@ -157,3 +333,9 @@ class TeacherProductRepository(Repository[TeacherProductDb]):
         """
         result = await self._session.execute(text(stmt), {"product_id": product_id})
         return [TeacherDashboardRow(*r) for r in result]
+
+    def _load(self, obj: TeacherProductDb) -> TeacherProduct:
+        # The teacher relationship is loaded with a join, keep it for
+        # TeacherRepository.find_teacher_by_teacher_product
+        self._identity_map.add(Teacher.model_validate(obj.teacher))
+        return self._identity_map.add(TeacherProduct.model_validate(obj))
@@ -0,0 +1,137 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import ColumnElement, case, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lms.adapters.db.models import TeacherAssignment as TeacherAssignmentDb
+from lms.adapters.db.models import TeacherProduct as TeacherProductDb
+from lms.adapters.db.models import TeacherProductStats as TeacherProductStatsDb
+from lms.adapters.db.repositories.base import Repository
+
+
+@dataclass(frozen=True, slots=True)
+class StatsChange:
+    actual: int = 0
+    total: int = 0
+    removal: int = 0
+
+    def __add__(self, other: "StatsChange") -> "StatsChange":
+        return StatsChange(
+            actual=self.actual + other.actual,
+            total=self.total + other.total,
+            removal=self.removal + other.removal,
+        )
+
+
+ASSIGNED = StatsChange(actual=1, total=1)
+REMOVED = StatsChange(actual=-1, removal=1)
+
+_COUNTERS = ("actual_students", "total_students", "removal_students")
+
+
+def rating_coef(
+    average_grade: Any,
+    max_students: Any,
+    actual_students: Any,
+    total_students: Any,
+    removal_students: Any,
+) -> ColumnElement[float]:
+    # Same formula as TeacherProduct.rating_coef over stored counters
+    fullness = case(
+        (max_students > 0, actual_students / max_students),
+        else_=1,
+    )
+    removability = case(
+        (
+            total_students > 0,
+            (total_students - removal_students) / total_students,
+        ),
+        else_=1.0,
+    )
+    return case(
+        (average_grade == 0, 5 * (1 - fullness) * removability),
+        else_=average_grade * (1 - fullness) * removability,
+    )
+
+
+def enroll_rating_coef() -> ColumnElement[float]:
+    # Teacher products without assignments have no stats row yet
+    return rating_coef(
+        TeacherProductDb.average_grade,
+        TeacherProductDb.max_students,
+        func.coalesce(TeacherProductStatsDb.actual_students, 0),
+        func.coalesce(TeacherProductStatsDb.total_students, 0),
+        func.coalesce(TeacherProductStatsDb.removal_students, 0),
+    )
+
+
+class TeacherProductStatsRepository(Repository[TeacherProductStatsDb]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(model=TeacherProductStatsDb, session=session)
+
+    async def apply(self, changes: Iterable[tuple[int, StatsChange]]) -> None:
+        merged: defaultdict[int, StatsChange] = defaultdict(StatsChange)
+        for teacher_product_id, change in changes:
+            merged[teacher_product_id] += change
+        if not merged:
+            return
+        # Sorted so concurrent enrollments lock the rows in the same order
+        stmt = insert(TeacherProductStatsDb).values(
+            [
+                {
+                    "teacher_product_id": id_,
+                    "actual_students": change.actual,
+                    "total_students": change.total,
+                    "removal_students": change.removal,
+                }
+                for id_, change in sorted(merged.items())
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TeacherProductStatsDb.teacher_product_id],
+            set_={
+                name: getattr(TeacherProductStatsDb, name) + stmt.excluded[name]
+                for name in _COUNTERS
+            }
+            | {"updated_at": func.now()},
+        )
+        await self._session.execute(stmt)
+
+    async def recalculate(self) -> None:
+        # Rebuilds every row from teacher_assignment: picks up assignments
+        # changed outside the repository and lets old removals leave the
+        # one month window
+        counts = (
+            select(
+                TeacherAssignmentDb.teacher_product_id,
+                func.count()
+                .filter(TeacherAssignmentDb.removed_at.is_(None))
+                .label("actual_students"),
+                func.count().label("total_students"),
+                func.count()
+                .filter(
+                    TeacherAssignmentDb.removed_at
+                    > (func.current_timestamp() - text("(interval '1 month')"))
+                )
+                .label("removal_students"),
+            )
+            .group_by(TeacherAssignmentDb.teacher_product_id)
+            .subquery()
+        )
+        source = select(
+            TeacherProductDb.id,
+            *(func.coalesce(counts.c[name], 0) for name in _COUNTERS),
+        ).outerjoin(counts, counts.c.teacher_product_id == TeacherProductDb.id)
+        stmt = insert(TeacherProductStatsDb).from_select(
+            ["teacher_product_id", *_COUNTERS], source
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TeacherProductStatsDb.teacher_product_id],
+            set_={name: stmt.excluded[name] for name in _COUNTERS}
+            | {"updated_at": func.now()},
+        )
+        await self._session.execute(stmt)
@@ -4,49 +4,109 @@ from typing import Self
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from lms.adapters.db.cache import CacheScope, EntityCache
+from lms.adapters.db.identity_map import IdentityMap
 from lms.adapters.db.repositories.distribution import DistributionRepository
+from lms.adapters.db.repositories.distribution_assignment import (
+    DistributionAssignmentRepository,
+)
+from lms.adapters.db.repositories.distribution_job import DistributionJobRepository
 from lms.adapters.db.repositories.file import FileRepository
 from lms.adapters.db.repositories.flow import FlowRepository
+from lms.adapters.db.repositories.idempotency_key import IdempotencyKeyRepository
 from lms.adapters.db.repositories.offer import OfferRepository
+from lms.adapters.db.repositories.outbox import OutboxRepository
 from lms.adapters.db.repositories.product import ProductRepository
 from lms.adapters.db.repositories.reviewer import ReviewerRepository
 from lms.adapters.db.repositories.setting import SettingRepository
 from lms.adapters.db.repositories.soho import SohoRepository
+from lms.adapters.db.repositories.soho_client import SohoClientRepository
 from lms.adapters.db.repositories.student import StudentRepository
 from lms.adapters.db.repositories.student_product import StudentProductRepository
 from lms.adapters.db.repositories.subject import SubjectRepository
 from lms.adapters.db.repositories.teacher import TeacherRepository
 from lms.adapters.db.repositories.teacher_assignment import TeacherAssignmentRepository
 from lms.adapters.db.repositories.teacher_product import TeacherProductRepository
+from lms.adapters.db.repositories.teacher_product_stats import (
+    TeacherProductStatsRepository,
+)
 
 
 class UnitOfWork:
-    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        cache: EntityCache | None = None,
+    ) -> None:
         self._sessionmaker = sessionmaker
+        self._entity_cache = cache
+
+    def fork(self) -> "UnitOfWork":
+        # Another unit of work on the same database and cache, for work that
+        # commits on its own
+        return UnitOfWork(sessionmaker=self._sessionmaker, cache=self._entity_cache)
 
     @asynccontextmanager
     async def start(self) -> AsyncIterator[Self]:
         async with self._sessionmaker() as session:
             self._session = session
+            self.identity_map = IdentityMap()
+            self.cache = CacheScope(self._entity_cache)
             self.distribution = DistributionRepository(session=self._session)
+            self.distribution_assignment = DistributionAssignmentRepository(
+                session=self._session
+            )
+            self.distribution_job = DistributionJobRepository(session=self._session)
             self.file = FileRepository(session=self._session)
-            self.flow = FlowRepository(session=self._session)
-            self.offer = OfferRepository(session=self._session)
-            self.product = ProductRepository(session=self._session)
+            self.flow = FlowRepository(session=self._session, cache=self.cache)
+            self.idempotency_key = IdempotencyKeyRepository(session=self._session)
+            self.offer = OfferRepository(
+                session=self._session,
+                identity_map=self.identity_map,
+                cache=self.cache,
+            )
+            self.outbox = OutboxRepository(session=self._session)
+            self.product = ProductRepository(session=self._session, cache=self.cache)
             self.reviewer = ReviewerRepository(session=self._session)
-            self.setting = SettingRepository(session=self._session)
+            self.setting = SettingRepository(session=self._session, cache=self.cache)
             self.soho = SohoRepository(session=self._session)
+            self.soho_client = SohoClientRepository(session=self._session)
             self.student = StudentRepository(session=self._session)
             self.student_product = StudentProductRepository(session=self._session)
-            self.subject = SubjectRepository(session=self._session)
-            self.teacher = TeacherRepository(session=self._session)
+            self.subject = SubjectRepository(
+                session=self._session,
+                identity_map=self.identity_map,
+                cache=self.cache,
+            )
+            self.teacher = TeacherRepository(
+                session=self._session, identity_map=self.identity_map
+            )
             self.teacher_assignment = TeacherAssignmentRepository(session=self._session)
-            self.teacher_product = TeacherProductRepository(session=self._session)
+            self.teacher_product = TeacherProductRepository(
+                session=self._session, identity_map=self.identity_map
+            )
+            self.teacher_product_stats = TeacherProductStatsRepository(
+                session=self._session
+            )
             yield self
             await self._session.rollback()
 
+    @asynccontextmanager
+    async def savepoint(self) -> AsyncIterator[None]:
+        try:
+            async with self._session.begin_nested():
+                yield
+        except BaseException:
+            # Entities read inside may hold the changes just rolled back
+            self.identity_map.clear()
+            raise
+
     async def rollback(self) -> None:
         await self._session.rollback()
+        self.identity_map.clear()
+        self.cache.rollback()
 
     async def commit(self) -> None:
         await self._session.commit()
+        self.identity_map.clear()
+        self.cache.commit()
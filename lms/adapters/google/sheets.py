@@ -0,0 +1,142 @@
+import random
+from collections.abc import Sequence
+from typing import Any
+
+import orjson
+from google_api_service_helper import GoogleSheets
+from googleapiclient.http import HttpRequest
+
+MIN_ROW_COUNT = 200
+MIN_COLUMN_COUNT = 200
+TAB_COLOR = {"red": 1, "green": 1, "blue": 0}
+
+
+def new_sheet_id() -> int:
+    # The sheetId is picked on the client, so the requests that fill the new
+    # sheet can address it within the same batchUpdate
+    return random.randrange(1, 2**31)
+
+
+def new_sheet_requests(
+    sheet_id: int,
+    title: str,
+    index: int,
+    columns: Sequence[Sequence[Any]],
+    header_rows: int = 0,
+) -> list[dict[str, Any]]:
+    requests = [
+        add_sheet_request(
+            sheet_id=sheet_id,
+            title=title,
+            index=index,
+            row_count=max(MIN_ROW_COUNT, max(map(len, columns), default=0)),
+            column_count=max(MIN_COLUMN_COUNT, len(columns)),
+        ),
+        update_cells_request(sheet_id=sheet_id, columns=columns),
+    ]
+    if header_rows:
+        requests.append(bold_rows_request(sheet_id=sheet_id, rows=header_rows))
+    return requests
+
+
+def encode_requests(requests: Sequence[dict[str, Any]]) -> bytes:
+    return orjson.dumps({"requests": requests})
+
+
+def batch_update_encoded(
+    google_sheets: GoogleSheets,
+    spreadsheet_id: str,
+    body: bytes,
+) -> None:
+    # The body comes from encode_requests, possibly built in another process.
+    # The client only builds the request for it: uri, auth and headers of a
+    # batchUpdate with an empty body, sent with the encoded one instead
+    template = google_sheets.service.spreadsheets().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body={},
+    )
+    HttpRequest(
+        template.http,
+        template.postproc,
+        template.uri,
+        method=template.method,
+        body=body,
+        headers={
+            name: value
+            for name, value in template.headers.items()
+            if name != "content-length"
+        },
+        methodId=template.methodId,
+    ).execute()
+
+
+def add_sheet_request(
+    sheet_id: int,
+    title: str,
+    index: int,
+    row_count: int,
+    column_count: int,
+) -> dict[str, Any]:
+    return {
+        "addSheet": {
+            "properties": {
+                "sheetId": sheet_id,
+                "title": title,
+                "index": index,
+                "tabColor": TAB_COLOR,
+                "gridProperties": {
+                    "rowCount": row_count,
+                    "columnCount": column_count,
+                },
+            }
+        }
+    }
+
+
+def update_cells_request(
+    sheet_id: int,
+    columns: Sequence[Sequence[Any]],
+) -> dict[str, Any]:
+    height = max(map(len, columns), default=0)
+    rows = [
+        {
+            "values": [
+                cell_data(column[i] if i < len(column) else None) for column in columns
+            ]
+        }
+        for i in range(height)
+    ]
+    return {
+        "updateCells": {
+            "start": {"sheetId": sheet_id, "rowIndex": 0, "columnIndex": 0},
+            "rows": rows,
+            "fields": "userEnteredValue",
+        }
+    }
+
+
+def bold_rows_request(sheet_id: int, rows: int) -> dict[str, Any]:
+    return {
+        "repeatCell": {
+            "range": {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": rows},
+            "cell": {"userEnteredFormat": {"textFormat": {"bold": True}}},
+            "fields": "userEnteredFormat.textFormat.bold",
+        }
+    }
+
+
+def cell_data(value: Any) -> dict[str, Any]:
+    # Mirrors valueInputOption=USER_ENTERED for the values we write:
+    # formulas, numbers and digit-only strings such as VK ids.
+    if value is None or value == "":
+        return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, int | float):
+        return {"userEnteredValue": {"numberValue": value}}
+    value = str(value)
+    if value.startswith("="):
+        return {"userEnteredValue": {"formulaValue": value}}
+    if value.isdigit():
+        return {"userEnteredValue": {"numberValue": int(value)}}
+    return {"userEnteredValue": {"stringValue": value}}
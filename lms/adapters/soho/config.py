@@ -5,3 +5,18 @@ from os import environ
 @dataclass(frozen=True, kw_only=True, slots=True)
 class SohoConfig:
     token: str = field(default_factory=lambda: environ["APP_SOHO_API_TOKEN"])
+    max_concurrency: int = field(
+        default_factory=lambda: int(environ.get("APP_SOHO_MAX_CONCURRENCY", "4"))
+    )
+    rate_limit: float = field(
+        default_factory=lambda: float(environ.get("APP_SOHO_RATE_LIMIT", "5"))
+    )
+    max_tries: int = field(
+        default_factory=lambda: int(environ.get("APP_SOHO_MAX_TRIES", "3"))
+    )
+    retry_pause: float = field(
+        default_factory=lambda: float(environ.get("APP_SOHO_RETRY_PAUSE", "0.5"))
+    )
+    max_retry_pause: float = field(
+        default_factory=lambda: float(environ.get("APP_SOHO_MAX_RETRY_PAUSE", "10"))
+    )
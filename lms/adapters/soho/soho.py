@@ -1,16 +1,21 @@
 import asyncio
+from collections.abc import Sequence
 from datetime import datetime
 from http import HTTPStatus
 from types import MappingProxyType
 from typing import ClassVar
 
-from aiohttp import ClientSession
+from aiohttp import ClientError, ClientSession
 from aiomisc import asyncretry
 from asyncly import BaseHttpClient, ResponseHandlersType, TimeoutType
+from asyncly.client.handlers.exceptions import UnhandledStatusException
 from asyncly.client.handlers.pydantic import parse_model
 from pydantic import BaseModel, Field
 from yarl import URL
 
+from lms.utils.backoff import Backoff
+from lms.utils.rate_limit import TokenBucket
+
 
 class SohoHomeworkResponse(BaseModel):
     student_homework_id: int = Field(alias="clientHomeworkId")
@@ -29,6 +34,7 @@ class ClientSchema(BaseModel):
     first_name: str = Field(alias="firstName")
     last_name: str = Field(alias="lastName", default="")
     emails: list[str]
+    vk_id: int | None = Field(alias="vkId", default=None)
 
 
 class SohoClientListSchema(BaseModel):
@@ -57,6 +63,15 @@ class SohoProductListSchema(BaseModel):
 SOHO_BASE_URL = URL("https://api.soholms.com")
 
 
+def _is_permanent_error(e: Exception) -> bool:
+    # Only timeouts, connection errors, 5xx and 429 may pass on a retry
+    return (
+        isinstance(e, UnhandledStatusException)
+        and e.status < HTTPStatus.INTERNAL_SERVER_ERROR
+        and e.status != HTTPStatus.TOO_MANY_REQUESTS
+    )
+
+
 class Soho(BaseHttpClient):
     DEFAULT_TIMEOUT: ClassVar[TimeoutType] = 30
 
@@ -82,9 +97,18 @@ class Soho(BaseHttpClient):
         session: ClientSession,
         auth_token: str,
         client_name: str,
+        max_concurrency: int = 4,
+        rate_limit: float = 5,
+        max_tries: int = 3,
+        retry_pause: float = 0.5,
+        max_retry_pause: float = 10,
     ):
         super().__init__(url, session, client_name)
         self._auth_header = {"Authorization": auth_token}
+        self._max_concurrency = max_concurrency
+        self._rate_limiter = TokenBucket(rate=rate_limit, capacity=max_concurrency)
+        self._max_tries = max_tries
+        self._backoff = Backoff(base=retry_pause, max_pause=max_retry_pause)
 
     async def homeworks(
         self,
@@ -102,17 +126,32 @@ class Soho(BaseHttpClient):
             },
         )
 
-    async def fetch_all_clients(self) -> list[ClientSchema]:
-        clients = []
-        offset = 0
-        while True:
-            response = await self.client_list(offset=offset)
-            clients.extend(response.clients)
-            if len(response.clients) < response.limit:
-                break
-            offset += len(response.clients)
-            await asyncio.sleep(0.5)
-        return clients
+    async def homeworks_many(
+        self,
+        homework_ids: Sequence[int],
+        timeout: TimeoutType = DEFAULT_TIMEOUT,
+    ) -> Sequence[SohoHomeworksResponse]:
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        # The pause between tries is taken outside of the semaphore, so a
+        # failing list does not hold a slot while it waits
+        async def fetch(homework_id: int) -> SohoHomeworksResponse:
+            attempt = 0
+            while True:
+                try:
+                    async with semaphore:
+                        await self._rate_limiter.acquire()
+                        return await self.homeworks(homework_id, timeout=timeout)
+                except (ClientError, TimeoutError) as e:
+                    if attempt + 1 >= self._max_tries or _is_permanent_error(e):
+                        raise
+                await asyncio.sleep(self._backoff.pause(attempt))
+                attempt += 1
+
+        unique_ids = list(dict.fromkeys(homework_ids))
+        responses = await asyncio.gather(*(fetch(hw_id) for hw_id in unique_ids))
+        by_id = dict(zip(unique_ids, responses))
+        return [by_id[homework_id] for homework_id in homework_ids]
 
     @asyncretry(max_tries=5, pause=1)
     async def client_list(
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from collections.abc import Hashable, Iterable, Iterator
+from dataclasses import dataclass, field
+from types import TracebackType
+
+from lms.adapters.telegram.telegram import TELEGRAM_MAX_TEXT_LENGTH, Telegram
+from lms.utils.rate_limit import TokenBucket
+
+log = logging.getLogger(__name__)
+
+
+class AlertNotSentError(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class _Alert:
+    text: str
+    count: int = 1
+    waiters: list[asyncio.Future[None]] = field(default_factory=list)
+
+
+class AlertAggregator:
+    # Collects alerts for a window and sends them as one digest, repeated
+    # alerts with the same key only bump a counter. Digests share a token
+    # bucket, so a burst of alerts does not run into Telegram rate limits
+    def __init__(
+        self,
+        telegram: Telegram,
+        window: float,
+        rate_limit: float,
+        burst: int,
+    ) -> None:
+        self._telegram = telegram
+        self._window = window
+        self._bucket = TokenBucket(rate=rate_limit, capacity=burst)
+        self._pending: dict[Hashable, _Alert] = {}
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "AlertAggregator":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.flush()
+
+    def alert(self, key: Hashable, text: str) -> asyncio.Future[None]:
+        # The future is done once the digest with the alert is sent, callers
+        # keep their own record of the alert until then
+        waiter = asyncio.get_running_loop().create_future()
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _Alert(text=text)
+        else:
+            pending.text = text
+            pending.count += 1
+        pending.waiters.append(waiter)
+        return waiter
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        alerts, self._pending = self._pending, {}
+        try:
+            for digest, chunk in _make_digests(alerts.values()):
+                await self._bucket.acquire()
+                try:
+                    await self._telegram.send_text(digest)
+                except Exception as e:
+                    log.exception("Failed to send alert digest")
+                    _resolve(chunk, AlertNotSentError(repr(e)))
+                else:
+                    _resolve(chunk)
+        finally:
+            # Alerts of an interrupted flush were not sent either
+            _resolve(alerts.values(), AlertNotSentError("Flush was interrupted"))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._window)
+            await self.flush()
+
+
+def _resolve(alerts: Iterable[_Alert], error: Exception | None = None) -> None:
+    for alert in alerts:
+        for waiter in alert.waiters:
+            if waiter.done():
+                continue
+            if error is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(error)
+
+
+def _make_digests(
+    alerts: Iterable[_Alert],
+    max_length: int = TELEGRAM_MAX_TEXT_LENGTH,
+) -> Iterator[tuple[str, list[_Alert]]]:
+    chunk: list[_Alert] = []
+    lines: list[str] = []
+    length = 0
+    for alert in alerts:
+        line = alert.text if alert.count == 1 else f"{alert.text} (x{alert.count})"
+        line = line[:max_length]
+        if lines and length + len(line) + 1 > max_length:
+            yield "\n".join(lines), chunk
+            chunk, lines, length = [], [], 0
+        chunk.append(alert)
+        lines.append(line)
+        length += len(line) + 1
+    if lines:
+        yield "\n".join(lines), chunk
@@ -9,3 +9,14 @@ class TelegramConfig:
     parse_mode: str = field(
         default_factory=lambda: environ.get("APP_TELEGRAM_PARSE_MODE", "markdown")
     )
+    alert_window: float = field(
+        default_factory=lambda: float(environ.get("APP_TELEGRAM_ALERT_WINDOW", "60"))
+    )
+    alert_rate_limit: float = field(
+        default_factory=lambda: float(
+            environ.get("APP_TELEGRAM_ALERT_RATE_LIMIT", "0.3")
+        )
+    )
+    alert_burst: int = field(
+        default_factory=lambda: int(environ.get("APP_TELEGRAM_ALERT_BURST", "3"))
+    )
@@ -11,6 +11,16 @@ from pydantic import BaseModel, Field
 from yarl import URL
 
 TELEGRAM_BASE_URL = URL("https://api.telegram.org")
+TELEGRAM_MAX_TEXT_LENGTH = 4096
+
+
+def format_teacher_overflow(
+    name: str, max_students: int, vk_id: int, product_id: int
+) -> str:
+    return (
+        f"Teacher {name} with VK ID {vk_id} was overflow "
+        f"limit {max_students} on product {product_id}"
+    )
 
 
 class TelegramSendMessageFrom(BaseModel):
@@ -70,10 +80,16 @@ class Telegram(BaseHttpClient):
     async def teacher_overflow_alert(
         self, name: str, max_students: int, vk_id: int, product_id: int
     ) -> None:
-        text = (
-            f"Teacher {name} with VK ID {vk_id} was overflow "
-            "limit {max_students} on product {product_id}"
+        await self.send_text(
+            format_teacher_overflow(
+                name=name,
+                max_students=max_students,
+                vk_id=vk_id,
+                product_id=product_id,
+            )
         )
+
+    async def send_text(self, text: str) -> TelegramSendMessageSchema:
         data = {
             "chat_id": self._default_chat_id,
             "parse_mode": self._default_parse_mode,
@@ -13,3 +13,6 @@ class HttpConfig:
     version: str = field(
         default_factory=lambda: environ.get("APP_HTTP_VERSION", "1.0.1")
     )
+    idempotency_ttl: int = field(
+        default_factory=lambda: int(environ.get("APP_HTTP_IDEMPOTENCY_TTL", "900"))
+    )
@@ -1,5 +1,9 @@
 from lms.exceptions.base import EntityNotFoundError, LMSError
-from lms.exceptions.distribution import DistributionNotFoundError
+from lms.exceptions.distribution import (
+    DistributionJobNotFoundError,
+    DistributionNotFoundError,
+)
+from lms.exceptions.idempotency import IdempotencyKeyReusedError
 from lms.exceptions.product import OfferNotFoundError, ProductNotFoundError
 from lms.exceptions.soho import SohoNotFoundError
 from lms.exceptions.student import (
@@ -19,8 +23,10 @@ from lms.exceptions.teacher import (
 from lms.exceptions.user import UserAlreadyExistsError, UserNotFoundError
 
 __all__ = [
+    "DistributionJobNotFoundError",
     "DistributionNotFoundError",
     "EntityNotFoundError",
+    "IdempotencyKeyReusedError",
     "LMSError",
     "OfferNotFoundError",
     "ProductNotFoundError",
@@ -3,3 +3,9 @@ from lms.exceptions.base import EntityNotFoundError
 
 class DistributionNotFoundError(EntityNotFoundError):
     pass
+
+
+class DistributionJobNotFoundError(EntityNotFoundError):
+    def __init__(self, *args: object) -> None:
+        detail = "Distribution job not found"
+        super().__init__(detail, *args)
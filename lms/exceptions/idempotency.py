@@ -0,0 +1,5 @@
+from lms.exceptions.base import LMSError
+
+
+class IdempotencyKeyReusedError(LMSError):
+    pass
@@ -12,4 +12,35 @@ class DistributionErrorMessage(StrEnum):
     HOMEWORK_WITHOUT_VK_ID = "Не передан VK ID для поиска ученика"
     STUDENT_WITH_VK_ID_NOT_FOUND = "Ученик с данным VK ID не найден в базе"
     STUDENT_WAS_EXPULSED = "Ученик был отчислен"
+    STUDENT_NOT_FOUND_IN_SOHO = "Ученик не найден в Soho"
+    STUDENT_NOT_IN_FLOW = "Ученик не состоит в выбранных потоках"
+    DUPLICATE_HOMEWORK = "Работа уже есть в этом распределении"
     STACK_OVERFLOW = "Переполнение учеников для распределенения"
+
+
+@unique
+class DistributionJobStatus(StrEnum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
+@unique
+class StageStatus(StrEnum):
+    RUNNING = "RUNNING"
+    DONE = "DONE"
+    FAILED = "FAILED"
+
+
+@unique
+class OutboxMessageKind(StrEnum):
+    SEND_TEACHER = "SEND_TEACHER"
+    TEACHER_OVERFLOW_ALERT = "TEACHER_OVERFLOW_ALERT"
+
+
+@unique
+class OutboxMessageStatus(StrEnum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
@@ -1,10 +1,13 @@
-from collections.abc import Sequence
+from collections.abc import Mapping, Sequence
 from datetime import datetime
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, ValidationError
 from starlette.datastructures import FormData
 
+from lms.generals.enums import DistributionJobStatus
+from lms.utils.stages import Stage
+
 
 class Distribution(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -13,7 +16,7 @@ class Distribution(BaseModel):
     created_at: datetime
     updated_at: datetime
     subject_id: int
-    data: dict[str, Any]
+    data: dict[str, Any] | None
 
     def serialize_soho_homeworks(self) -> Sequence[Sequence[Any]]:
         header = [
@@ -25,7 +28,7 @@ class Distribution(BaseModel):
         ]
         data = []
         data.append(header)
-        for hw in self.data["homeworks"]:
+        for hw in (self.data or {}).get("homeworks", []):
             data.append([v for v in hw.values()])
         return data
 
@@ -43,11 +46,20 @@ class DistributionParams(BaseModel):
     name: str
     product_ids: Sequence[int]
     homeworks: Sequence[DistributionHomework]
+    seed: int | None = None
 
     @property
     def homework_ids(self) -> Sequence[int]:
         return tuple(hw.homework_id for hw in self.homeworks)
 
+    @property
+    def flow_filters(self) -> Mapping[int, frozenset[int]]:
+        return {
+            hw.homework_id: frozenset(f.flow_id for f in hw.filters)
+            for hw in self.homeworks
+            if hw.filters
+        }
+
     @classmethod
     def parse_form(cls, form: FormData) -> "DistributionParams":
         data: dict[str, Any] = {}
@@ -79,3 +91,44 @@ def parse_homework_ids(s: str) -> list[dict[str, Any]]:
         raise ValidationError.from_exception_data(
             title="Invalid homeworks", input_type="json", line_errors=[]
         )
+
+
+class DistributionJob(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    subject_id: int
+    status: DistributionJobStatus
+    params: DistributionParams
+    stages: list[Stage]
+    error: str | None
+    distribution_id: int | None
+    started_at: datetime | None
+    finished_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+
+
+class CreateDistributionAssignmentModel(BaseModel):
+    reviewer_id: int | None
+    homework_id: int
+    student_homework_id: int | None
+    student_soho_id: int
+    student_vk_id: int
+    submission_url: str
+    error_message: str | None = None
+
+
+class DistributionAssignment(CreateDistributionAssignmentModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    distribution_id: int
+    created_at: datetime
+
+
+class ReviewerWorkload(BaseModel):
+    distribution_id: int
+    subject_id: int
+    created_at: datetime
+    homeworks: int
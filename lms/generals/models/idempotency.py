@@ -0,0 +1,11 @@
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+
+class IdempotencyKey(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    key: str
+    request_hash: str
+    response: dict[str, Any] | None
@@ -13,6 +13,7 @@ class Offer(BaseModel):
     name: str
     cohort: int
     teacher_type: TeacherType | None
+    is_premium: bool = False
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,36 @@
+from typing import Any, ClassVar
+
+from pydantic import BaseModel, ConfigDict, NonNegativeInt, PositiveInt
+
+from lms.generals.enums import OutboxMessageKind, TeacherType
+
+
+class SendTeacherPayload(BaseModel):
+    KIND: ClassVar[OutboxMessageKind] = OutboxMessageKind.SEND_TEACHER
+
+    target_path: str
+    student_vk_id: int
+    teacher_vk_id: int
+    teacher_type: TeacherType
+
+
+class TeacherOverflowPayload(BaseModel):
+    KIND: ClassVar[OutboxMessageKind] = OutboxMessageKind.TEACHER_OVERFLOW_ALERT
+
+    teacher_product_id: int
+    name: str
+    max_students: int
+    vk_id: int
+    product_id: int
+
+
+OutboxPayload = SendTeacherPayload | TeacherOverflowPayload
+
+
+class OutboxMessage(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: PositiveInt
+    kind: OutboxMessageKind
+    payload: dict[str, Any]
+    attempts: NonNegativeInt
@@ -13,6 +13,8 @@ class CreateReviewerModel(BaseModel):
     min_: int
     abs_max: int
     is_active: bool
+    is_premium: bool = False
+    recheck: bool = False
 
 
 class Reviewer(BaseModel):
@@ -28,6 +30,8 @@ class Reviewer(BaseModel):
     min_: int
     abs_max: int
     is_active: bool
+    is_premium: bool = False
+    recheck: bool = False
 
     @property
     def name(self) -> str:
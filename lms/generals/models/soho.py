@@ -11,3 +11,21 @@ class SohoAccount(BaseModel):
     email: str
     created_at: datetime
     updated_at: datetime
+
+
+class CreateSohoAccountModel(BaseModel):
+    id: PositiveInt
+    student_id: PositiveInt
+    email: str
+
+
+class SohoClient(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: PositiveInt
+    first_name: str
+    last_name: str
+    emails: list[str]
+    vk_id: int | None
+    created_at: datetime
+    updated_at: datetime
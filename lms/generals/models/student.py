@@ -23,3 +23,9 @@ class NewStudent:
     first_name: str | None
     last_name: str | None
     flow_id: int
+
+
+@dataclass
+class NewEnrollment:
+    student: NewStudent
+    offer_id: int
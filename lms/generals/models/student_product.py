@@ -29,3 +29,55 @@ class StudentProduct(BaseModel):
     @property
     def is_alone(self) -> bool:
         return self.teacher_type is None
+
+
+class EnrollmentResult(BaseModel):
+    vk_id: int
+    offer_id: int
+    student_product: StudentProduct | None = None
+    error: str | None = None
+
+
+class TeacherGrade(BaseModel):
+    soho_id: int
+    product_id: int
+    grade: int
+
+
+class GradeTarget(BaseModel):
+    soho_id: int
+    product_id: int
+    soho_found: bool
+    product_found: bool
+    student_product_id: int | None
+    teacher_product_id: int | None
+
+
+class GradeResult(BaseModel):
+    soho_id: int
+    product_id: int
+    error: str | None = None
+
+
+class CreateStudentProductModel(BaseModel):
+    student_id: PositiveInt
+    product_id: PositiveInt
+    offer_id: PositiveInt
+    cohort: int
+    teacher_type: TeacherType | None = None
+    teacher_product_id: PositiveInt | None = None
+    flow_id: PositiveInt | None = None
+
+
+class StudentEnrollment(BaseModel):
+    soho_id: int | None
+    student_id: int
+    vk_id: int
+    product_id: int
+    flow_id: int | None
+    expulsion_at: datetime | None
+    is_premium: bool = False
+
+    @property
+    def is_active(self) -> bool:
+        return self.expulsion_at is None
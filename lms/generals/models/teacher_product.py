@@ -18,6 +18,7 @@ class TeacherProduct(BaseModel):
     max_students: NonNegativeInt
     average_grade: float
     grade_counter: NonNegativeInt
+    active_students: int
 
     @property
     def is_mentor(self) -> bool:
@@ -26,3 +27,37 @@ class TeacherProduct(BaseModel):
     @property
     def is_curator(self) -> bool:
         return self.type == TeacherType.CURATOR
+
+
+class EnrollCandidate(BaseModel):
+    # Teacher product with the counters behind rating_coef, so a batch of
+    # enrollments can be spread between teachers without a query per student
+    id: PositiveInt
+    teacher_id: PositiveInt
+    product_id: PositiveInt
+    type: TeacherType
+    max_students: NonNegativeInt
+    average_grade: float
+    actual_students: NonNegativeInt
+    total_students: NonNegativeInt
+    removal_students: NonNegativeInt
+    flow_ids: frozenset[int]
+    teacher_vk_id: int
+    teacher_name: str
+
+    @property
+    def rating_coef(self) -> float:
+        fullness = (
+            self.actual_students / self.max_students if self.max_students > 0 else 1
+        )
+        removability = (
+            (self.total_students - self.removal_students) / self.total_students
+            if self.total_students > 0
+            else 1.0
+        )
+        grade = 5 if self.average_grade == 0 else self.average_grade
+        return grade * (1 - fullness) * removability
+
+    def assign(self) -> None:
+        self.actual_students += 1
+        self.total_students += 1
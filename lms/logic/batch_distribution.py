@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass
+
+from lms.generals.models.distribution import Distribution as StoredDistribution
+from lms.generals.models.distribution import DistributionParams
+from lms.utils.stages import Stage, StageTracker
+
+log = logging.getLogger(__name__)
+
+RunDistribution = Callable[
+    [DistributionParams, StageTracker],
+    Awaitable[StoredDistribution],
+]
+
+
+@dataclass(frozen=True, slots=True)
+class BatchResult:
+    params: DistributionParams
+    stages: Sequence[Stage]
+    distribution_id: int | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def run_batch(
+    params_list: Sequence[DistributionParams],
+    run: RunDistribution,
+    concurrency: int,
+    subject_ids: Mapping[int, int],
+) -> Sequence[BatchResult]:
+    semaphore = asyncio.Semaphore(concurrency)
+    # Distributions of one subject update the same subject properties, so
+    # they run one after another like jobs in DistributionWorker
+    locks: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def run_one(params: DistributionParams) -> BatchResult:
+        tracker = StageTracker()
+        subject_id = subject_ids[params.product_ids[0]]
+        async with locks[subject_id], semaphore:
+            log.info("Distribution %r started", params.name)
+            try:
+                distribution = await run(params, tracker)
+            except Exception as e:
+                log.exception("Distribution %r failed", params.name)
+                return BatchResult(params=params, stages=tracker.stages, error=repr(e))
+        log.info("Distribution %r saved as #%d", params.name, distribution.id)
+        return BatchResult(
+            params=params,
+            stages=tracker.stages,
+            distribution_id=distribution.id,
+        )
+
+    return await asyncio.gather(*(run_one(params) for params in params_list))
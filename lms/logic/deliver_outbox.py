@@ -0,0 +1,42 @@
+import asyncio
+
+from lms.adapters.autopilot.client import Autopilot
+from lms.adapters.telegram.alerts import AlertAggregator
+from lms.adapters.telegram.telegram import format_teacher_overflow
+from lms.generals.enums import OutboxMessageKind
+from lms.generals.models.outbox import (
+    OutboxMessage,
+    SendTeacherPayload,
+    TeacherOverflowPayload,
+)
+
+
+async def deliver_message(
+    autopilot: Autopilot,
+    alerts: AlertAggregator,
+    message: OutboxMessage,
+) -> asyncio.Future[None] | None:
+    # Alerts are sent later in a digest, the returned future is done once
+    # the message is really delivered
+    match message.kind:
+        case OutboxMessageKind.SEND_TEACHER:
+            send_teacher = SendTeacherPayload.model_validate(message.payload)
+            await autopilot.send_teacher(
+                target_path=send_teacher.target_path,
+                student_vk_id=send_teacher.student_vk_id,
+                teacher_vk_id=send_teacher.teacher_vk_id,
+                teacher_type=send_teacher.teacher_type,
+            )
+        case OutboxMessageKind.TEACHER_OVERFLOW_ALERT:
+            overflow = TeacherOverflowPayload.model_validate(message.payload)
+            # Repeated alerts for a teacher are merged into the next digest
+            return alerts.alert(
+                (message.kind, overflow.teacher_product_id),
+                format_teacher_overflow(
+                    name=overflow.name,
+                    max_students=overflow.max_students,
+                    vk_id=overflow.vk_id,
+                    product_id=overflow.product_id,
+                ),
+            )
+    return None
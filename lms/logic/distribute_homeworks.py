@@ -1,25 +1,52 @@
-from collections.abc import Mapping, Sequence
+import asyncio
+import logging
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, TypeVar
 
 from aiomisc import threaded
 from google_api_service_helper import GoogleDrive, GoogleSheets
 
 from lms.adapters.db.uow import UnitOfWork
+from lms.adapters.google.sheets import (
+    batch_update_encoded,
+    encode_requests,
+    new_sheet_id,
+    new_sheet_requests,
+)
 from lms.adapters.soho.soho import Soho
-from lms.generals.models.distribution import DistributionParams
+from lms.generals.models.distribution import (
+    CreateDistributionAssignmentModel,
+    DistributionParams,
+)
+from lms.generals.models.distribution import Distribution as StoredDistribution
 from lms.generals.models.subject import Subject
+from lms.logic.sync_soho_clients import SohoClientSynchronizer
+from lms.utils.distribution.clients import ClientDirectory
+from lms.utils.distribution.filters import (
+    EnrollmentIndex,
+    deduplicate,
+    split_homeworks,
+)
 from lms.utils.distribution.models import (
     Distribution,
     DistributionReviewer,
-    ErrorHomework,
     SohoHomework,
     StudentDistributeData,
     StudentHomework,
 )
+from lms.utils.distribution.packing import allocate, pack, unpack
+from lms.utils.distribution.utils import NameGen
+from lms.utils.stages import StageTracker
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 SHEET_INDEX = 4
-SHEET_MAJOR_DIMENSION = "COLUMNS"
+SHEET_HEADER_ROWS = 5
 
 
 @dataclass(frozen=True, slots=True)
@@ -28,58 +55,117 @@ class Distributor:
     google_sheets: GoogleSheets
     google_drive: GoogleDrive
     soho: Soho
+    # The JSON snapshot is kept for the admin downloads and replays,
+    # assignments are always written to distribution_assignment
+    store_data: bool = True
+    # Batch runs sync the Soho client mirror once for all distributions
+    sync_clients: bool = True
+    # Allocation and sheet serialization are CPU-bound, a process pool keeps
+    # them off the event loop. None runs them in the default thread pool.
+    executor: Executor | None = None
 
     async def make_distribution(
         self,
         params: DistributionParams,
         created_at: datetime,
-    ) -> None:
-        homeworks = await self._get_soho_homeworks(params.homework_ids)
-        subject = await self._get_subject(params.product_ids[0])
-        reviewers = await self._get_reviewers(subject_id=subject.id)
-        student_map = await self._get_student_data_map(homeworks=homeworks)
-        filtered_homeworks, error_homeworks = _filter_homeworks(
-            homeworks=homeworks,
-            student_map=student_map,
-        )
-        distribution = Distribution(
-            created_at=created_at,
-            params=params,
-            homeworks=homeworks,
-            filtered_homeworks=filtered_homeworks,
-            error_homeworks=error_homeworks,
-            reviewers=reviewers,
-        )
-        await distribution.distribute()
-        new_folder_id = await self._create_folder_for_homeworks(
-            parent_folder_id=subject.check_drive_foler_id,
-            distribution=distribution,
-        )
-        distribution.new_folder_id = new_folder_id
-        await self._write_data_in_new_sheet(
-            spreadsheet_id=subject.check_spreadsheet_id,
-            distribution=distribution,
-        )
-        await self._save_distribution(
-            subject_id=subject.id,
-            distribution=distribution,
-        )
-        await self._add_folder_to_notification(
-            subject_id=subject.id,
-            folder_id=new_folder_id,
+        stages: StageTracker | None = None,
+    ) -> StoredDistribution:
+        tracker = stages or StageTracker()
+        async with tracker.stage("fetch_homeworks"):
+            fetched = await self._get_soho_homeworks(params.homework_ids)
+        async with tracker.stage("deduplicate"):
+            homeworks, duplicates = deduplicate(fetched)
+        async with tracker.stage("load_reviewers"):
+            subject = await self._get_subject(params.product_ids[0])
+            reviewers = await self._get_reviewers(subject_id=subject.id)
+        # The folder only depends on the params, so Drive works while the
+        # homeworks are being matched and distributed
+        folder_task = asyncio.ensure_future(
+            self._create_folder_for_homeworks(
+                parent_folder_id=subject.check_drive_foler_id,
+                folder_title=NameGen(
+                    base_name=params.name,
+                    dt=created_at,
+                    homework_ids=params.homework_ids,
+                ).folder_title,
+            )
         )
-        await self.uow.commit()
+        try:
+            async with tracker.stage("match_students"):
+                student_map = await self._get_student_data_map(homeworks=homeworks)
+                enrollments = await self._get_enrollments(
+                    product_ids=params.product_ids,
+                    homeworks=homeworks,
+                )
+                previous_reviewers = await self._get_previous_reviewers(
+                    homeworks=homeworks,
+                )
+                filtered_homeworks, error_homeworks = split_homeworks(
+                    homeworks=homeworks,
+                    student_map=student_map,
+                    enrollments=enrollments,
+                    flow_filters=params.flow_filters,
+                    previous_reviewers=previous_reviewers,
+                    duplicates=duplicates,
+                )
+            async with tracker.stage("distribute"):
+                distribution = Distribution(
+                    created_at=created_at,
+                    params=params,
+                    homeworks=fetched,
+                    filtered_homeworks=filtered_homeworks,
+                    error_homeworks=error_homeworks,
+                    reviewers=reviewers,
+                    seed=params.seed,
+                )
+                await self._distribute(distribution)
+        except BaseException:
+            folder_task.cancel()
+            raise
+        async with tracker.stage("create_folder"):
+            new_folder_id = await folder_task
+            distribution.new_folder_id = new_folder_id
+        async with tracker.stage("write_sheet"):
+            columns = await self._serialize_for_sheet(distribution)
+            body = await self._run_in_executor(
+                _encode_sheet,
+                columns,
+                new_sheet_id(),
+                distribution.sheet_title,
+            )
+            await self._write_sheet(
+                spreadsheet_id=subject.check_spreadsheet_id,
+                body=body,
+            )
+        async with tracker.stage("save"):
+            saved = await self._save_distribution(
+                subject_id=subject.id,
+                distribution=distribution,
+            )
+            await self._add_folder_to_notification(
+                subject_id=subject.id,
+                folder_id=new_folder_id,
+            )
+            await self.uow.commit()
+        return saved
 
     async def _get_soho_homeworks(
         self,
         homework_ids: Sequence[int],
     ) -> Sequence[SohoHomework]:
         homeworks: list[SohoHomework] = []
-        for homework_id in homework_ids:
-            response = await self.soho.homeworks(homework_id)
+        responses = await self.soho.homeworks_many(homework_ids)
+        for homework_id, response in zip(homework_ids, responses):
             for homework in response.homeworks:
                 homeworks.append(
-                    SohoHomework(**homework.model_dump(), homework_id=homework_id)
+                    SohoHomework(
+                        student_homework_id=homework.student_homework_id,
+                        student_soho_id=homework.student_soho_id,
+                        sent_to_review_at=homework.sent_to_review_at,
+                        chat_url=homework.chat_url,
+                        student_vk_id=homework.student_vk_id,
+                        homework_id=homework_id,
+                    )
                 )
         return homeworks
 
@@ -89,27 +175,63 @@ class Distributor:
 
     async def _get_reviewers(self, subject_id: int) -> Sequence[DistributionReviewer]:
         reviewers = await self.uow.reviewer.get_list_by_subject_id(subject_id)
-        return [DistributionReviewer(**r.model_dump()) for r in reviewers]
+        return [DistributionReviewer.from_reviewer(r) for r in reviewers]
 
     async def _get_student_data_map(
         self,
         homeworks: Sequence[SohoHomework],
     ) -> Mapping[int, StudentDistributeData]:
-        clients = await self.soho.fetch_all_clients()
+        if self.sync_clients:
+            # The sync commits every page, the distribution only commits
+            # once it is saved
+            sync_uow = self.uow.fork()
+            async with sync_uow.start():
+                await SohoClientSynchronizer(uow=sync_uow, soho=self.soho).sync()
+        clients = ClientDirectory.from_clients(
+            await self.uow.soho_client.read_by_ids(
+                homework.student_soho_id for homework in homeworks
+            )
+        )
         student_data_map = {}
         for homework in homeworks:
-            for client in clients:
-                if client.id == homework.student_soho_id:
-                    student_data_map[client.id] = StudentDistributeData(
-                        vk_id=homework.student_vk_id or 0,
-                        first_name=client.first_name,
-                        last_name=client.last_name,
-                        homework_id=homework.homework_id,
-                        soho_id=client.id,
-                    )
-                    break
+            client = clients.get(homework.student_soho_id)
+            if client is None:
+                continue
+            student_data_map[client.id] = StudentDistributeData(
+                vk_id=homework.student_vk_id or 0,
+                first_name=client.first_name,
+                last_name=client.last_name,
+                homework_id=homework.homework_id,
+                soho_id=client.id,
+            )
         return student_data_map
 
+    async def _get_enrollments(
+        self,
+        product_ids: Sequence[int],
+        homeworks: Sequence[SohoHomework],
+    ) -> EnrollmentIndex:
+        enrollments = await self.uow.student_product.read_enrollments(
+            product_ids=product_ids,
+            soho_ids=(hw.student_soho_id for hw in homeworks),
+            vk_ids=(hw.student_vk_id for hw in homeworks if hw.student_vk_id),
+        )
+        return EnrollmentIndex.from_enrollments(enrollments)
+
+    async def _get_previous_reviewers(
+        self,
+        homeworks: Sequence[SohoHomework],
+    ) -> Mapping[tuple[int, int], int]:
+        assignments = await self.uow.distribution_assignment.read_last_assignments(
+            student_soho_ids=(hw.student_soho_id for hw in homeworks),
+            homework_ids=(hw.homework_id for hw in homeworks),
+        )
+        return {
+            (a.student_soho_id, a.homework_id): a.reviewer_id
+            for a in assignments
+            if a.reviewer_id is not None
+        }
+
     async def _add_folder_to_notification(
         self, subject_id: int, folder_id: str
     ) -> None:
@@ -129,21 +251,25 @@ class Distributor:
         self,
         subject_id: int,
         distribution: Distribution,
-    ) -> None:
-        data = distribution.model_dump()
-        await self.uow.distribution.create(
+    ) -> StoredDistribution:
+        saved = await self.uow.distribution.create(
             subject_id=subject_id,
-            data=data,
+            data=distribution.dump() if self.store_data else None,
         )
+        await self.uow.distribution_assignment.create_many(
+            distribution_id=saved.id,
+            assignments=_make_assignments(distribution),
+        )
+        return saved
 
     @threaded
     def _create_folder_for_homeworks(
         self,
-        distribution: Distribution,
+        folder_title: str,
         parent_folder_id: str,
     ) -> str:
         new_folder = self.google_drive.make_new_folder(
-            new_folder_title=distribution.folder_title,
+            new_folder_title=folder_title,
             parent_folder_id=parent_folder_id,
         )
         if new_folder is None:
@@ -151,38 +277,84 @@ class Distributor:
         self.google_drive.set_permissions_for_anyone(folder_id=new_folder.id)
         return new_folder.id
 
+    async def _distribute(self, distribution: Distribution) -> None:
+        allocation = await self._run_in_executor(allocate, pack(distribution))
+        unpack(distribution, allocation)
+        stats = distribution.stats
+        log.info(
+            "Distribution `%s`: %d homeworks, %d distributed, %d duplicates, %d errors",
+            distribution.params.name,
+            stats.homeworks,
+            stats.distributed,
+            stats.duplicates,
+            sum(stats.errors.values()),
+        )
+
+    async def _run_in_executor(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    # Stays in a thread: pickling the distribution for the process pool
+    # costs several times more than building the columns
     @threaded
-    def _write_data_in_new_sheet(
+    def _serialize_for_sheet(
         self,
         distribution: Distribution,
-        spreadsheet_id: str,
-    ) -> None:
-        self.google_sheets.create_sheet(
+    ) -> Sequence[Sequence[Any]]:
+        return distribution.serialize_for_sheet()
+
+    @threaded
+    def _write_sheet(self, spreadsheet_id: str, body: bytes) -> None:
+        batch_update_encoded(
+            google_sheets=self.google_sheets,
             spreadsheet_id=spreadsheet_id,
-            title=distribution.sheet_title,
-            index=SHEET_INDEX,
+            body=body,
         )
-        self.google_sheets.set_data(
-            spreadsheet_id=spreadsheet_id,
-            range_sheet=distribution.sheet_title,
-            values=distribution.serialize_for_sheet(),
-            major_dimension=SHEET_MAJOR_DIMENSION,
+
+
+def _encode_sheet(
+    columns: Sequence[Sequence[Any]],
+    sheet_id: int,
+    title: str,
+) -> bytes:
+    # Runs in the executor: cell data for every row and its JSON are the bulk
+    # of the sheet work, columns of plain strings are cheap to pickle
+    return encode_requests(
+        new_sheet_requests(
+            sheet_id=sheet_id,
+            title=title,
+            index=SHEET_INDEX,
+            columns=columns,
+            header_rows=SHEET_HEADER_ROWS,
         )
+    )
 
 
-def _filter_homeworks(
-    homeworks: Sequence[SohoHomework],
-    student_map: Mapping[int, StudentDistributeData],
-) -> tuple[Sequence[StudentHomework], Sequence[ErrorHomework]]:
-    pre_filtered_homeworks: list[StudentHomework] = list()
-    error_homeworks: list[ErrorHomework] = list()
-    for hw in homeworks:
-        sh = StudentHomework(
-            student_name=student_map[hw.student_soho_id].name,
-            student_vk_id=student_map[hw.student_soho_id].vk_id,
-            student_soho_id=hw.student_soho_id,
-            submission_url=hw.chat_url,
-            homework_id=hw.homework_id,
+def _make_assignments(
+    distribution: Distribution,
+) -> Iterator[CreateDistributionAssignmentModel]:
+    for reviewer in distribution.reviewers:
+        for hw in reviewer.student_homeworks:
+            yield _make_assignment(hw, reviewer_id=reviewer.id)
+    for error in distribution.error_homeworks:
+        yield _make_assignment(
+            error.homework,
+            reviewer_id=None,
+            error_message=error.error_message,
         )
-        pre_filtered_homeworks.append(sh)
-    return pre_filtered_homeworks, error_homeworks
+
+
+def _make_assignment(
+    hw: StudentHomework,
+    reviewer_id: int | None,
+    error_message: str | None = None,
+) -> CreateDistributionAssignmentModel:
+    return CreateDistributionAssignmentModel(
+        reviewer_id=reviewer_id,
+        homework_id=hw.homework_id,
+        student_homework_id=hw.student_homework_id,
+        student_soho_id=hw.student_soho_id,
+        student_vk_id=hw.student_vk_id,
+        submission_url=hw.submission_url,
+        error_message=error_message,
+    )
@@ -1,19 +1,35 @@
-import asyncio
 import logging
-from collections.abc import Coroutine, Sequence
-from dataclasses import asdict, dataclass, field
-from datetime import datetime
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
 
-from lms.adapters.autopilot.client import Autopilot
 from lms.adapters.db.uow import UnitOfWork
-from lms.adapters.telegram.telegram import Telegram
 from lms.exceptions import (
+    EntityNotFoundError,
+    IdempotencyKeyReusedError,
+    LMSError,
     StudentNotFoundError,
     StudentProductNotFoundError,
+    TeacherProductNotFoundError,
 )
+from lms.generals.enums import TeacherType
+from lms.generals.models.flow import Flow
 from lms.generals.models.offer import Offer
-from lms.generals.models.student import NewStudent
-from lms.generals.models.student_product import StudentProduct
+from lms.generals.models.outbox import (
+    OutboxPayload,
+    SendTeacherPayload,
+    TeacherOverflowPayload,
+)
+from lms.generals.models.soho import CreateSohoAccountModel
+from lms.generals.models.student import NewEnrollment, NewStudent, Student
+from lms.generals.models.student_product import (
+    CreateStudentProductModel,
+    EnrollmentResult,
+    StudentProduct,
+)
+from lms.generals.models.teacher import Teacher
+from lms.generals.models.teacher_product import EnrollCandidate, TeacherProduct
 
 log = logging.getLogger(__name__)
 
@@ -21,9 +37,38 @@ log = logging.getLogger(__name__)
 @dataclass(frozen=True, slots=True)
 class Enroller:
     uow: UnitOfWork
-    autopilot: Autopilot
-    telegram: Telegram
-    background_tasks: set = field(default_factory=set)
+    idempotency_ttl: timedelta = timedelta(minutes=15)
+
+    async def enroll_student_once(
+        self,
+        idempotency_key: str,
+        request_hash: str,
+        new_student: NewStudent,
+        offer_ids: Sequence[int],
+    ) -> StudentProduct:
+        claimed = await self.uow.idempotency_key.claim(
+            key=idempotency_key,
+            request_hash=request_hash,
+            expires_at=datetime.now() + self.idempotency_ttl,
+        )
+        stored = None
+        if not claimed:
+            stored = await self.uow.idempotency_key.read(key=idempotency_key)
+        if stored is not None:
+            if stored.request_hash != request_hash:
+                raise IdempotencyKeyReusedError
+            if stored.response is not None:
+                log.info("Enrollment %s was already handled", idempotency_key)
+                return StudentProduct.model_validate(stored.response)
+        student_product = await self.enroll_student(
+            new_student=new_student,
+            offer_ids=offer_ids,
+        )
+        await self.uow.idempotency_key.save_response(
+            key=idempotency_key,
+            response=student_product.model_dump(mode="json"),
+        )
+        return student_product
 
     async def enroll_student(
         self,
@@ -43,8 +88,9 @@ class Enroller:
                 student_id=student.id,
                 email=new_student.email,
             )
-        offer_id = offer_ids[0]
-        offer = await self.uow.offer.read_by_id(offer_id=offer_id)
+        # Loads the product and subject too, so find_by_product below and
+        # the offer reads in the re-enroll path are served from memory
+        offer, _ = await self.uow.offer.read_with_subject(offer_id=offer_ids[0])
         old_student_product = (
             await self.uow.student_product.find_by_student_and_product(
                 student_id=student.id,
@@ -57,9 +103,9 @@ class Enroller:
                 new_offer=offer,
             )
         flow = await self.uow.flow.get_by_soho_id(new_student.flow_id)
-        student_product = await self._enroll_student_by_offer_id(
+        student_product = await self._enroll_student_by_offer(
             student_id=student.id,
-            offer_id=offer_id,
+            offer=offer,
             flow_id=flow.id if flow else None,
         )
         if student_product.teacher_product_id and student_product.teacher_type:
@@ -69,43 +115,218 @@ class Enroller:
             teacher = await self.uow.teacher.find_teacher_by_teacher_product(
                 teacher_product_id=student_product.teacher_product_id,
             )
-            self.run_back(
-                self.autopilot.send_teacher(
+            teacher_product = await self.uow.teacher_product.read_by_id(
+                student_product.teacher_product_id
+            )
+            await self.uow.outbox.add(
+                _teacher_messages(
                     target_path=subject.enroll_autopilot_url,
                     student_vk_id=student.vk_id,
-                    teacher_vk_id=teacher.vk_id,
-                    teacher_type=student_product.teacher_type,
+                    teacher=teacher,
+                    teacher_product=teacher_product,
                 )
             )
-            teacher_product = await self.uow.teacher_product.read_by_id(
-                student_product.teacher_product_id
+        return student_product
+
+    async def enroll_students(
+        self,
+        enrollments: Sequence[NewEnrollment],
+    ) -> Sequence[EnrollmentResult]:
+        log.info("Enroll %d students in bulk", len(enrollments))
+        offers = await self.uow.offer.read_by_ids(e.offer_id for e in enrollments)
+        students = dict(
+            await self.uow.student.read_by_vk_ids(e.student.vk_id for e in enrollments)
+        )
+        flows = await self.uow.flow.get_by_soho_ids(
+            e.student.flow_id for e in enrollments
+        )
+        old_student_products = (
+            await self.uow.student_product.find_by_students_and_products(
+                student_ids=[student.id for student in students.values()],
+                product_ids=[offer.product_id for offer in offers.values()],
             )
-            if (
-                await self.uow.student_product.calculate_active_students(
-                    teacher_product.id
-                )
-                > teacher_product.max_students
+        )
+
+        results: list[EnrollmentResult | None] = [None] * len(enrollments)
+        new: list[int] = []
+        again: list[int] = []
+        seen: set[tuple[int, int]] = set()
+        for i, enrollment in enumerate(enrollments):
+            offer = offers.get(enrollment.offer_id)
+            if offer is None:
+                results[i] = _error(enrollment, "Offer not found")
+                continue
+            student = students.get(enrollment.student.vk_id)
+            key = (enrollment.student.vk_id, offer.product_id)
+            # Re-enrollments and repeated students go through the single path
+            if key in seen or (
+                student is not None
+                and (student.id, offer.product_id) in old_student_products
             ):
-                self.run_back(
-                    self.telegram.teacher_overflow_alert(
-                        name=teacher.name,
-                        max_students=teacher_product.max_students,
-                        vk_id=teacher.vk_id,
-                        product_id=teacher_product.product_id,
-                    )
+                again.append(i)
+                continue
+            seen.add(key)
+            new.append(i)
+
+        picked = await self._pick_teacher_products(
+            enrollments=enrollments,
+            indices=new,
+            offers=offers,
+            flow_ids={soho_id: flow.id for soho_id, flow in flows.items()},
+            results=results,
+        )
+        new = [i for i in new if results[i] is None]
+
+        await self._create_students(
+            new_students=(enrollments[i].student for i in new),
+            students=students,
+        )
+
+        student_products = await self.uow.student_product.create_many(
+            _new_student_product(
+                student_id=students[enrollments[i].student.vk_id].id,
+                offer=offers[enrollments[i].offer_id],
+                teacher_product=picked.get(i),
+                flow=flows.get(enrollments[i].student.flow_id),
+            )
+            for i in new
+        )
+        await self.uow.teacher_assignment.create_many(
+            {
+                student_product.id: picked[i].id
+                for i, student_product in zip(new, student_products)
+                if i in picked
+            }
+        )
+        active_students = await self.uow.teacher_product.add_active_students(
+            Counter(candidate.id for candidate in picked.values())
+        )
+        for i, student_product in zip(new, student_products):
+            results[i] = _result(enrollments[i], student_product)
+        if picked:
+            await self._notify_teachers(
+                enrollments=enrollments,
+                picked=picked,
+                student_products=dict(zip(new, student_products)),
+                active_students=active_students,
+            )
+
+        for i in again:
+            results[i] = await self._enroll_again(enrollments[i])
+        return [result for result in results if result is not None]
+
+    async def _create_students(
+        self,
+        new_students: Iterable[NewStudent],
+        students: dict[int, Student],
+    ) -> None:
+        missing: dict[int, NewStudent] = {}
+        for new_student in new_students:
+            if new_student.vk_id not in students:
+                missing.setdefault(new_student.vk_id, new_student)
+        students.update(
+            (student.vk_id, student)
+            for student in await self.uow.student.create_many(missing.values())
+        )
+        await self.uow.soho.create_many(
+            CreateSohoAccountModel(
+                id=new_student.soho_id,
+                email=new_student.email,
+                student_id=students[vk_id].id,
+            )
+            for vk_id, new_student in missing.items()
+        )
+
+    async def _enroll_again(self, enrollment: NewEnrollment) -> EnrollmentResult:
+        try:
+            async with self.uow.savepoint():
+                student_product = await self.enroll_student(
+                    new_student=enrollment.student,
+                    offer_ids=[enrollment.offer_id],
                 )
-        return student_product
+        except LMSError as e:
+            # The savepoint has dropped this row only, the batch goes on
+            return _error(enrollment, _error_detail(e))
+        return _result(enrollment, student_product)
 
-    async def _enroll_student_by_offer_id(
+    async def _pick_teacher_products(
+        self,
+        enrollments: Sequence[NewEnrollment],
+        indices: Iterable[int],
+        offers: Mapping[int, Offer],
+        flow_ids: Mapping[int, int],
+        results: list[EnrollmentResult | None],
+    ) -> dict[int, EnrollCandidate]:
+        indices = [i for i in indices if offers[enrollments[i].offer_id].teacher_type]
+        if not indices:
+            return {}
+        candidates: defaultdict[int, list[EnrollCandidate]] = defaultdict(list)
+        for candidate in await self.uow.teacher_product.reserve_candidates(
+            offers[enrollments[i].offer_id].product_id for i in indices
+        ):
+            candidates[candidate.product_id].append(candidate)
+
+        picked: dict[int, EnrollCandidate] = {}
+        for i in indices:
+            offer = offers[enrollments[i].offer_id]
+            candidate = pick_teacher_product(
+                candidates=candidates[offer.product_id],
+                teacher_type=offer.teacher_type,  # type: ignore[arg-type]
+                flow_id=flow_ids.get(enrollments[i].student.flow_id),
+            )
+            if candidate is None:
+                error = TeacherProductNotFoundError().detail
+                results[i] = _error(enrollments[i], error)
+                continue
+            # Later students in the batch see the updated fullness
+            candidate.assign()
+            picked[i] = candidate
+        return picked
+
+    async def _notify_teachers(
+        self,
+        enrollments: Sequence[NewEnrollment],
+        picked: Mapping[int, EnrollCandidate],
+        student_products: Mapping[int, StudentProduct],
+        active_students: Mapping[int, int],
+    ) -> None:
+        subjects = await self.uow.subject.find_by_products(
+            candidate.product_id for candidate in picked.values()
+        )
+        messages: list[OutboxPayload] = []
+        overflowed: dict[int, EnrollCandidate] = {}
+        for i, candidate in picked.items():
+            messages.append(
+                SendTeacherPayload(
+                    target_path=subjects[candidate.product_id].enroll_autopilot_url,
+                    student_vk_id=enrollments[i].student.vk_id,
+                    teacher_vk_id=candidate.teacher_vk_id,
+                    teacher_type=student_products[i].teacher_type,  # type: ignore[arg-type]
+                )
+            )
+            if active_students[candidate.id] > candidate.max_students:
+                overflowed[candidate.id] = candidate
+        messages.extend(
+            TeacherOverflowPayload(
+                teacher_product_id=candidate.id,
+                name=candidate.teacher_name,
+                max_students=candidate.max_students,
+                vk_id=candidate.teacher_vk_id,
+                product_id=candidate.product_id,
+            )
+            for candidate in overflowed.values()
+        )
+        await self.uow.outbox.add(messages)
+
+    async def _enroll_student_by_offer(
         self,
         student_id: int,
-        offer_id: int,
+        offer: Offer,
         flow_id: int | None = None,
     ) -> StudentProduct:
-        offer = await self.uow.offer.read_by_id(offer_id=offer_id)
         teacher_product = None
         if offer.teacher_type is not None:
-            teacher_product = await self.uow.teacher_product.get_for_enroll(
+            teacher_product = await self.uow.teacher_product.reserve_for_enroll(
                 product_id=offer.product_id,
                 teacher_type=offer.teacher_type,
                 flow_id=flow_id,
@@ -124,6 +345,7 @@ class Enroller:
                 student_product_id=student_product.id,
                 teacher_product_id=teacher_product.id,
             )
+            await self.uow.teacher_product.add_active_students({teacher_product.id: 1})
         return student_product
 
     async def _enroll_student_again_by_offer(
@@ -141,7 +363,10 @@ class Enroller:
                 and new_offer.teacher_type == old_offer.teacher_type
             )
         ):
-            pass
+            # The teacher stays, an expelled student comes back to them
+            await self.uow.teacher_product.add_active_students(
+                _move_student(student_product, student_product.teacher_product_id)
+            )
         elif (
             student_product.is_active
             and not student_product.is_alone
@@ -151,6 +376,9 @@ class Enroller:
                 student_product_id=student_product.id,
                 teacher_product_id=student_product.teacher_product_id,  # type: ignore[arg-type]
             )
+            await self.uow.teacher_product.add_active_students(
+                _move_student(student_product, None)
+            )
             student_product.teacher_product_id = None
             student_product.teacher_type = None
         elif not new_offer.is_alone:
@@ -159,7 +387,7 @@ class Enroller:
                     student_product_id=student_product.id,
                     teacher_product_id=student_product.teacher_product_id,  # type: ignore[arg-type]
                 )
-            teacher_product = await self.uow.teacher_product.get_for_enroll(
+            teacher_product = await self.uow.teacher_product.reserve_for_enroll(
                 product_id=new_offer.product_id,
                 teacher_type=new_offer.teacher_type,  # type: ignore[arg-type]
                 flow_id=student_product.flow_id,
@@ -168,6 +396,12 @@ class Enroller:
                 student_product_id=student_product.id,
                 teacher_product_id=teacher_product.id,
             )
+            await self.uow.teacher_product.add_active_students(
+                _move_student(student_product, teacher_product.id)
+            )
+            teacher_product = await self.uow.teacher_product.read_by_id(
+                teacher_product.id
+            )
             subject = await self.uow.subject.find_by_product(student_product.product_id)
             student = await self.uow.student.read_by_id(
                 student_id=student_product.student_id
@@ -175,28 +409,14 @@ class Enroller:
             teacher = await self.uow.teacher.find_teacher_by_teacher_product(
                 teacher_product.id
             )
-            self.run_back(
-                self.autopilot.send_teacher(
+            await self.uow.outbox.add(
+                _teacher_messages(
                     target_path=subject.enroll_autopilot_url,
                     student_vk_id=student.vk_id,
-                    teacher_vk_id=teacher.vk_id,
-                    teacher_type=new_offer.teacher_type,  # type:ignore[arg-type]
+                    teacher=teacher,
+                    teacher_product=teacher_product,
                 )
             )
-            if (
-                await self.uow.student_product.calculate_active_students(
-                    teacher_product.id
-                )
-                > teacher_product.max_students
-            ):
-                self.run_back(
-                    self.telegram.teacher_overflow_alert(
-                        name=teacher.name,
-                        max_students=teacher_product.max_students,
-                        vk_id=teacher.vk_id,
-                        product_id=teacher_product.product_id,
-                    ),
-                )
         teacher_product_id = (
             teacher_product.id
             if teacher_product
@@ -239,9 +459,16 @@ class Enroller:
         ):
             await self.uow.teacher_assignment.expulse_student_safety(
                 student_product_id=student_product.id,
-                teacher_product_id=teacher_product.id,
+                teacher_product_id=student_product.teacher_product_id,
             )
         if student_product.teacher_product_id != teacher_product.id:
+            if student_product.is_active:
+                await self.uow.teacher_product.add_active_students(
+                    _move_student(student_product, teacher_product.id)
+                )
+                teacher_product = await self.uow.teacher_product.read_by_id(
+                    teacher_product.id
+                )
             student_product = await self.uow.student_product.update(
                 student_product_id=student_product.id,
                 teacher_product_id=teacher_product.id,
@@ -252,29 +479,110 @@ class Enroller:
                 teacher_product_id=teacher_product.id,
                 assignment_at=datetime.now(),
             )
-        self.run_back(
-            self.autopilot.send_teacher(
+        await self.uow.outbox.add(
+            _teacher_messages(
                 target_path=subject.enroll_autopilot_url,
                 student_vk_id=student.vk_id,
-                teacher_vk_id=teacher.vk_id,
-                teacher_type=teacher_product.type,
+                teacher=teacher,
+                teacher_product=teacher_product,
             )
         )
-        if (
-            await self.uow.student_product.calculate_active_students(teacher_product.id)
-            > teacher_product.max_students
-        ):
-            self.run_back(
-                self.telegram.teacher_overflow_alert(
-                    name=teacher.name,
-                    max_students=teacher_product.max_students,
-                    vk_id=teacher.vk_id,
-                    product_id=teacher_product.product_id,
-                )
-            )
         return student_product
 
-    def run_back(self, coro: Coroutine) -> None:
-        task = asyncio.create_task(coro)
-        self.background_tasks.add(task)
-        task.add_done_callback(self.background_tasks.discard)
+
+def pick_teacher_product(
+    candidates: Iterable[EnrollCandidate],
+    teacher_type: TeacherType,
+    flow_id: int | None,
+) -> EnrollCandidate | None:
+    # Same choice as TeacherProductRepository.reserve_for_enroll: the best rated
+    # teacher of the student's flow, otherwise the best rated one overall
+    matching = [c for c in candidates if c.type == teacher_type]
+    if flow_id is not None:
+        in_flow = [c for c in matching if flow_id in c.flow_ids]
+        if in_flow:
+            matching = in_flow
+    return max(matching, key=lambda c: c.rating_coef, default=None)
+
+
+def _teacher_messages(
+    target_path: str,
+    student_vk_id: int,
+    teacher: Teacher,
+    teacher_product: TeacherProduct,
+) -> list[OutboxPayload]:
+    messages: list[OutboxPayload] = [
+        SendTeacherPayload(
+            target_path=target_path,
+            student_vk_id=student_vk_id,
+            teacher_vk_id=teacher.vk_id,
+            teacher_type=teacher_product.type,
+        )
+    ]
+    if teacher_product.active_students > teacher_product.max_students:
+        messages.append(
+            TeacherOverflowPayload(
+                teacher_product_id=teacher_product.id,
+                name=teacher.name,
+                max_students=teacher_product.max_students,
+                vk_id=teacher.vk_id,
+                product_id=teacher_product.product_id,
+            )
+        )
+    return messages
+
+
+def _move_student(
+    student_product: StudentProduct,
+    teacher_product_id: int | None,
+) -> dict[int, int]:
+    # Changes of active_students when a student moves to another teacher,
+    # expelled students are not counted anywhere
+    changes: defaultdict[int, int] = defaultdict(int)
+    if student_product.is_active and student_product.teacher_product_id:
+        changes[student_product.teacher_product_id] -= 1
+    if teacher_product_id is not None:
+        changes[teacher_product_id] += 1
+    return changes
+
+
+def _new_student_product(
+    student_id: int,
+    offer: Offer,
+    teacher_product: EnrollCandidate | None,
+    flow: Flow | None,
+) -> CreateStudentProductModel:
+    return CreateStudentProductModel(
+        student_id=student_id,
+        product_id=offer.product_id,
+        offer_id=offer.id,
+        cohort=offer.cohort,
+        teacher_type=offer.teacher_type,
+        teacher_product_id=teacher_product.id if teacher_product else None,
+        flow_id=flow.id if flow else None,
+    )
+
+
+def _result(
+    enrollment: NewEnrollment,
+    student_product: StudentProduct,
+) -> EnrollmentResult:
+    return EnrollmentResult(
+        vk_id=enrollment.student.vk_id,
+        offer_id=enrollment.offer_id,
+        student_product=student_product,
+    )
+
+
+def _error_detail(error: LMSError) -> str:
+    if isinstance(error, EntityNotFoundError):
+        return error.detail
+    return "Enrollment failed"
+
+
+def _error(enrollment: NewEnrollment, error: str) -> EnrollmentResult:
+    return EnrollmentResult(
+        vk_id=enrollment.student.vk_id,
+        offer_id=enrollment.offer_id,
+        error=error,
+    )
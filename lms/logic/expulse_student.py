@@ -32,6 +32,9 @@ async def expulse_student_by_offer_id(
     )
     if student_product.teacher_product_id is None:
         return
+    await uow.teacher_product.add_active_students(
+        {student_product.teacher_product_id: -1}
+    )
     teacher_product_id = await uow.teacher_assignment.find_last_teacher_product_id(
         student_product_id=student_product.id
     )
@@ -1,35 +1,81 @@
+from collections.abc import Sequence
 from datetime import datetime
 
 from lms.adapters.db.uow import UnitOfWork
-from lms.exceptions import StudentProductHasNotTeacherError, StudentProductNotFoundError
+from lms.exceptions import (
+    EntityNotFoundError,
+    LMSError,
+    ProductNotFoundError,
+    SohoNotFoundError,
+    StudentProductHasNotTeacherError,
+    StudentProductNotFoundError,
+)
+from lms.generals.models.student_product import GradeResult, GradeTarget, TeacherGrade
+
+DUPLICATE_GRADE_ERROR = "Student was already graded on this product in the request"
 
 
 async def grade_teacher(
     uow: UnitOfWork, soho_id: int, product_id: int, grade: int
 ) -> None:
-    soho = await uow.soho.read_by_id(soho_id=soho_id)
-    await uow.product.read_by_id(product_id=product_id)
-    sp = await uow.student_product.find_by_student_and_product(
-        student_id=soho.student_id,
-        product_id=product_id,
-    )
-    if sp is None:
-        raise StudentProductNotFoundError
-    if sp.teacher_product_id is None:
-        raise StudentProductHasNotTeacherError
+    targets = await uow.student_product.find_for_grading([(soho_id, product_id)])
+    student_product_id, teacher_product_id = _resolve(targets[(soho_id, product_id)])
+    await _save_grades(uow, [(student_product_id, teacher_product_id, grade)])
 
-    tp = await uow.teacher_product.read_by_id(
-        teacher_product_id=sp.teacher_product_id,
+
+async def grade_teachers(
+    uow: UnitOfWork, grades: Sequence[TeacherGrade]
+) -> Sequence[GradeResult]:
+    targets = await uow.student_product.find_for_grading(
+        [(g.soho_id, g.product_id) for g in grades]
     )
-    new_counter = tp.grade_counter + 1
-    new_average_grade = (tp.average_grade * tp.grade_counter + grade) / new_counter
-    await uow.teacher_product.update_average_grade(
-        teacher_product_id=tp.id,
-        average_grade=new_average_grade,
-        counter=new_counter,
+    results = []
+    graded = []
+    seen: set[tuple[int, int]] = set()
+    for grade in grades:
+        key = (grade.soho_id, grade.product_id)
+        result = GradeResult(soho_id=grade.soho_id, product_id=grade.product_id)
+        results.append(result)
+        # The first grade of a student wins, a repeated one would be counted
+        # twice in the teacher's average
+        if key in seen:
+            result.error = DUPLICATE_GRADE_ERROR
+            continue
+        seen.add(key)
+        try:
+            student_product_id, teacher_product_id = _resolve(targets[key])
+        except LMSError as e:
+            result.error = _error_message(e)
+        else:
+            graded.append((student_product_id, teacher_product_id, grade.grade))
+    await _save_grades(uow, graded)
+    return results
+
+
+async def _save_grades(uow: UnitOfWork, graded: Sequence[tuple[int, int, int]]) -> None:
+    # (student_product_id, teacher_product_id, grade)
+    await uow.teacher_product.add_grades(
+        (teacher_product_id, grade) for _, teacher_product_id, grade in graded
     )
-    await uow.student_product.update(
-        student_product_id=sp.id,
-        teacher_grade=grade,
-        teacher_graded_at=datetime.now(),
+    await uow.student_product.set_teacher_grades(
+        {student_product_id: grade for student_product_id, _, grade in graded},
+        graded_at=datetime.now(),
     )
+
+
+def _resolve(target: GradeTarget) -> tuple[int, int]:
+    if not target.soho_found:
+        raise SohoNotFoundError
+    if not target.product_found:
+        raise ProductNotFoundError
+    if target.student_product_id is None:
+        raise StudentProductNotFoundError
+    if target.teacher_product_id is None:
+        raise StudentProductHasNotTeacherError
+    return target.student_product_id, target.teacher_product_id
+
+
+def _error_message(error: LMSError) -> str:
+    if isinstance(error, EntityNotFoundError):
+        return error.detail
+    return "Student has not teacher on this product"
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from lms.adapters.db.uow import UnitOfWork
+from lms.adapters.soho.soho import Soho
+
+log = logging.getLogger(__name__)
+
+SOHO_CLIENTS_OFFSET_KEY = "soho_clients_sync_offset"
+SOHO_CLIENTS_REFRESH_OFFSET_KEY = "soho_clients_refresh_offset"
+SOHO_CLIENTS_PAGE_SIZE = 100
+SOHO_CLIENTS_PAGE_PAUSE = 0.5
+SOHO_CLIENTS_REFRESH_PAGES = 10
+
+
+@dataclass(frozen=True, slots=True)
+class SohoClientSynchronizer:
+    uow: UnitOfWork
+    soho: Soho
+    page_size: int = SOHO_CLIENTS_PAGE_SIZE
+    page_pause: float = SOHO_CLIENTS_PAGE_PAUSE
+    # New clients are appended to the directory, but existing ones are
+    # edited anywhere in it. Every incremental run also re-reads this many
+    # pages from a second cursor that wraps around, so an edit is picked up
+    # long before the nightly full sync.
+    refresh_pages: int = SOHO_CLIENTS_REFRESH_PAGES
+
+    async def sync(self, full: bool = False) -> int:
+        offset = 0 if full else await self._read_offset(SOHO_CLIENTS_OFFSET_KEY)
+        # Soho only pages by limit/offset, so one page is re-read to avoid
+        # skipping clients when the directory shifts between runs.
+        offset = max(offset - self.page_size, 0)
+        log.info("Sync soho clients from offset %d (full=%s)", offset, full)
+        synced, offset, _ = await self._walk(offset, key=SOHO_CLIENTS_OFFSET_KEY)
+        log.info("Synced %d soho clients, offset is %d", synced, offset)
+        if full:
+            await self._save_offset(SOHO_CLIENTS_REFRESH_OFFSET_KEY, 0)
+        elif self.refresh_pages:
+            synced += await self._refresh()
+        return synced
+
+    async def _refresh(self) -> int:
+        offset = await self._read_offset(SOHO_CLIENTS_REFRESH_OFFSET_KEY)
+        synced, offset, finished = await self._walk(
+            offset,
+            key=SOHO_CLIENTS_REFRESH_OFFSET_KEY,
+            max_pages=self.refresh_pages,
+        )
+        if finished:
+            offset = 0
+            await self._save_offset(SOHO_CLIENTS_REFRESH_OFFSET_KEY, offset)
+        log.info("Refreshed %d soho clients, next from offset %d", synced, offset)
+        return synced
+
+    async def _walk(
+        self,
+        offset: int,
+        key: str,
+        max_pages: int | None = None,
+    ) -> tuple[int, int, bool]:
+        # Returns the synced clients, the next offset and whether the end
+        # of the directory was reached
+        synced, pages = 0, 0
+        while True:
+            response = await self.soho.client_list(offset=offset, limit=self.page_size)
+            synced += await self.uow.soho_client.upsert_many(response.clients)
+            offset += len(response.clients)
+            await self._save_offset(key, offset)
+            pages += 1
+            if len(response.clients) < response.limit:
+                return synced, offset, True
+            if max_pages is not None and pages >= max_pages:
+                return synced, offset, False
+            await asyncio.sleep(self.page_pause)
+
+    async def _read_offset(self, key: str) -> int:
+        value = await self.uow.setting.get(key)
+        if value is None or not value.isdigit():
+            return 0
+        return int(value)
+
+    async def _save_offset(self, key: str, offset: int) -> None:
+        await self.uow.setting.set(key=key, value=str(offset))
+        await self.uow.commit()
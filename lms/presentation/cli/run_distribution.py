@@ -1,26 +1,92 @@
+import argparse
+import asyncio
 import logging
+import sys
+from collections.abc import Mapping, Sequence
+from concurrent.futures import Executor
+from datetime import datetime
+from pathlib import Path
 
+from aiomisc import ProcessPoolExecutor
 from aiomisc_log import LogFormat, LogLevel, basic_config
 from configargparse import ArgParser
-from pydantic import BaseModel, PositiveInt, PostgresDsn
+from google_api_service_helper import GoogleDrive, GoogleSheets
+from pydantic import BaseModel, PositiveInt, PostgresDsn, SecretStr, TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from lms.adapters.db.uow import UnitOfWork
+from lms.adapters.db.utils import create_async_engine, create_async_session_factory
+from lms.adapters.google.config import load_google_keys
+from lms.adapters.soho.soho import SOHO_BASE_URL, Soho
+from lms.generals.models.distribution import Distribution as StoredDistribution
+from lms.generals.models.distribution import DistributionHomework, DistributionParams
+from lms.logic.batch_distribution import BatchResult, run_batch
+from lms.logic.distribute_homeworks import Distributor
+from lms.logic.sync_soho_clients import SohoClientSynchronizer
+from lms.utils.http import create_web_session
+from lms.utils.stages import StageTracker
 
 log = logging.getLogger(__name__)
 
 
 class RunDistributionSchema(BaseModel):
     pg_dsn: PostgresDsn
+    soho_api_token: SecretStr
+    google_keys: SecretStr
+    concurrency: PositiveInt
+
+    product_id: PositiveInt | None = None
+    name: str | None = None
+    homework_ids: list[PositiveInt] | None = None
+    params_file: Path | None = None
 
-    product_id: PositiveInt
-    name: str
-    homework_ids: list[PositiveInt]
+    def params_list(self) -> Sequence[DistributionParams]:
+        params_list: list[DistributionParams] = []
+        if self.params_file is not None:
+            params_list.extend(
+                TypeAdapter(list[DistributionParams]).validate_json(
+                    self.params_file.read_bytes()
+                )
+            )
+        if self.product_id is not None and self.name and self.homework_ids:
+            params_list.append(
+                DistributionParams(
+                    name=self.name,
+                    product_ids=[self.product_id],
+                    homeworks=[
+                        DistributionHomework(homework_id=homework_id, filters=[])
+                        for homework_id in self.homework_ids
+                    ],
+                )
+            )
+        return params_list
 
 
 def get_parser() -> ArgParser:
-    parser = ArgParser()
+    parser = ArgParser(
+        allow_abbrev=False,
+        auto_env_var_prefix="APP_",
+        description="Run homework distributions without the REST service",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
     parser.add_argument("--pg-dsn", required=True, type=str)
-    parser.add_argument("--product-id", required=True, type=int)
-    parser.add_argument("--name", type=str, required=True)
-    parser.add_argument("--homework-ids", nargs="+", type=int, required=True)
+    parser.add_argument("--soho-api-token", required=True, type=str)
+    parser.add_argument(
+        "--google-keys",
+        required=True,
+        type=str,
+        help="Base64 encoded service account keys",
+    )
+    parser.add_argument("--concurrency", type=int, default=2)
+    group = parser.add_argument_group("Single distribution")
+    group.add_argument("--product-id", type=int)
+    group.add_argument("--name", type=str)
+    group.add_argument("--homework-ids", nargs="+", type=int)
+    parser.add_argument(
+        "--params-file",
+        type=Path,
+        help="JSON list of distribution params, same as the REST endpoint body",
+    )
     group = parser.add_argument_group("Logging options")
     group.add_argument("--log-level", default=LogLevel.info, choices=LogLevel.choices())
     group.add_argument(
@@ -30,19 +96,123 @@ def get_parser() -> ArgParser:
 
 
 async def amain(
-    pg_dsn: PostgresDsn,
-    product_id: int,
-    name: str,
-    homework_ids: list[int],
-) -> None:
-    pass
+    data: RunDistributionSchema,
+    params_list: Sequence[DistributionParams],
+) -> Sequence[BatchResult]:
+    google_keys = load_google_keys(data.google_keys.get_secret_value())
+    google_sheets = GoogleSheets(google_keys=google_keys)
+    google_drive = GoogleDrive(google_keys=google_keys)
+
+    with ProcessPoolExecutor(max_workers=data.concurrency) as process_pool:
+        async with (
+            create_async_engine(connection_uri=str(data.pg_dsn)) as engine,
+            create_web_session() as session,
+        ):
+            sessionmaker = create_async_session_factory(engine=engine)
+            soho = Soho(
+                url=SOHO_BASE_URL,
+                session=session,
+                auth_token=data.soho_api_token.get_secret_value(),
+                client_name="Soho Client",
+            )
+            uow = UnitOfWork(sessionmaker=sessionmaker)
+            async with uow.start():
+                await SohoClientSynchronizer(uow=uow, soho=soho).sync()
+                subject_ids = await _read_subject_ids(uow, params_list)
+
+            async def run(
+                params: DistributionParams,
+                tracker: StageTracker,
+            ) -> StoredDistribution:
+                return await _run_distribution(
+                    sessionmaker=sessionmaker,
+                    soho=soho,
+                    google_sheets=google_sheets,
+                    google_drive=google_drive,
+                    params=params,
+                    tracker=tracker,
+                    executor=process_pool,
+                )
+
+            return await run_batch(
+                params_list=params_list,
+                run=run,
+                concurrency=data.concurrency,
+                subject_ids=subject_ids,
+            )
+
+
+async def _read_subject_ids(
+    uow: UnitOfWork,
+    params_list: Sequence[DistributionParams],
+) -> Mapping[int, int]:
+    subject_ids = {}
+    for product_id in {params.product_ids[0] for params in params_list}:
+        product = await uow.product.read_by_id(product_id=product_id)
+        subject_ids[product_id] = product.subject_id
+    return subject_ids
+
+
+async def _run_distribution(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    soho: Soho,
+    google_sheets: GoogleSheets,
+    google_drive: GoogleDrive,
+    params: DistributionParams,
+    tracker: StageTracker,
+    executor: Executor,
+) -> StoredDistribution:
+    uow = UnitOfWork(sessionmaker=sessionmaker)
+    async with uow.start():
+        distributor = Distributor(
+            uow=uow,
+            google_sheets=google_sheets,
+            google_drive=google_drive,
+            soho=soho,
+            sync_clients=False,
+            executor=executor,
+        )
+        return await distributor.make_distribution(
+            params=params,
+            created_at=datetime.now(),
+            stages=tracker,
+        )
+
+
+def _log_results(results: Sequence[BatchResult]) -> None:
+    for result in results:
+        timings = ", ".join(
+            f"{stage.name}={stage.duration or 0.0:.2f}s" for stage in result.stages
+        )
+        if result.ok:
+            log.info(
+                "%s: distribution #%d, %s",
+                result.params.name,
+                result.distribution_id,
+                timings,
+            )
+        else:
+            log.error(
+                "%s: failed with %s, %s",
+                result.params.name,
+                result.error,
+                timings,
+            )
 
 
 def main() -> None:
     parser = get_parser()
     args = parser.parse_args()
     basic_config(level=args.log_level, log_format=args.log_format)
-    RunDistributionSchema.model_validate(args, from_attributes=True).model_dump()
+
+    data = RunDistributionSchema.model_validate(args, from_attributes=True)
+    params_list = data.params_list()
+    if not params_list:
+        parser.error("pass --params-file or --product-id, --name and --homework-ids")
+    results = asyncio.run(amain(data, params_list))
+    _log_results(results)
+    if not all(result.ok for result in results):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+import argparse
+import json
+import logging
+import random
+from pathlib import Path
+
+from aiomisc_log import LogFormat, LogLevel, basic_config
+from configargparse import ArgParser
+from pydantic import BaseModel, PositiveInt
+
+from lms.utils.distribution.simulation import (
+    SimulationResult,
+    recorded_inputs,
+    simulate,
+    synthetic_homeworks,
+    synthetic_reviewers,
+)
+
+log = logging.getLogger(__name__)
+
+
+class SimulateDistributionSchema(BaseModel):
+    recorded: Path | None
+    homeworks: PositiveInt
+    reviewers: PositiveInt
+    seed: int | None
+    output: Path | None
+
+
+def get_parser() -> ArgParser:
+    parser = ArgParser(
+        allow_abbrev=False,
+        auto_env_var_prefix="APP_",
+        description="Dry-run a homework distribution without external calls",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--recorded",
+        type=Path,
+        help="JSON with `data` of a saved distribution to replay",
+    )
+    parser.add_argument("--homeworks", type=int, default=1000)
+    parser.add_argument("--reviewers", type=int, default=20)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", type=Path, help="Write the result as JSON")
+    group = parser.add_argument_group("Logging options")
+    group.add_argument("--log-level", default=LogLevel.info, choices=LogLevel.choices())
+    group.add_argument(
+        "--log-format", choices=LogFormat.choices(), default=LogFormat.color
+    )
+    return parser
+
+
+def run(data: SimulateDistributionSchema) -> SimulationResult:
+    if data.recorded is not None:
+        recorded = json.loads(data.recorded.read_text())
+        recorded = recorded.get("data", recorded)
+        homeworks, reviewers = recorded_inputs(recorded)
+        seed = data.seed if data.seed is not None else recorded.get("seed")
+    else:
+        seed = data.seed
+        rnd = random.Random(seed)
+        homeworks = synthetic_homeworks(data.homeworks)
+        reviewers = synthetic_reviewers(data.reviewers, data.homeworks, rnd)
+    return simulate(homeworks=homeworks, reviewers=reviewers, seed=seed)
+
+
+def main() -> None:
+    parser = get_parser()
+    args = parser.parse_args()
+    basic_config(level=args.log_level, log_format=args.log_format)
+
+    data = SimulateDistributionSchema.model_validate(args, from_attributes=True)
+    result = run(data)
+    for stage in result.stages:
+        log.info("Stage %s: %.4fs", stage.name, stage.duration or 0.0)
+    log.info(
+        "Homeworks %d, overflow %d, Jain index %.4f, load/desired %.2f..%.2f",
+        result.homeworks,
+        result.overflow,
+        result.fairness.jain_index,
+        result.fairness.min_ratio,
+        result.fairness.max_ratio,
+    )
+    if data.output is not None:
+        data.output.write_text(result.model_dump_json(indent=2))
+        log.info("Result saved to %s", data.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import logging
+
+from aiomisc_log import LogFormat, LogLevel, basic_config
+from configargparse import ArgParser
+from pydantic import BaseModel, PostgresDsn, SecretStr
+
+from lms.adapters.db.uow import UnitOfWork
+from lms.adapters.db.utils import create_async_engine, create_async_session_factory
+from lms.adapters.soho.soho import SOHO_BASE_URL, Soho
+from lms.logic.sync_soho_clients import SohoClientSynchronizer
+from lms.utils.http import create_web_session
+
+log = logging.getLogger(__name__)
+
+
+class SyncSohoClientsSchema(BaseModel):
+    pg_dsn: PostgresDsn
+    soho_api_token: SecretStr
+    full: bool
+
+
+def get_parser() -> ArgParser:
+    parser = ArgParser(
+        allow_abbrev=False,
+        auto_env_var_prefix="APP_",
+        description="Project LMS",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--pg-dsn", required=True, type=str)
+    parser.add_argument("--soho-api-token", required=True, type=str)
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Resync the whole Soho client directory instead of new clients "
+        "and the next refresh pages",
+    )
+    group = parser.add_argument_group("Logging options")
+    group.add_argument("--log-level", default=LogLevel.info, choices=LogLevel.choices())
+    group.add_argument(
+        "--log-format", choices=LogFormat.choices(), default=LogFormat.color
+    )
+    return parser
+
+
+async def amain(pg_dsn: PostgresDsn, soho_api_token: SecretStr, full: bool) -> None:
+    async with create_async_engine(connection_uri=str(pg_dsn)) as engine:
+        uow = UnitOfWork(sessionmaker=create_async_session_factory(engine=engine))
+        async with create_web_session() as session, uow.start():
+            soho = Soho(
+                url=SOHO_BASE_URL,
+                session=session,
+                auth_token=soho_api_token.get_secret_value(),
+                client_name="Soho Client",
+            )
+            await SohoClientSynchronizer(uow=uow, soho=soho).sync(full=full)
+
+
+def main() -> None:
+    parser = get_parser()
+    args = parser.parse_args()
+    basic_config(level=args.log_level, log_format=args.log_format)
+
+    data = SyncSohoClientsSchema.model_validate(args, from_attributes=True)
+    asyncio.run(
+        amain(
+            pg_dsn=data.pg_dsn,
+            soho_api_token=data.soho_api_token,
+            full=data.full,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
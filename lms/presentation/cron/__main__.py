@@ -1,10 +1,15 @@
 import logging
 
-from aiomisc import entrypoint
+from aiomisc import Service, entrypoint
 
 from lms.presentation.cron.config import Config
 from lms.presentation.cron.deps import configure_cron_dependencies
-from lms.presentation.cron.service import NotificationCronService
+from lms.presentation.cron.service import (
+    IdempotencyKeyCronService,
+    NotificationCronService,
+    SohoClientSyncCronService,
+    TeacherStatsCronService,
+)
 
 log = logging.getLogger(__name__)
 
@@ -14,11 +19,26 @@ def main() -> None:
 
     configure_cron_dependencies(config=config)
 
-    services = [
+    services: list[Service] = [
         NotificationCronService(
             scheduler=config.cron.scheduler,
         ),
+        TeacherStatsCronService(
+            scheduler=config.cron.teacher_stats_scheduler,
+        ),
+        IdempotencyKeyCronService(
+            scheduler=config.cron.idempotency_keys_scheduler,
+        ),
     ]
+    if config.cron.soho_clients_sync:
+        services.append(
+            SohoClientSyncCronService(
+                scheduler=config.cron.soho_clients_scheduler,
+                full_scheduler=config.cron.soho_clients_full_scheduler,
+            )
+        )
+    else:
+        log.info("Soho clients sync is disabled")
 
     with entrypoint(
         *services,
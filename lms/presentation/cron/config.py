@@ -4,15 +4,41 @@ from os import environ
 from lms.adapters.autopilot.config import AutopilotConfig
 from lms.adapters.db.config import DatabaseConfig
 from lms.adapters.google.config import GoogleConfig
+from lms.adapters.soho.config import SohoConfig
 from lms.application.config import AppConfig
 from lms.application.logging import LoggingConfig
 
 
+def _soho_clients_sync() -> bool:
+    return environ.get("APP_CRON_SOHO_CLIENTS_SYNC", "true").lower() == "true"
+
+
 @dataclass(frozen=True, kw_only=True, slots=True)
 class CronConfig:
     scheduler: str = field(
         default_factory=lambda: environ.get("APP_CRON_SCHEDULER", "0/30 * * * *")
     )
+    soho_clients_sync: bool = field(default_factory=_soho_clients_sync)
+    soho_clients_scheduler: str = field(
+        default_factory=lambda: environ.get(
+            "APP_CRON_SOHO_CLIENTS_SCHEDULER", "0/10 * * * *"
+        )
+    )
+    soho_clients_full_scheduler: str = field(
+        default_factory=lambda: environ.get(
+            "APP_CRON_SOHO_CLIENTS_FULL_SCHEDULER", "0 3 * * *"
+        )
+    )
+    teacher_stats_scheduler: str = field(
+        default_factory=lambda: environ.get(
+            "APP_CRON_TEACHER_STATS_SCHEDULER", "0 4 * * *"
+        )
+    )
+    idempotency_keys_scheduler: str = field(
+        default_factory=lambda: environ.get(
+            "APP_CRON_IDEMPOTENCY_KEYS_SCHEDULER", "0 * * * *"
+        )
+    )
 
 
 @dataclass(frozen=True, kw_only=True, slots=True)
@@ -23,3 +49,8 @@ class Config:
     autopilot: AutopilotConfig = field(default_factory=AutopilotConfig)
     db: DatabaseConfig = field(default_factory=DatabaseConfig)
     google: GoogleConfig = field(default_factory=GoogleConfig)
+    # The client sync is the only user of Soho here, without it
+    # APP_SOHO_API_TOKEN is not needed
+    soho: SohoConfig | None = field(
+        default_factory=lambda: SohoConfig() if _soho_clients_sync() else None
+    )
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from lms.adapters.autopilot.client import AUTOPILOT_BASE_URL, Autopilot
 from lms.adapters.db.utils import create_async_engine, create_async_session_factory
+from lms.adapters.soho.soho import SOHO_BASE_URL, Soho
 from lms.presentation.cron.config import Config
 from lms.presentation.cron.homework_notification.builder import NotificationBuilder
 from lms.utils.http import create_web_session
@@ -33,6 +34,24 @@ def configure_cron_dependencies(config: Config) -> None:
                 client_name="autopilot",
             )
 
+    if config.soho is not None:
+        soho_config = config.soho
+
+        @dependency
+        async def soho() -> AsyncGenerator[Soho, None]:
+            async with create_web_session() as session:
+                yield Soho(
+                    url=SOHO_BASE_URL,
+                    session=session,
+                    auth_token=soho_config.token,
+                    client_name="Soho Client",
+                    max_concurrency=soho_config.max_concurrency,
+                    rate_limit=soho_config.rate_limit,
+                    max_tries=soho_config.max_tries,
+                    retry_pause=soho_config.retry_pause,
+                    max_retry_pause=soho_config.max_retry_pause,
+                )
+
     @dependency
     async def google_drive() -> GoogleDrive:
         return GoogleDrive(google_keys=config.google.keys)
@@ -1,7 +1,11 @@
 import logging
 
 from aiomisc.service.cron import CronService
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from lms.adapters.db.uow import UnitOfWork
+from lms.adapters.soho.soho import Soho
+from lms.logic.sync_soho_clients import SohoClientSynchronizer
 from lms.presentation.cron.homework_notification.builder import NotificationBuilder
 
 log = logging.getLogger(__name__)
@@ -20,3 +24,75 @@ class NotificationCronService(CronService):
             self.register(notify, spec=self.scheduler)
             log.info("Cron notification was registered")
         await super().start()
+
+
+class SohoClientSyncCronService(CronService):
+    __required__ = ("scheduler", "full_scheduler")
+    __dependencies__ = ("session_factory", "soho")
+
+    scheduler: str
+    full_scheduler: str
+
+    session_factory: async_sessionmaker[AsyncSession]
+    soho: Soho
+
+    async def start(self) -> None:
+        self.register(self.sync, spec=self.scheduler)
+        self.register(self.full_sync, spec=self.full_scheduler)
+        log.info("Cron soho clients sync was registered")
+        await super().start()
+
+    async def sync(self) -> None:
+        await self._sync(full=False)
+
+    async def full_sync(self) -> None:
+        await self._sync(full=True)
+
+    async def _sync(self, full: bool) -> None:
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        async with uow.start():
+            await SohoClientSynchronizer(uow=uow, soho=self.soho).sync(full=full)
+
+
+class TeacherStatsCronService(CronService):
+    __required__ = ("scheduler",)
+    __dependencies__ = ("session_factory",)
+
+    scheduler: str
+
+    session_factory: async_sessionmaker[AsyncSession]
+
+    async def start(self) -> None:
+        self.register(self.recalculate, spec=self.scheduler)
+        log.info("Cron teacher stats recalculation was registered")
+        await super().start()
+
+    async def recalculate(self) -> None:
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        async with uow.start():
+            await uow.teacher_product_stats.recalculate()
+            fixed = await uow.teacher_product.reconcile_active_students()
+            await uow.commit()
+        if fixed:
+            log.warning("Fixed active students of %d teacher products", fixed)
+
+
+class IdempotencyKeyCronService(CronService):
+    __required__ = ("scheduler",)
+    __dependencies__ = ("session_factory",)
+
+    scheduler: str
+
+    session_factory: async_sessionmaker[AsyncSession]
+
+    async def start(self) -> None:
+        self.register(self.delete_expired, spec=self.scheduler)
+        log.info("Cron idempotency keys cleanup was registered")
+        await super().start()
+
+    async def delete_expired(self) -> None:
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        async with uow.start():
+            deleted = await uow.idempotency_key.delete_expired()
+            await uow.commit()
+        log.info("Deleted %d expired idempotency keys", deleted)
@@ -6,6 +6,7 @@ from aiomisc_log import basic_config
 from lms.presentation.rest.config import Config
 from lms.presentation.rest.deps import configure_dependencies
 from lms.presentation.rest.service import REST
+from lms.presentation.worker.service import DistributionWorker, OutboxWorker
 
 log = logging.getLogger(__name__)
 
@@ -30,6 +31,22 @@ def main() -> None:
             description=config.http.description,
             version=config.http.version,
             secret_key=config.security.secret_key,
+            idempotency_ttl=config.http.idempotency_ttl,
+        ),
+        DistributionWorker(
+            concurrency=config.distribution_worker.concurrency,
+            poll_interval=config.distribution_worker.poll_interval,
+            stale_timeout=config.distribution_worker.stale_timeout,
+            store_data=config.distribution_worker.store_data,
+        ),
+        OutboxWorker(
+            batch_size=config.outbox_worker.batch_size,
+            concurrency=config.outbox_worker.concurrency,
+            poll_interval=config.outbox_worker.poll_interval,
+            max_attempts=config.outbox_worker.max_attempts,
+            retry_pause=config.outbox_worker.retry_pause,
+            lease_timeout=config.outbox_worker.lease_timeout,
+            retention=config.outbox_worker.retention,
         ),
     ]
 
@@ -11,6 +11,7 @@ class OfferModelView(BaseModelView, model=OfferDb):
         OfferDb.name,
         OfferDb.cohort,
         OfferDb.teacher_type,
+        OfferDb.is_premium,
         OfferDb.created_at,
         OfferDb.updated_at,
     ]
@@ -19,6 +20,7 @@ class OfferModelView(BaseModelView, model=OfferDb):
         OfferDb.name,
         OfferDb.cohort,
         OfferDb.teacher_type,
+        OfferDb.is_premium,
     ]
     column_default_sort = "id"
     column_formatters = {
@@ -37,6 +39,7 @@ class OfferModelView(BaseModelView, model=OfferDb):
         OfferDb.name,
         OfferDb.cohort,
         OfferDb.teacher_type,
+        OfferDb.is_premium,
         OfferDb.created_at,
         OfferDb.updated_at,
     ]
@@ -51,4 +54,5 @@ class OfferModelView(BaseModelView, model=OfferDb):
         OfferDb.name,
         OfferDb.cohort,
         OfferDb.teacher_type,
+        OfferDb.is_premium,
     ]
@@ -14,6 +14,8 @@ class ReviewerModelView(BaseModelView, model=ReviewerDb):
         ReviewerDb.max_,
         ReviewerDb.abs_max,
         ReviewerDb.is_active,
+        ReviewerDb.is_premium,
+        ReviewerDb.recheck,
         ReviewerDb.created_at,
         ReviewerDb.updated_at,
     ]
@@ -25,6 +27,8 @@ class ReviewerModelView(BaseModelView, model=ReviewerDb):
         ReviewerDb.max_,
         ReviewerDb.abs_max,
         ReviewerDb.is_active,
+        ReviewerDb.is_premium,
+        ReviewerDb.recheck,
         ReviewerDb.created_at,
         ReviewerDb.updated_at,
     ]
@@ -48,6 +52,8 @@ class ReviewerModelView(BaseModelView, model=ReviewerDb):
         ReviewerDb.max_,
         ReviewerDb.abs_max,
         ReviewerDb.is_active,
+        ReviewerDb.is_premium,
+        ReviewerDb.recheck,
         ReviewerDb.created_at,
         ReviewerDb.updated_at,
     ]
@@ -65,4 +71,6 @@ class ReviewerModelView(BaseModelView, model=ReviewerDb):
         ReviewerDb.max_,
         ReviewerDb.abs_max,
         ReviewerDb.is_active,
+        ReviewerDb.is_premium,
+        ReviewerDb.recheck,
     ]
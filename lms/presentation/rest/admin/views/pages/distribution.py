@@ -2,7 +2,7 @@ import logging
 from collections.abc import Sequence
 from datetime import datetime
 from functools import cached_property
-from http import HTTPMethod
+from http import HTTPMethod, HTTPStatus
 
 from pydantic import ValidationError
 from sqladmin import BaseView, expose
@@ -36,8 +36,7 @@ class DistributionView(BaseView):
             form_data = await request.form()
             try:
                 params = DistributionParams.parse_form(form_data)
-                await self._call_create_distribution(params=params)
-                result["msg"] = "Distribution was created!"
+                result["msg"] = await self._call_create_distribution(params=params)
             except ValidationError as e:
                 log.info("Form not parsed")
                 errors = e.errors()
@@ -54,7 +53,7 @@ class DistributionView(BaseView):
             },
         )
 
-    async def _call_create_distribution(self, params: DistributionParams) -> None:
+    async def _call_create_distribution(self, params: DistributionParams) -> str:
         url = URL(f"http://{self.host}:{self.port}/v1/products/distribute/").with_query(
             dict(token=self.token)
         )
@@ -62,8 +61,14 @@ class DistributionView(BaseView):
             async with session.post(
                 url, json=params.model_dump(mode="json")
             ) as response:
-                a = await response.text()
-                log.info("response: %s ", a)
+                data = await response.json()
+                log.info("response: %s ", data)
+        if response.status != HTTPStatus.ACCEPTED:
+            return f"Distribution was not queued: {data.get('message')}"
+        return (
+            f"Distribution job #{data['job_id']} was queued, "
+            f"see /v1/distributions/jobs/{data['job_id']}/ for progress"
+        )
 
     async def _get_product_list(self) -> Sequence[Product]:
         async with self.session_factory() as session:
@@ -30,5 +30,5 @@ class EnrollerMarker:
     pass
 
 
-class DistributorMarker:
+class EntityCacheMarker:
     pass
@@ -0,0 +1,73 @@
+from collections.abc import Sequence
+from datetime import datetime
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import PositiveInt
+
+from lms.adapters.db.uow import UnitOfWork
+from lms.generals.models.distribution import (
+    DistributionAssignment,
+    DistributionJob,
+    ReviewerWorkload,
+)
+from lms.generals.models.pagination import Pagination
+from lms.presentation.rest.api.auth import token_required
+from lms.presentation.rest.api.deps import UnitOfWorkMarker
+from lms.presentation.rest.api.v1.schemas import StatusResponseSchema
+
+router = APIRouter(
+    prefix="/distributions",
+    tags=["Distributions"],
+    dependencies=[Depends(token_required)],
+)
+
+
+@router.get(
+    "/jobs/{job_id}/",
+    response_model=DistributionJob,
+    responses={
+        HTTPStatus.OK: {"model": DistributionJob},
+        HTTPStatus.FORBIDDEN: {"model": StatusResponseSchema},
+        HTTPStatus.NOT_FOUND: {"model": StatusResponseSchema},
+    },
+)
+async def read_job_by_id(
+    job_id: PositiveInt,
+    uow: UnitOfWork = Depends(UnitOfWorkMarker),
+) -> DistributionJob:
+    async with uow.start():
+        job = await uow.distribution_job.read_by_id(job_id=job_id)
+    return job
+
+
+@router.get("/reviewers/{reviewer_id}/workload/")
+async def read_reviewer_workload(
+    reviewer_id: PositiveInt,
+    date_from: datetime | None = Query(default=None),
+    date_to: datetime | None = Query(default=None),
+    uow: UnitOfWork = Depends(UnitOfWorkMarker),
+) -> Sequence[ReviewerWorkload]:
+    async with uow.start():
+        workload = await uow.distribution_assignment.reviewer_workload(
+            reviewer_id=reviewer_id,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    return workload
+
+
+@router.get("/students/{soho_id}/history/")
+async def read_student_history(
+    soho_id: PositiveInt,
+    page: int = Query(gt=0, default=1),
+    page_size: int = Query(gt=0, le=100, default=20),
+    uow: UnitOfWork = Depends(UnitOfWorkMarker),
+) -> Pagination[DistributionAssignment]:
+    async with uow.start():
+        pagination = await uow.distribution_assignment.paginate_by_student(
+            student_soho_id=soho_id,
+            page=page,
+            page_size=page_size,
+        )
+    return pagination
@@ -0,0 +1,5 @@
+from lms.presentation.rest.api.v1.schemas import StatusResponseSchema
+
+
+class DistributionJobCreatedSchema(StatusResponseSchema):
+    job_id: int
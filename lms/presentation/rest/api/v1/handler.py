@@ -7,6 +7,7 @@ from fastapi.responses import JSONResponse
 
 from lms.exceptions import (
     EntityNotFoundError,
+    IdempotencyKeyReusedError,
     LMSError,
     StudentAlreadyEnrolledError,
     StudentProductAlreadyExpulsedError,
@@ -59,6 +60,12 @@ async def lms_exception_handler(request: Request, exc: LMSError) -> JSONResponse
             detail="StudentProduct already expulsed",
         )
 
+    if isinstance(exc, IdempotencyKeyReusedError):
+        return exception_json_response(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Idempotency key was used for another request",
+        )
+
     if isinstance(exc, EntityNotFoundError):
         return exception_json_response(
             status_code=status.HTTP_404_NOT_FOUND,
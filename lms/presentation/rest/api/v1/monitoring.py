@@ -4,9 +4,10 @@ from fastapi import APIRouter, Depends, Response
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
+from lms.adapters.db.cache import EntityCache
 from lms.adapters.db.uow import UnitOfWork
-from lms.presentation.rest.api.deps import UnitOfWorkMarker
-from lms.presentation.rest.api.v1.schemas import MonitoringSchema
+from lms.presentation.rest.api.deps import EntityCacheMarker, UnitOfWorkMarker
+from lms.presentation.rest.api.v1.schemas import CacheStatsSchema, MonitoringSchema
 
 router = APIRouter(tags=["Monitoring"], prefix="/monitoring")
 
@@ -32,3 +33,12 @@ async def ping(
 
     response.status_code = status_code
     return MonitoringSchema(db_status=db_status)
+
+
+@router.get("/cache")
+async def cache_stats(
+    cache: EntityCache = Depends(EntityCacheMarker),
+) -> CacheStatsSchema:
+    return CacheStatsSchema.model_validate(
+        {"enabled": cache.enabled, "regions": cache.stats()}
+    )
@@ -1,4 +1,3 @@
-from datetime import datetime
 from http import HTTPStatus
 
 from fastapi import APIRouter, Depends, Query
@@ -8,9 +7,11 @@ from lms.adapters.db.uow import UnitOfWork
 from lms.generals.models.distribution import DistributionParams
 from lms.generals.models.pagination import Pagination
 from lms.generals.models.product import Product
-from lms.logic.distribute_homeworks import Distributor
 from lms.presentation.rest.api.auth import token_required
-from lms.presentation.rest.api.deps import DistributorMarker, UnitOfWorkMarker
+from lms.presentation.rest.api.deps import UnitOfWorkMarker
+from lms.presentation.rest.api.v1.distribution.schemas import (
+    DistributionJobCreatedSchema,
+)
 from lms.presentation.rest.api.v1.schemas import StatusResponseSchema
 
 router = APIRouter(
@@ -52,15 +53,30 @@ async def read_product_by_id(
     return product
 
 
-@router.post("/distribute/")
+@router.post(
+    "/distribute/",
+    status_code=HTTPStatus.ACCEPTED,
+    response_model=DistributionJobCreatedSchema,
+    responses={
+        HTTPStatus.ACCEPTED: {"model": DistributionJobCreatedSchema},
+        HTTPStatus.FORBIDDEN: {"model": StatusResponseSchema},
+        HTTPStatus.NOT_FOUND: {"model": StatusResponseSchema},
+    },
+)
 async def create_distribution(
     params: DistributionParams,
-    distributor: Distributor = Depends(DistributorMarker),
-) -> StatusResponseSchema:
-    now = datetime.now()
-    await distributor.make_distribution(params=params, created_at=now)
-    return StatusResponseSchema(
+    uow: UnitOfWork = Depends(UnitOfWorkMarker),
+) -> DistributionJobCreatedSchema:
+    async with uow.start():
+        product = await uow.product.read_by_id(product_id=params.product_ids[0])
+        job = await uow.distribution_job.create(
+            subject_id=product.subject_id,
+            params=params,
+        )
+        await uow.commit()
+    return DistributionJobCreatedSchema(
         ok=True,
-        status_code=HTTPStatus.CREATED,
-        message="The distribution was created",
+        status_code=HTTPStatus.ACCEPTED,
+        message="The distribution job was queued",
+        job_id=job.id,
     )
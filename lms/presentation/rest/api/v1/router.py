@@ -1,5 +1,8 @@
 from fastapi import APIRouter
 
+from lms.presentation.rest.api.v1.distribution.router import (
+    router as distribution_router,
+)
 from lms.presentation.rest.api.v1.monitoring import router as monitoring_router
 from lms.presentation.rest.api.v1.product.router import router as product_router
 from lms.presentation.rest.api.v1.student.router import router as student_router
@@ -10,3 +13,4 @@ router.include_router(monitoring_router)
 router.include_router(student_router)
 router.include_router(product_router)
 router.include_router(subject_router)
+router.include_router(distribution_router)
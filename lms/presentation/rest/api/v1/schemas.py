@@ -9,6 +9,17 @@ class MonitoringSchema(BaseModel):
     db_status: Literal["ok", "internal_error"]
 
 
+class CacheRegionStatsSchema(BaseModel):
+    hits: int
+    misses: int
+    size: int
+
+
+class CacheStatsSchema(BaseModel):
+    enabled: bool
+    regions: dict[str, CacheRegionStatsSchema]
+
+
 class StatusResponseSchema(BaseModel):
     ok: bool
     status_code: PositiveInt
@@ -1,19 +1,27 @@
+import hashlib
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends, Path
+from fastapi import APIRouter, Depends, Header, Path
 from pydantic import PositiveInt
 
 from lms.adapters.db.uow import UnitOfWork
-from lms.generals.models.student import NewStudent, Student
-from lms.generals.models.student_product import StudentProduct
+from lms.generals.models.student import NewEnrollment, NewStudent, Student
+from lms.generals.models.student_product import (
+    EnrollmentResult,
+    GradeResult,
+    StudentProduct,
+    TeacherGrade,
+)
 from lms.logic.change_vk_id import change_student_vk_id_by_soho_id
 from lms.logic.enroll_student import Enroller
 from lms.logic.expulse_student import expulse_student_by_offer_id
-from lms.logic.grade_teacher import grade_teacher
+from lms.logic.grade_teacher import grade_teacher, grade_teachers
 from lms.presentation.rest.api.auth import token_required
 from lms.presentation.rest.api.deps import EnrollerMarker, UnitOfWorkMarker
 from lms.presentation.rest.api.v1.schemas import StatusResponseSchema
 from lms.presentation.rest.api.v1.student.schemas import (
+    BulkEnrollStudentSchema,
+    BulkGradeTeacherSchema,
     ChangeTeacherSchema,
     ChangeVKIDSchema,
     EnrollStudentSchema,
@@ -31,24 +39,46 @@ router = APIRouter(
 @router.post("/")
 async def enroll_student_route(
     enrollment: EnrollStudentSchema,
+    idempotency_key: str | None = Header(
+        default=None,
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=200,
+    ),
     enroller: Enroller = Depends(EnrollerMarker),
 ) -> StudentProduct:
+    # Soho retries slow webhooks, a retry gets the response of the first try
+    request_hash = hashlib.sha256(enrollment.model_dump_json().encode()).hexdigest()
     async with enroller.uow.start():
-        student_product = await enroller.enroll_student(
-            new_student=NewStudent(
-                vk_id=enrollment.student.vk_id,
-                soho_id=enrollment.student.soho_id,
-                email=enrollment.student.email,
-                first_name=enrollment.student.first_name,
-                last_name=enrollment.student.last_name,
-                flow_id=enrollment.student.raw_soho_flow_id.flow_id,  # type: ignore[union-attr]
-            ),
+        student_product = await enroller.enroll_student_once(
+            idempotency_key=f"enroll:{idempotency_key or request_hash}",
+            request_hash=request_hash,
+            new_student=_new_student(enrollment),
             offer_ids=enrollment.offer_ids,
         )
         await enroller.uow.commit()
     return student_product
 
 
+@router.post("/bulk/")
+async def bulk_enroll_students_route(
+    bulk: BulkEnrollStudentSchema,
+    enroller: Enroller = Depends(EnrollerMarker),
+) -> list[EnrollmentResult]:
+    async with enroller.uow.start():
+        results = await enroller.enroll_students(
+            enrollments=[
+                NewEnrollment(
+                    student=_new_student(enrollment),
+                    offer_id=enrollment.offer_ids[0],
+                )
+                for enrollment in bulk.enrollments
+            ],
+        )
+        await enroller.uow.commit()
+    return list(results)
+
+
 @router.post("/expulse/")
 async def expulsion_student_route(
     expulsion_data: ExpulsionStudentSchema,
@@ -140,3 +170,35 @@ async def grade_teacher_route(
         status_code=HTTPStatus.OK,
         message="Teacher was graded",
     )
+
+
+@router.post("/grade-teacher/bulk/")
+async def bulk_grade_teacher_route(
+    bulk: BulkGradeTeacherSchema,
+    uow: UnitOfWork = Depends(UnitOfWorkMarker),
+) -> list[GradeResult]:
+    async with uow.start():
+        results = await grade_teachers(
+            uow=uow,
+            grades=[
+                TeacherGrade(
+                    soho_id=grade_data.soho_id,
+                    product_id=grade_data.product_id,
+                    grade=grade_data.grade,
+                )
+                for grade_data in bulk.grades
+            ],
+        )
+        await uow.commit()
+    return list(results)
+
+
+def _new_student(enrollment: EnrollStudentSchema) -> NewStudent:
+    return NewStudent(
+        vk_id=enrollment.student.vk_id,
+        soho_id=enrollment.student.soho_id,
+        email=enrollment.student.email,
+        first_name=enrollment.student.first_name,
+        last_name=enrollment.student.last_name,
+        flow_id=enrollment.student.raw_soho_flow_id.flow_id,  # type: ignore[union-attr]
+    )
@@ -48,6 +48,10 @@ class EnrollStudentSchema(BaseModel):
     offer_ids: list[PositiveInt]
 
 
+class BulkEnrollStudentSchema(BaseModel):
+    enrollments: list[EnrollStudentSchema] = Field(min_length=1, max_length=1000)
+
+
 class ExpulsionStudentSchema(BaseModel):
     vk_id: PositiveInt
     product_id: PositiveInt
@@ -71,6 +75,14 @@ class GradeTeacherSchema(BaseModel):
     product_id: PositiveInt
 
 
+class BulkGradeTeacherItemSchema(GradeTeacherSchema):
+    soho_id: PositiveInt
+
+
+class BulkGradeTeacherSchema(BaseModel):
+    grades: list[BulkGradeTeacherItemSchema] = Field(min_length=1, max_length=10000)
+
+
 class ChangeTeacherSchema(BaseModel):
     product_id: PositiveInt
     student_vk_id: PositiveInt
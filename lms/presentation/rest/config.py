@@ -8,6 +8,10 @@ from lms.application.config import AppConfig
 from lms.application.http import HttpConfig
 from lms.application.logging import LoggingConfig
 from lms.application.security import SecurityConfig
+from lms.presentation.worker.config import (
+    DistributionWorkerConfig,
+    OutboxWorkerConfig,
+)
 
 
 @dataclass(frozen=True, slots=True, kw_only=True)
@@ -20,3 +24,7 @@ class Config:
     soho: SohoConfig = field(default_factory=SohoConfig)
     google: GoogleConfig = field(default_factory=GoogleConfig)
     http: HttpConfig = field(default_factory=HttpConfig)
+    distribution_worker: DistributionWorkerConfig = field(
+        default_factory=DistributionWorkerConfig
+    )
+    outbox_worker: OutboxWorkerConfig = field(default_factory=OutboxWorkerConfig)
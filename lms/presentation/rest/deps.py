@@ -1,16 +1,17 @@
-from collections.abc import AsyncGenerator, Callable
+from collections.abc import AsyncGenerator
+from concurrent.futures import Executor
 
+from aiomisc import ProcessPoolExecutor
 from aiomisc_dependency import dependency
 from google_api_service_helper import GoogleDrive, GoogleSheets
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from lms.adapters.autopilot.client import AUTOPILOT_BASE_URL, Autopilot
-from lms.adapters.db.uow import UnitOfWork
+from lms.adapters.db.cache import EntityCache, listen_entity_changes
 from lms.adapters.db.utils import create_async_engine, create_async_session_factory
 from lms.adapters.soho.soho import SOHO_BASE_URL, Soho
+from lms.adapters.telegram.alerts import AlertAggregator
 from lms.adapters.telegram.telegram import TELEGRAM_BASE_URL, Telegram
-from lms.logic.distribute_homeworks import Distributor
-from lms.logic.enroll_student import Enroller
 from lms.presentation.rest.config import Config
 from lms.utils.http import create_web_session
 
@@ -28,6 +29,15 @@ def configure_dependencies(config: Config) -> None:  # noqa: C901
     async def session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
         return create_async_session_factory(engine=engine)
 
+    @dependency
+    async def entity_cache(engine: AsyncEngine) -> AsyncGenerator[EntityCache, None]:
+        cache = EntityCache(
+            ttl=config.db.cache_ttl,
+            max_size=config.db.cache_max_size,
+        )
+        async with listen_entity_changes(engine=engine, cache=cache):
+            yield cache
+
     @dependency
     async def autopilot() -> AsyncGenerator[Autopilot, None]:
         async with create_web_session() as session:
@@ -49,6 +59,16 @@ def configure_dependencies(config: Config) -> None:  # noqa: C901
                 client_name="telegram",
             )
 
+    @dependency
+    async def alerts(telegram: Telegram) -> AsyncGenerator[AlertAggregator, None]:
+        async with AlertAggregator(
+            telegram=telegram,
+            window=config.telegram.alert_window,
+            rate_limit=config.telegram.alert_rate_limit,
+            burst=config.telegram.alert_burst,
+        ) as alerts:
+            yield alerts
+
     @dependency
     async def soho() -> AsyncGenerator[Soho, None]:
         async with create_web_session() as session:
@@ -57,8 +77,20 @@ def configure_dependencies(config: Config) -> None:  # noqa: C901
                 session=session,
                 auth_token=config.soho.token,
                 client_name="Soho Client",
+                max_concurrency=config.soho.max_concurrency,
+                rate_limit=config.soho.rate_limit,
+                max_tries=config.soho.max_tries,
+                retry_pause=config.soho.retry_pause,
+                max_retry_pause=config.soho.max_retry_pause,
             )
 
+    @dependency
+    async def process_pool() -> AsyncGenerator[Executor, None]:
+        with ProcessPoolExecutor(
+            max_workers=config.distribution_worker.processes,
+        ) as pool:
+            yield pool
+
     @dependency
     async def google_sheets() -> GoogleSheets:
         return GoogleSheets(google_keys=config.google.keys)
@@ -67,35 +99,4 @@ def configure_dependencies(config: Config) -> None:  # noqa: C901
     async def google_drive() -> GoogleDrive:
         return GoogleDrive(google_keys=config.google.keys)
 
-    @dependency
-    async def get_distributor(
-        session_factory: async_sessionmaker[AsyncSession],
-        google_sheets: GoogleSheets,
-        google_drive: GoogleDrive,
-        soho: Soho,
-    ) -> Callable:
-        async def new_distributor() -> AsyncGenerator[Distributor, None]:
-            uow = UnitOfWork(sessionmaker=session_factory)
-            async with uow.start():
-                yield Distributor(
-                    uow=uow,
-                    google_drive=google_drive,
-                    google_sheets=google_sheets,
-                    soho=soho,
-                )
-
-        return new_distributor
-
-    @dependency
-    async def enroller(
-        session_factory: async_sessionmaker[AsyncSession],
-        autopilot: Autopilot,
-        telegram: Telegram,
-    ) -> Enroller:
-        return Enroller(
-            uow=UnitOfWork(session_factory),
-            autopilot=autopilot,
-            telegram=telegram,
-        )
-
     return
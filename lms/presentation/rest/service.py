@@ -1,5 +1,6 @@
 import logging
 from collections.abc import Callable
+from datetime import timedelta
 
 from aiomisc.service.uvicorn import UvicornApplication, UvicornService
 from fastapi import FastAPI, HTTPException
@@ -8,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from starlette.middleware.cors import CORSMiddleware
 
 from lms.adapters.autopilot.client import Autopilot
+from lms.adapters.db.cache import EntityCache
 from lms.adapters.db.uow import UnitOfWork
 from lms.adapters.soho.soho import Soho
 from lms.adapters.telegram.telegram import Telegram
@@ -17,8 +19,8 @@ from lms.presentation.rest.admin.setup_admin import configure_admin
 from lms.presentation.rest.api.deps import (
     AutopilotMarker,
     DebugMarker,
-    DistributorMarker,
     EnrollerMarker,
+    EntityCacheMarker,
     SecretKeyMarker,
     SohoMarker,
     TelegramMarker,
@@ -43,14 +45,14 @@ class REST(UvicornService):
         "description",
         "version",
         "secret_key",
+        "idempotency_ttl",
     )
     __dependencies__ = (
         "autopilot",
         "soho",
         "telegram",
         "session_factory",
-        "get_distributor",
-        "enroller",
+        "entity_cache",
     )
 
     EXCEPTION_HANDLERS: ExceptionHandlersType = (
@@ -63,8 +65,7 @@ class REST(UvicornService):
     autopilot: Autopilot
     soho: Soho
     telegram: Telegram
-    get_distributor: Callable
-    enroller: Enroller
+    entity_cache: EntityCache
 
     debug: bool
     title: str
@@ -72,6 +73,8 @@ class REST(UvicornService):
     version: str
 
     secret_key: str
+    # Seconds a response to an enrollment is replayed for its retries
+    idempotency_ttl: int
 
     async def create_application(self) -> UvicornApplication:
         app = FastAPI(
@@ -120,13 +123,24 @@ class REST(UvicornService):
     def _set_dependency_overrides(self, app: FastAPI) -> None:
         app.dependency_overrides.update(
             {
-                UnitOfWorkMarker: lambda: UnitOfWork(self.session_factory),
+                UnitOfWorkMarker: self._create_uow,
                 SecretKeyMarker: lambda: self.secret_key,
                 DebugMarker: lambda: self.debug,
                 AutopilotMarker: lambda: self.autopilot,
                 SohoMarker: lambda: self.soho,
                 TelegramMarker: lambda: self.telegram,
-                EnrollerMarker: lambda: self.enroller,
-                DistributorMarker: self.get_distributor,
+                EnrollerMarker: self._create_enroller,
+                EntityCacheMarker: lambda: self.entity_cache,
             }
         )
+
+    # Called for every request: a unit of work holds the session and the
+    # identity map of one request and must never be shared between them
+    def _create_uow(self) -> UnitOfWork:
+        return UnitOfWork(self.session_factory, cache=self.entity_cache)
+
+    def _create_enroller(self) -> Enroller:
+        return Enroller(
+            uow=self._create_uow(),
+            idempotency_ttl=timedelta(seconds=self.idempotency_ttl),
+        )
@@ -0,0 +1,62 @@
+from dataclasses import dataclass, field
+from os import environ
+
+
+@dataclass(frozen=True, kw_only=True, slots=True)
+class DistributionWorkerConfig:
+    concurrency: int = field(
+        default_factory=lambda: int(
+            environ.get("APP_DISTRIBUTION_WORKER_CONCURRENCY", "2")
+        )
+    )
+    poll_interval: float = field(
+        default_factory=lambda: float(
+            environ.get("APP_DISTRIBUTION_WORKER_POLL_INTERVAL", "2")
+        )
+    )
+    stale_timeout: float = field(
+        default_factory=lambda: float(
+            environ.get("APP_DISTRIBUTION_WORKER_STALE_TIMEOUT", "900")
+        )
+    )
+    processes: int = field(
+        default_factory=lambda: int(
+            environ.get("APP_DISTRIBUTION_WORKER_PROCESSES", "2")
+        )
+    )
+    store_data: bool = field(
+        default_factory=lambda: (
+            environ.get("APP_DISTRIBUTION_WORKER_STORE_DATA", "true").lower() == "true"
+        )
+    )
+
+
+@dataclass(frozen=True, kw_only=True, slots=True)
+class OutboxWorkerConfig:
+    batch_size: int = field(
+        default_factory=lambda: int(environ.get("APP_OUTBOX_WORKER_BATCH_SIZE", "100"))
+    )
+    concurrency: int = field(
+        default_factory=lambda: int(environ.get("APP_OUTBOX_WORKER_CONCURRENCY", "10"))
+    )
+    poll_interval: float = field(
+        default_factory=lambda: float(
+            environ.get("APP_OUTBOX_WORKER_POLL_INTERVAL", "1")
+        )
+    )
+    max_attempts: int = field(
+        default_factory=lambda: int(environ.get("APP_OUTBOX_WORKER_MAX_ATTEMPTS", "8"))
+    )
+    retry_pause: float = field(
+        default_factory=lambda: float(environ.get("APP_OUTBOX_WORKER_RETRY_PAUSE", "5"))
+    )
+    lease_timeout: float = field(
+        default_factory=lambda: float(
+            environ.get("APP_OUTBOX_WORKER_LEASE_TIMEOUT", "300")
+        )
+    )
+    retention: float = field(
+        default_factory=lambda: float(
+            environ.get("APP_OUTBOX_WORKER_RETENTION", str(7 * 24 * 3600))
+        )
+    )
@@ -0,0 +1,345 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any
+
+from aiomisc import Service
+from google_api_service_helper import GoogleDrive, GoogleSheets
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from lms.adapters.autopilot.client import Autopilot
+from lms.adapters.db.uow import UnitOfWork
+from lms.adapters.soho.soho import Soho
+from lms.adapters.telegram.alerts import AlertAggregator
+from lms.generals.enums import DistributionJobStatus
+from lms.generals.models.distribution import DistributionJob
+from lms.generals.models.outbox import OutboxMessage
+from lms.logic.deliver_outbox import deliver_message
+from lms.logic.distribute_homeworks import Distributor
+from lms.utils.loop_lag import measure_loop_lag
+from lms.utils.stages import Stage, StageTracker
+
+log = logging.getLogger(__name__)
+
+ERROR_MAX_LENGTH = 4096
+MAX_RETRY_PAUSE = 3600
+# A distribution creates a Drive folder and a sheet on its way, replaying an
+# interrupted one would duplicate them, so it has to be started again by hand
+INTERRUPTED_ERROR = "Distribution was interrupted, start it again"
+
+
+class DistributionWorker(Service):
+    __required__ = ("concurrency", "poll_interval", "stale_timeout")
+    __dependencies__ = (
+        "session_factory",
+        "soho",
+        "google_sheets",
+        "google_drive",
+        "process_pool",
+    )
+
+    concurrency: int
+    poll_interval: float
+    stale_timeout: float
+    store_data: bool = True
+
+    session_factory: async_sessionmaker[AsyncSession]
+    soho: Soho
+    google_sheets: GoogleSheets
+    google_drive: GoogleDrive
+    process_pool: Executor
+
+    _loop_task: asyncio.Task
+    _jobs: dict[asyncio.Task, int]
+
+    async def start(self) -> None:
+        self._jobs = {}
+        await self._fail_stale()
+        self._loop_task = asyncio.create_task(self._run())
+        log.info("Distribution worker started")
+
+    async def stop(self, exception: Exception | None = None) -> None:
+        self._loop_task.cancel()
+        for task in self._jobs:
+            task.cancel()
+        await asyncio.gather(self._loop_task, *self._jobs, return_exceptions=True)
+
+    async def _run(self) -> None:
+        stale_timeout = timedelta(seconds=self.stale_timeout)
+        last_stale_check = datetime.now()
+        while True:
+            job = None
+            try:
+                if datetime.now() - last_stale_check > stale_timeout:
+                    await self._fail_stale()
+                    last_stale_check = datetime.now()
+                await self._heartbeat()
+                if len(self._jobs) < self.concurrency:
+                    job = await self._claim()
+            except Exception:
+                log.exception("Failed to poll distribution jobs")
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            task = asyncio.create_task(self._execute(job))
+            self._jobs[task] = job.id
+            task.add_done_callback(self._forget)
+
+    def _forget(self, task: asyncio.Task) -> None:
+        self._jobs.pop(task, None)
+
+    async def _heartbeat(self) -> None:
+        if not self._jobs:
+            return
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        async with uow.start():
+            await uow.distribution_job.heartbeat(job_ids=list(self._jobs.values()))
+            await uow.commit()
+
+    async def _claim(self) -> DistributionJob | None:
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        async with uow.start():
+            job = await uow.distribution_job.claim_next()
+            await uow.commit()
+        return job
+
+    async def _execute(self, job: DistributionJob) -> None:
+        log.info("Distribution job %d started", job.id)
+        tracker = StageTracker(on_change=partial(self._save_stages, job.id))
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        try:
+            async with uow.start(), measure_loop_lag() as lag:
+                distributor = Distributor(
+                    uow=uow,
+                    google_sheets=self.google_sheets,
+                    google_drive=self.google_drive,
+                    soho=self.soho,
+                    store_data=self.store_data,
+                    executor=self.process_pool,
+                )
+                distribution = await distributor.make_distribution(
+                    params=job.params,
+                    created_at=job.created_at,
+                    stages=tracker,
+                )
+        except asyncio.CancelledError:
+            log.warning("Distribution job %d was interrupted", job.id)
+            await self._finish(
+                job.id,
+                status=DistributionJobStatus.FAILED,
+                error=INTERRUPTED_ERROR,
+            )
+            raise
+        except Exception as e:
+            log.exception("Distribution job %d failed", job.id)
+            await self._finish(
+                job.id,
+                status=DistributionJobStatus.FAILED,
+                error=repr(e)[:ERROR_MAX_LENGTH],
+            )
+        else:
+            log.info(
+                "Distribution job %d succeeded, event loop lag max %.3fs mean %.3fs",
+                job.id,
+                lag.max,
+                lag.mean,
+            )
+            await self._finish(
+                job.id,
+                status=DistributionJobStatus.SUCCEEDED,
+                distribution_id=distribution.id,
+            )
+
+    async def _save_stages(self, job_id: int, stages: Sequence[Stage]) -> None:
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        async with uow.start():
+            await uow.distribution_job.update_stages(job_id=job_id, stages=stages)
+            await uow.commit()
+
+    async def _finish(
+        self,
+        job_id: int,
+        status: DistributionJobStatus,
+        distribution_id: int | None = None,
+        error: str | None = None,
+    ) -> None:
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        async with uow.start():
+            await uow.distribution_job.finish(
+                job_id=job_id,
+                status=status,
+                distribution_id=distribution_id,
+                error=error,
+            )
+            await uow.commit()
+
+    async def _fail_stale(self) -> None:
+        updated_before = datetime.now() - timedelta(seconds=self.stale_timeout)
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        async with uow.start():
+            count = await uow.distribution_job.fail_stale(
+                updated_before=updated_before,
+                error=INTERRUPTED_ERROR,
+            )
+            await uow.commit()
+        if count:
+            log.warning("%d stale distribution jobs were failed", count)
+
+
+class OutboxWorker(Service):
+    __required__ = (
+        "batch_size",
+        "concurrency",
+        "poll_interval",
+        "max_attempts",
+        "retry_pause",
+        "lease_timeout",
+        "retention",
+    )
+    __dependencies__ = ("session_factory", "autopilot", "alerts")
+
+    batch_size: int
+    concurrency: int
+    poll_interval: float
+    max_attempts: int
+    retry_pause: float
+    lease_timeout: float
+    retention: float
+
+    session_factory: async_sessionmaker[AsyncSession]
+    autopilot: Autopilot
+    alerts: AlertAggregator
+
+    _loop_task: asyncio.Task
+    # Messages delivered later, e.g. alerts waiting for their digest
+    _deferred: set[asyncio.Task]
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._deferred = set()
+
+    async def start(self) -> None:
+        self._loop_task = asyncio.create_task(self._run())
+        log.info("Outbox worker started")
+
+    async def stop(self, exception: Exception | None = None) -> None:
+        # Deferred messages stay claimed, they are delivered again once
+        # their lease is over
+        self._loop_task.cancel()
+        for task in self._deferred:
+            task.cancel()
+        await asyncio.gather(self._loop_task, *self._deferred, return_exceptions=True)
+
+    async def _run(self) -> None:
+        last_cleanup = datetime.min
+        while True:
+            if datetime.now() - last_cleanup > timedelta(hours=1):
+                last_cleanup = datetime.now()
+                await self._delete_sent()
+            claimed = 0
+            try:
+                claimed = await self.deliver_batch()
+            except Exception:
+                log.exception("Failed to deliver outbox messages")
+            # A full batch means there are probably more messages waiting
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def deliver_batch(self) -> int:
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        async with uow.start():
+            messages = await uow.outbox.claim(
+                limit=self.batch_size,
+                lease=timedelta(seconds=self.lease_timeout),
+            )
+            await uow.commit()
+        if not messages:
+            return 0
+        semaphore = asyncio.Semaphore(self.concurrency)
+        outcomes = await asyncio.gather(
+            *(self._deliver(message, semaphore) for message in messages)
+        )
+        sent: list[int] = []
+        failed: list[tuple[OutboxMessage, str]] = []
+        for message, outcome in zip(messages, outcomes):
+            if isinstance(outcome, asyncio.Future):
+                # Stays claimed until it is really delivered
+                task = asyncio.create_task(self._settle(message, outcome))
+                self._deferred.add(task)
+                task.add_done_callback(self._deferred.discard)
+            elif outcome is None:
+                sent.append(message.id)
+            else:
+                failed.append((message, outcome))
+        await self._record(sent=sent, failed=failed)
+        return len(messages)
+
+    async def _deliver(
+        self,
+        message: OutboxMessage,
+        semaphore: asyncio.Semaphore,
+    ) -> asyncio.Future[None] | str | None:
+        # The error of a failed delivery, or a future for a deferred one
+        async with semaphore:
+            try:
+                return await deliver_message(
+                    autopilot=self.autopilot,
+                    alerts=self.alerts,
+                    message=message,
+                )
+            except Exception as e:
+                log.exception("Outbox message %d failed", message.id)
+                return repr(e)[:ERROR_MAX_LENGTH]
+
+    async def _settle(self, message: OutboxMessage, delivery: asyncio.Future) -> None:
+        sent: list[int] = [message.id]
+        failed: list[tuple[OutboxMessage, str]] = []
+        try:
+            await delivery
+        except Exception as e:
+            log.exception("Outbox message %d failed", message.id)
+            sent, failed = [], [(message, repr(e)[:ERROR_MAX_LENGTH])]
+        try:
+            await self._record(sent=sent, failed=failed)
+        except Exception:
+            # Still claimed, so it is delivered again after the lease
+            log.exception("Failed to record outbox message %d", message.id)
+
+    async def _record(
+        self,
+        sent: Sequence[int],
+        failed: Sequence[tuple[OutboxMessage, str]],
+    ) -> None:
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        async with uow.start():
+            await uow.outbox.mark_sent(sent)
+            for message, error in failed:
+                await uow.outbox.mark_failed(
+                    message_id=message.id,
+                    error=error,
+                    retry_at=self._retry_at(message),
+                )
+            await uow.commit()
+
+    def _retry_at(self, message: OutboxMessage) -> datetime | None:
+        if message.attempts + 1 >= self.max_attempts:
+            log.error("Outbox message %d failed for good", message.id)
+            return None
+        pause = min(self.retry_pause * 2**message.attempts, MAX_RETRY_PAUSE)
+        return datetime.now() + timedelta(seconds=pause)
+
+    async def _delete_sent(self) -> None:
+        sent_before = datetime.now() - timedelta(seconds=self.retention)
+        uow = UnitOfWork(sessionmaker=self.session_factory)
+        try:
+            async with uow.start():
+                count = await uow.outbox.delete_sent(sent_before)
+                await uow.commit()
+        except Exception:
+            log.exception("Failed to delete sent outbox messages")
+            return
+        if count:
+            log.info("%d sent outbox messages were deleted", count)
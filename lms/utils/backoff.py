@@ -0,0 +1,22 @@
+import random
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True, slots=True)
+class Backoff:
+    # Exponential backoff with full jitter: the pause after the n-th failed
+    # try is drawn from [0, min(base * 2**n, max_pause)], so requests that
+    # failed together don't come back together
+    base: float
+    max_pause: float = 10
+    jitter: Callable[[], float] = field(default=random.random)
+
+    def __post_init__(self) -> None:
+        if self.base < 0:
+            raise ValueError("base must not be negative")
+        if self.max_pause < self.base:
+            raise ValueError("max_pause must not be less than base")
+
+    def pause(self, attempt: int) -> float:
+        return min(self.base * 2**attempt, self.max_pause) * self.jitter()
@@ -0,0 +1,128 @@
+import math
+from collections.abc import Sequence
+from typing import NamedTuple
+
+
+class ReviewerCapacity(NamedTuple):
+    assigned: int
+    min_: int
+    desired: int
+    max_: int
+
+
+class Allocation(NamedTuple):
+    targets: Sequence[int]
+    overflow: int
+
+
+def allocate(total: int, reviewers: Sequence[ReviewerCapacity]) -> Allocation:
+    # Reviewers are filled up to `min_` first (in order if work is scarce),
+    # then proportionally to `desired` and then to `max_`, never above `max_`.
+    floors = [max(r.assigned, min(r.min_, r.max_)) for r in reviewers]
+    if total <= sum(floors):
+        return Allocation(targets=_fill_in_order(total, reviewers, floors), overflow=0)
+
+    desired = [max(floor, r.desired) for floor, r in zip(floors, reviewers)]
+    if total <= sum(desired):
+        targets = apportion(
+            total=total,
+            weights=[r.desired for r in reviewers],
+            lower=floors,
+            upper=desired,
+        )
+        return Allocation(targets=targets, overflow=0)
+
+    maximum = [max(level, r.max_) for level, r in zip(desired, reviewers)]
+    if total <= sum(maximum):
+        targets = apportion(
+            total=total,
+            weights=[r.max_ for r in reviewers],
+            lower=desired,
+            upper=maximum,
+        )
+        return Allocation(targets=targets, overflow=0)
+
+    return Allocation(targets=maximum, overflow=total - sum(maximum))
+
+
+def apportion(
+    total: int,
+    weights: Sequence[float],
+    lower: Sequence[int],
+    upper: Sequence[int],
+) -> list[int]:
+    # Water-filling for the continuous shares, largest remainder for rounding
+    if not sum(lower) <= total <= sum(upper):
+        raise ValueError("total is out of bounds")
+    level = _water_level(total, weights, lower, upper)
+    shares = [
+        _clamp(level * w, lo, up) if w > 0 else lo
+        for w, lo, up in zip(weights, lower, upper)
+    ]
+    result = [max(lo, math.floor(share)) for share, lo in zip(shares, lower)]
+    rest = total - sum(result)
+    if rest > 0:
+        by_remainder = sorted(
+            (i for i in range(len(shares)) if result[i] < upper[i]),
+            key=lambda i: result[i] - shares[i],
+        )
+        for i in by_remainder[:rest]:
+            result[i] += 1
+    elif rest < 0:
+        by_remainder = sorted(
+            (i for i in range(len(shares)) if result[i] > lower[i]),
+            key=lambda i: shares[i] - result[i],
+        )
+        for i in by_remainder[:-rest]:
+            result[i] -= 1
+    return result
+
+
+def _water_level(
+    total: int,
+    weights: Sequence[float],
+    lower: Sequence[int],
+    upper: Sequence[int],
+) -> float:
+    # sum(clamp(level * w, lower, upper)) is piecewise linear in level, its
+    # breakpoints are lower / w (share starts to grow) and upper / w (stops).
+    events: list[tuple[float, float, float]] = []
+    fixed = 0.0
+    for w, lo, up in zip(weights, lower, upper):
+        fixed += lo
+        if w <= 0 or up <= lo:
+            continue
+        events.append((lo / w, w, -lo))
+        events.append((up / w, -w, up))
+    events.sort()
+
+    slope = 0.0
+    level = 0.0
+    for point, d_slope, d_fixed in events:
+        value = fixed + slope * point
+        if value >= total:
+            break
+        level = point
+        slope += d_slope
+        fixed += d_fixed
+    else:
+        return level
+    return (total - fixed) / slope if slope else level
+
+
+def _fill_in_order(
+    total: int,
+    reviewers: Sequence[ReviewerCapacity],
+    floors: Sequence[int],
+) -> list[int]:
+    targets = [r.assigned for r in reviewers]
+    rest = total - sum(targets)
+    for i, floor in enumerate(floors):
+        take = min(rest, floor - targets[i])
+        targets[i] += take
+        rest -= take
+    return targets
+
+
+def _clamp(value: float, lower: int, upper: int) -> float:
+    return min(max(value, lower), upper)
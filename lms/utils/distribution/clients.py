@@ -0,0 +1,76 @@
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Generic, Protocol, TypeVar
+
+
+class SohoClientLike(Protocol):
+    @property
+    def id(self) -> int: ...
+
+    @property
+    def first_name(self) -> str: ...
+
+    @property
+    def last_name(self) -> str: ...
+
+    @property
+    def vk_id(self) -> int | None: ...
+
+    @property
+    def emails(self) -> Iterable[str]: ...
+
+
+ClientT = TypeVar("ClientT", bound=SohoClientLike)
+
+
+@dataclass(frozen=True, slots=True)
+class ClientDirectory(Generic[ClientT]):
+    by_soho_id: Mapping[int, ClientT] = field(default_factory=dict)
+    by_vk_id: Mapping[int, ClientT] = field(default_factory=dict)
+    by_email: Mapping[str, ClientT] = field(default_factory=dict)
+
+    @classmethod
+    def from_clients(cls, clients: Iterable[ClientT]) -> "ClientDirectory[ClientT]":
+        by_soho_id: dict[int, ClientT] = {}
+        by_vk_id: dict[int, ClientT] = {}
+        by_email: dict[str, ClientT] = {}
+        for client in clients:
+            by_soho_id[client.id] = client
+            if client.vk_id:
+                by_vk_id.setdefault(client.vk_id, client)
+            for email in client.emails:
+                by_email.setdefault(_normalize_email(email), client)
+        return cls(by_soho_id=by_soho_id, by_vk_id=by_vk_id, by_email=by_email)
+
+    def __len__(self) -> int:
+        return len(self.by_soho_id)
+
+    def __contains__(self, soho_id: object) -> bool:
+        return soho_id in self.by_soho_id
+
+    def get(self, soho_id: int) -> ClientT | None:
+        return self.by_soho_id.get(soho_id)
+
+    def get_by_vk_id(self, vk_id: int) -> ClientT | None:
+        return self.by_vk_id.get(vk_id)
+
+    def get_by_email(self, email: str) -> ClientT | None:
+        return self.by_email.get(_normalize_email(email))
+
+    def find(
+        self,
+        soho_id: int | None = None,
+        vk_id: int | None = None,
+        email: str | None = None,
+    ) -> ClientT | None:
+        if soho_id is not None and (client := self.get(soho_id)) is not None:
+            return client
+        if vk_id and (client := self.get_by_vk_id(vk_id)) is not None:
+            return client
+        if email and (client := self.get_by_email(email)) is not None:
+            return client
+        return None
+
+
+def _normalize_email(email: str) -> str:
+    return email.strip().lower()
@@ -0,0 +1,136 @@
+from collections import defaultdict
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass, field
+
+from lms.generals.enums import DistributionErrorMessage
+from lms.generals.models.student_product import StudentEnrollment
+from lms.utils.distribution.models import (
+    ErrorHomework,
+    SohoHomework,
+    StudentDistributeData,
+    StudentHomework,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class EnrollmentIndex:
+    by_soho_id: Mapping[int, Sequence[StudentEnrollment]] = field(default_factory=dict)
+    by_vk_id: Mapping[int, Sequence[StudentEnrollment]] = field(default_factory=dict)
+
+    @classmethod
+    def from_enrollments(
+        cls,
+        enrollments: Iterable[StudentEnrollment],
+    ) -> "EnrollmentIndex":
+        by_soho_id: defaultdict[int, list[StudentEnrollment]] = defaultdict(list)
+        by_vk_id: defaultdict[int, list[StudentEnrollment]] = defaultdict(list)
+        for enrollment in enrollments:
+            if enrollment.soho_id is not None:
+                by_soho_id[enrollment.soho_id].append(enrollment)
+            by_vk_id[enrollment.vk_id].append(enrollment)
+        return cls(by_soho_id=dict(by_soho_id), by_vk_id=dict(by_vk_id))
+
+    def find(self, soho_id: int, vk_id: int | None) -> Sequence[StudentEnrollment]:
+        if enrollments := self.by_soho_id.get(soho_id):
+            return enrollments
+        if vk_id:
+            return self.by_vk_id.get(vk_id, ())
+        return ()
+
+
+def deduplicate(
+    homeworks: Iterable[SohoHomework],
+) -> tuple[list[SohoHomework], list[SohoHomework]]:
+    # The first submission wins, later ones with the same student_homework_id
+    # or the same student and homework are duplicates
+    unique: list[SohoHomework] = []
+    duplicates: list[SohoHomework] = []
+    seen_ids: set[int] = set()
+    seen_students: set[tuple[int, int]] = set()
+    for hw in homeworks:
+        key = (hw.student_soho_id, hw.homework_id)
+        if hw.student_homework_id in seen_ids or key in seen_students:
+            duplicates.append(hw)
+            continue
+        seen_ids.add(hw.student_homework_id)
+        seen_students.add(key)
+        unique.append(hw)
+    return unique, duplicates
+
+
+def split_homeworks(
+    homeworks: Iterable[SohoHomework],
+    student_map: Mapping[int, StudentDistributeData],
+    enrollments: EnrollmentIndex,
+    flow_filters: Mapping[int, frozenset[int]],
+    previous_reviewers: Mapping[tuple[int, int], int],
+    duplicates: Iterable[SohoHomework] = (),
+) -> tuple[list[StudentHomework], list[ErrorHomework]]:
+    accepted: list[StudentHomework] = []
+    errors: list[ErrorHomework] = []
+    for hw in duplicates:
+        student = student_map.get(hw.student_soho_id)
+        errors.append(
+            ErrorHomework(
+                homework=StudentHomework(
+                    student_name=student.name if student else "",
+                    student_vk_id=hw.student_vk_id or 0,
+                    student_soho_id=hw.student_soho_id,
+                    submission_url=hw.chat_url,
+                    homework_id=hw.homework_id,
+                    student_homework_id=hw.student_homework_id,
+                ),
+                error_message=DistributionErrorMessage.DUPLICATE_HOMEWORK,
+            )
+        )
+    for hw in homeworks:
+        student = student_map.get(hw.student_soho_id)
+        found = enrollments.find(hw.student_soho_id, hw.student_vk_id)
+        student_homework = StudentHomework(
+            student_name=student.name if student else "",
+            student_vk_id=hw.student_vk_id or (found[0].vk_id if found else 0),
+            student_soho_id=hw.student_soho_id,
+            submission_url=hw.chat_url,
+            homework_id=hw.homework_id,
+            student_homework_id=hw.student_homework_id,
+            is_premium=any(e.is_premium and e.is_active for e in found),
+            previous_reviewer_id=previous_reviewers.get(
+                (hw.student_soho_id, hw.homework_id)
+            ),
+        )
+        error = _check_homework(
+            hw=hw,
+            student=student,
+            enrollments=found,
+            flow_ids=flow_filters.get(hw.homework_id),
+        )
+        if error is None:
+            accepted.append(student_homework)
+        else:
+            errors.append(ErrorHomework(homework=student_homework, error_message=error))
+    return accepted, errors
+
+
+def _check_homework(
+    hw: SohoHomework,
+    student: StudentDistributeData | None,
+    enrollments: Sequence[StudentEnrollment],
+    flow_ids: frozenset[int] | None,
+) -> DistributionErrorMessage | None:
+    if student is None:
+        return DistributionErrorMessage.STUDENT_NOT_FOUND_IN_SOHO
+    active = [e for e in enrollments if e.is_active]
+    if not flow_ids:
+        # Without flow filters students unknown to LMS are still distributed
+        if enrollments and not active:
+            return DistributionErrorMessage.STUDENT_WAS_EXPULSED
+        return None
+    if not enrollments:
+        if not hw.student_vk_id:
+            return DistributionErrorMessage.HOMEWORK_WITHOUT_VK_ID
+        return DistributionErrorMessage.STUDENT_WITH_VK_ID_NOT_FOUND
+    if not active:
+        return DistributionErrorMessage.STUDENT_WAS_EXPULSED
+    if not any(e.flow_id in flow_ids for e in active):
+        return DistributionErrorMessage.STUDENT_NOT_IN_FLOW
+    return None
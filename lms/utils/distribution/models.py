@@ -1,15 +1,21 @@
+import heapq
 import logging
 import random
-from collections.abc import MutableSequence, Sequence
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping, MutableSequence, Sequence
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from functools import cache
 from typing import Any, NamedTuple
 
-from pydantic import BaseModel, Field
+from pydantic import TypeAdapter
 
 from lms.generals.enums import DistributionErrorMessage
 from lms.generals.models.distribution import DistributionParams
 from lms.generals.models.reviewer import Reviewer
+from lms.utils.distribution.allocator import ReviewerCapacity, allocate
 from lms.utils.distribution.utils import NameGen
+from lms.utils.stages import StageTracker
 
 log = logging.getLogger(__name__)
 
@@ -26,7 +32,10 @@ class StudentDistributeData(NamedTuple):
         return f"{self.first_name} {self.last_name}"
 
 
-class SohoHomework(BaseModel):
+# Working set of a distribution: plain slotted records, pydantic only
+# validates and serializes them at the edges (see Distribution.dump/load)
+@dataclass(frozen=True, slots=True)
+class SohoHomework:
     student_homework_id: int
     student_soho_id: int
     sent_to_review_at: datetime
@@ -35,25 +44,64 @@ class SohoHomework(BaseModel):
     homework_id: int
 
 
-class StudentHomework(BaseModel):
+@dataclass(frozen=True, slots=True)
+class StudentHomework:
     student_name: str
     student_vk_id: int
     student_soho_id: int
     submission_url: str
     homework_id: int
+    student_homework_id: int | None = None
+    is_premium: bool = False
+    # Set for rechecks: who reviewed this homework of the student last time
+    previous_reviewer_id: int | None = None
 
 
-class ErrorHomework(BaseModel):
+@dataclass(frozen=True, slots=True)
+class ErrorHomework:
     homework: StudentHomework
     error_message: DistributionErrorMessage
 
 
-class DistributionReviewer(Reviewer):
+@dataclass(slots=True, kw_only=True)
+class DistributionReviewer:
+    id: int
+    subject_id: int
+    first_name: str
+    last_name: str
+    email: str
+    desired: int
+    max_: int
+    min_: int
+    abs_max: int
+    is_active: bool
+    is_premium: bool = False
     recheck: bool = False
-    student_homeworks: list[StudentHomework] = Field(default_factory=list)
+    student_homeworks: list[StudentHomework] = field(default_factory=list)
     actual: int = 0
     percent: float = 0.0
 
+    @classmethod
+    def from_reviewer(cls, reviewer: Reviewer) -> "DistributionReviewer":
+        return cls(
+            id=reviewer.id,
+            subject_id=reviewer.subject_id,
+            first_name=reviewer.first_name,
+            last_name=reviewer.last_name,
+            email=reviewer.email,
+            desired=reviewer.desired,
+            max_=reviewer.max_,
+            min_=reviewer.min_,
+            abs_max=reviewer.abs_max,
+            is_active=reviewer.is_active,
+            is_premium=reviewer.is_premium,
+            recheck=reviewer.recheck,
+        )
+
+    @property
+    def name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
     @property
     def optimal_desired(self) -> int:
         return min(self.desired, self.abs_max)
@@ -62,8 +110,23 @@ class DistributionReviewer(Reviewer):
     def optimal_max(self) -> int:
         return min(self.max_, self.abs_max)
 
+    def copy(self) -> "DistributionReviewer":
+        return replace(self, student_homeworks=list(self.student_homeworks))
+
+
+@dataclass(frozen=True, slots=True)
+class DistributionStats:
+    homeworks: int
+    distributed: int
+    errors: Mapping[DistributionErrorMessage, int]
 
-class Distribution(BaseModel):
+    @property
+    def duplicates(self) -> int:
+        return self.errors.get(DistributionErrorMessage.DUPLICATE_HOMEWORK, 0)
+
+
+@dataclass(slots=True, kw_only=True)
+class Distribution:
     created_at: datetime
     params: DistributionParams
     homeworks: Sequence[SohoHomework]
@@ -71,6 +134,14 @@ class Distribution(BaseModel):
     filtered_homeworks: MutableSequence[StudentHomework]
     error_homeworks: MutableSequence[ErrorHomework]
     new_folder_id: str | None = None
+    seed: int | None = None
+
+    @classmethod
+    def load(cls, data: Mapping[str, Any]) -> "Distribution":
+        return _distribution_adapter().validate_python(data)
+
+    def dump(self) -> dict[str, Any]:
+        return _distribution_adapter().dump_python(self, mode="json")
 
     @property
     def name_gen(self) -> NameGen:
@@ -80,6 +151,14 @@ class Distribution(BaseModel):
             homework_ids=self.params.homework_ids,
         )
 
+    @property
+    def stats(self) -> DistributionStats:
+        return DistributionStats(
+            homeworks=len(self.homeworks),
+            distributed=sum(len(r.student_homeworks) for r in self.reviewers),
+            errors=Counter(e.error_message for e in self.error_homeworks),
+        )
+
     @property
     def sheet_title(self) -> str:
         return self.name_gen.sheet_title
@@ -88,94 +167,95 @@ class Distribution(BaseModel):
     def folder_title(self) -> str:
         return self.name_gen.folder_title
 
-    async def distribute(self) -> None:
-        random.shuffle(self.filtered_homeworks)
-        await self._distribute_minimum()
-        await self._distribute_premium()
-        await self._distribute_main()
-        await self._distribute_rechecks()
+    def distribute(self, stages: StageTracker | None = None) -> None:
+        tracker = stages or StageTracker()
+        if self.seed is None:
+            self.seed = random.randrange(2**32)
+        with tracker.measure("shuffle"):
+            random.Random(self.seed).shuffle(self.filtered_homeworks)
+        with tracker.measure("premium"):
+            self._distribute_premium()
+        with tracker.measure("rechecks"):
+            self._distribute_rechecks()
+        with tracker.measure("main"):
+            self._distribute_main()
 
-    async def _distribute_minimum(self) -> None:
-        for r in self.reviewers:
-            actual_rev_min = r.min_ - len(r.student_homeworks)
-            for _ in range(actual_rev_min):
-                if self.filtered_homeworks:
-                    r.student_homeworks.append(self.filtered_homeworks.pop())
-                else:
-                    break
-        log.info(
-            "Finish min distribution. Left %d homeworks",
-            len(self.filtered_homeworks),
+    def _distribute_premium(self) -> None:
+        self._route(
+            is_selected=lambda hw: hw.is_premium,
+            reviewers=[r for r in self.reviewers if r.is_premium],
         )
-        self._log_reviewers("minimum")
+        self._log_reviewers("premium")
 
-    async def _distribute_premium(self) -> None:
-        pass
-
-    async def _distribute_main(self) -> None:
-        self._calculate_actual()
-        self._filled_main()
-        self._log_reviewers("main")
+    def _distribute_rechecks(self) -> None:
+        # Reviewers who take rechecks go first, the rest of the team picks up
+        # what they can't fit. Never back to the previous reviewer.
+        for reviewers in (
+            [r for r in self.reviewers if r.recheck],
+            self.reviewers,
+        ):
+            self._route(
+                is_selected=lambda hw: hw.previous_reviewer_id is not None,
+                reviewers=reviewers,
+            )
+        self._log_reviewers("rechecks")
 
-    async def _distribute_rechecks(self) -> None:
-        pass
+    def _route(
+        self,
+        is_selected: Callable[[StudentHomework], bool],
+        reviewers: Sequence[DistributionReviewer],
+    ) -> None:
+        selected: list[StudentHomework] = []
+        others: list[StudentHomework] = []
+        for hw in self.filtered_homeworks:
+            (selected if is_selected(hw) else others).append(hw)
+        if not selected or not reviewers:
+            return
+        # The minimums of the whole team are reserved, these passes only get
+        # what is left over them
+        needed = sum(max(r.min_ - len(r.student_homeworks), 0) for r in self.reviewers)
+        rest = assign_by_capacity(
+            homeworks=selected,
+            reviewers=reviewers,
+            spare=max(len(self.filtered_homeworks) - needed, 0),
+        )
+        # Whatever didn't fit goes to the main stage
+        self.filtered_homeworks[:] = rest + others
 
-    def _calculate_actual(self) -> None:  # noqa: C901
-        homeworks_count = len(self.filtered_homeworks)
-        total_desired = sum(r.optimal_desired for r in self.reviewers)
-        total_max = sum(r.optimal_max for r in self.reviewers)
-        if homeworks_count <= total_desired:
-            for r in self.reviewers:
-                r.percent = r.optimal_desired / total_desired
-        else:
-            for r in self.reviewers:
-                r.percent = r.optimal_max / total_max
-
-        if homeworks_count < total_desired or homeworks_count < total_max:
-            actual = 0
-            for r in self.reviewers:
-                r.actual = int(r.percent * homeworks_count)
-                actual += r.actual
-            r_ind = 0
-            for _ in range(homeworks_count - actual):
-                while True:
-                    if (
-                        self.reviewers[r_ind].actual
-                        < self.reviewers[r_ind].optimal_desired
-                    ):
-                        self.reviewers[r_ind].actual += 1
-                        break
-                    r_ind += 1
-                    r_ind %= len(self.reviewers)
-        elif homeworks_count == total_desired:
-            for r in self.reviewers:
-                r.actual = r.optimal_desired
-        else:
-            for r in self.reviewers:
-                r.actual = r.optimal_max
-
-    def _filled_main(self) -> None:
-        total_actual = sum(r.actual for r in self.reviewers)
-        hws = self.filtered_homeworks[:total_actual]
-        count = 5
-        while len(hws) and count > 0:
-            k = 0
-            while k < len(hws):
-                hw = hws.pop()
-                for r in self.reviewers:
-                    if r.actual > len(r.student_homeworks):
-                        r.student_homeworks.append(hw)
-                        hw = None  # type: ignore[assignment]
-                        break
-                if hw is not None:
-                    hws.insert(0, hw)
-                    k += 1
-            count -= 1
-        for hw in hws:
-            for r in self.reviewers:
-                if r.actual < len(r.student_homeworks):
-                    r.student_homeworks.append(hw)
-        for hw in self.filtered_homeworks[total_actual:]:
+    def _distribute_main(self) -> None:
+        assigned = sum(len(r.student_homeworks) for r in self.reviewers)
+        total = assigned + len(self.filtered_homeworks)
+        allocation = allocate(
+            total=total,
+            reviewers=[
+                ReviewerCapacity(
+                    assigned=len(r.student_homeworks),
+                    min_=r.min_,
+                    desired=r.optimal_desired,
+                    max_=r.optimal_max,
+                )
+                for r in self.reviewers
+            ],
+        )
+        rechecks: list[StudentHomework] = []
+        homeworks: list[StudentHomework] = []
+        for hw in self.filtered_homeworks:
+            (rechecks if hw.previous_reviewer_id is not None else homeworks).append(hw)
+        # Rechecks left over from their own stage still can't go back to the
+        # previous reviewer, so they take their slots first
+        rest = assign_by_capacity(
+            homeworks=rechecks,
+            reviewers=self.reviewers,
+            limits=allocation.targets,
+        )
+        start = 0
+        for r, target in zip(self.reviewers, allocation.targets):
+            end = start + max(target - len(r.student_homeworks), 0)
+            r.student_homeworks.extend(homeworks[start:end])
+            r.actual = len(r.student_homeworks)
+            r.percent = r.actual / total if total else 0.0
+            start = end
+        for hw in rest + homeworks[start:]:
             self.error_homeworks.append(
                 ErrorHomework(
                     homework=hw,
@@ -183,6 +263,7 @@ class Distribution(BaseModel):
                 )
             )
         self.filtered_homeworks.clear()
+        self._log_reviewers("main")
 
     def serialize_for_sheet(self) -> Sequence[Sequence[Any]]:
         data: list[list[str | int]] = [
@@ -249,3 +330,58 @@ class Distribution(BaseModel):
         for r in self.reviewers:
             log_str.append(f"{r.name}: {len(r.student_homeworks)},")
         log.info(" ".join(log_str))
+
+
+def assign_by_capacity(
+    homeworks: Iterable[StudentHomework],
+    reviewers: Sequence[DistributionReviewer],
+    limits: Sequence[int] | None = None,
+    spare: int | None = None,
+) -> list[StudentHomework]:
+    # Heap of reviewers keyed by whether they still miss their `min_`, then
+    # by the room left below `optimal_desired` and below `optimal_max`, so
+    # every homework costs O(log r). `limits` replace both bounds, e.g. with
+    # the targets of the allocator. Only `spare` homeworks may go to
+    # reviewers who already have their minimum. Homeworks that don't fit are
+    # returned.
+    if limits is None:
+        bounds = [(r.optimal_desired, r.optimal_max) for r in reviewers]
+    else:
+        bounds = [(limit, limit) for limit in limits]
+    heap = [
+        _capacity_key(r, i, *bounds[i])
+        for i, r in enumerate(reviewers)
+        if len(r.student_homeworks) < bounds[i][1]
+    ]
+    heapq.heapify(heap)
+    rest: list[StudentHomework] = []
+    for hw in homeworks:
+        skipped = None
+        if heap and reviewers[heap[0][-1]].id == hw.previous_reviewer_id:
+            skipped = heapq.heappop(heap)
+        below_min = bool(heap) and not heap[0][0]
+        if heap and (spare is None or spare > 0 or below_min):
+            i = heapq.heappop(heap)[-1]
+            reviewer = reviewers[i]
+            reviewer.student_homeworks.append(hw)
+            if spare is not None and not below_min:
+                spare -= 1
+            if len(reviewer.student_homeworks) < bounds[i][1]:
+                heapq.heappush(heap, _capacity_key(reviewer, i, *bounds[i]))
+        else:
+            rest.append(hw)
+        if skipped is not None:
+            heapq.heappush(heap, skipped)
+    return rest
+
+
+def _capacity_key(
+    reviewer: DistributionReviewer, index: int, desired: int, max_: int
+) -> tuple[bool, int, int, int]:
+    assigned = len(reviewer.student_homeworks)
+    return (assigned >= reviewer.min_, assigned - desired, assigned - max_, index)
+
+
+@cache
+def _distribution_adapter() -> TypeAdapter[Distribution]:
+    return TypeAdapter(Distribution)
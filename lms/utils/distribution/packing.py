@@ -0,0 +1,109 @@
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+from lms.generals.enums import DistributionErrorMessage
+from lms.generals.models.distribution import DistributionParams
+from lms.utils.distribution.models import (
+    Distribution,
+    DistributionReviewer,
+    ErrorHomework,
+    StudentHomework,
+)
+
+# Stands in for homeworks a reviewer had before the allocation, only their
+# count matters to the allocator
+_PLACEHOLDER = StudentHomework(
+    student_name="",
+    student_vk_id=0,
+    student_soho_id=0,
+    submission_url="",
+    homework_id=0,
+)
+
+
+# Pickling a few hundred thousand dataclasses holds the GIL longer than the
+# allocation itself, so only plain tuples cross the process boundary
+@dataclass(frozen=True, slots=True)
+class PackedDistribution:
+    created_at: datetime
+    params: DistributionParams
+    seed: int | None
+    reviewers: tuple[DistributionReviewer, ...]
+    # (is_premium, previous_reviewer_id) of filtered homeworks
+    homeworks: tuple[tuple[bool, int | None], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class PackedAllocation:
+    seed: int
+    # Indices into the packed homeworks
+    assigned: tuple[tuple[int, ...], ...]
+    errors: tuple[tuple[int, DistributionErrorMessage], ...]
+    actual: tuple[int, ...]
+    percent: tuple[float, ...]
+
+
+def pack(distribution: Distribution) -> PackedDistribution:
+    return PackedDistribution(
+        created_at=distribution.created_at,
+        params=distribution.params,
+        seed=distribution.seed,
+        reviewers=tuple(
+            replace(r, student_homeworks=[_PLACEHOLDER] * len(r.student_homeworks))
+            for r in distribution.reviewers
+        ),
+        homeworks=tuple(
+            (hw.is_premium, hw.previous_reviewer_id)
+            for hw in distribution.filtered_homeworks
+        ),
+    )
+
+
+def allocate(packed: PackedDistribution) -> PackedAllocation:
+    homeworks = [
+        replace(_PLACEHOLDER, is_premium=is_premium, previous_reviewer_id=reviewer_id)
+        for is_premium, reviewer_id in packed.homeworks
+    ]
+    index = {id(hw): i for i, hw in enumerate(homeworks)}
+    distribution = Distribution(
+        created_at=packed.created_at,
+        params=packed.params,
+        homeworks=(),
+        reviewers=packed.reviewers,
+        filtered_homeworks=list(homeworks),
+        error_homeworks=[],
+        seed=packed.seed,
+    )
+    distribution.distribute()
+    return PackedAllocation(
+        seed=distribution.seed,
+        assigned=tuple(
+            tuple(index[id(hw)] for hw in r.student_homeworks if id(hw) in index)
+            for r in distribution.reviewers
+        ),
+        errors=tuple(
+            (index[id(e.homework)], e.error_message)
+            for e in distribution.error_homeworks
+        ),
+        actual=tuple(r.actual for r in distribution.reviewers),
+        percent=tuple(r.percent for r in distribution.reviewers),
+    )
+
+
+def unpack(distribution: Distribution, allocation: PackedAllocation) -> None:
+    homeworks = list(distribution.filtered_homeworks)
+    for reviewer, assigned, actual, percent in zip(
+        distribution.reviewers,
+        allocation.assigned,
+        allocation.actual,
+        allocation.percent,
+    ):
+        reviewer.student_homeworks.extend(homeworks[i] for i in assigned)
+        reviewer.actual = actual
+        reviewer.percent = percent
+    distribution.error_homeworks.extend(
+        ErrorHomework(homework=homeworks[i], error_message=message)
+        for i, message in allocation.errors
+    )
+    distribution.filtered_homeworks.clear()
+    distribution.seed = allocation.seed
@@ -0,0 +1,179 @@
+import random
+import statistics
+from collections.abc import Mapping, Sequence
+from dataclasses import replace
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+from lms.generals.enums import DistributionErrorMessage
+from lms.generals.models.distribution import DistributionParams
+from lms.utils.distribution.models import (
+    Distribution,
+    DistributionReviewer,
+    ErrorHomework,
+    StudentHomework,
+)
+from lms.utils.stages import Stage, StageTracker
+
+SIMULATION_NAME = "simulation"
+
+
+class ReviewerLoad(BaseModel):
+    reviewer_id: int
+    name: str
+    min_: int
+    desired: int
+    max_: int
+    assigned: int
+
+    @property
+    def ratio(self) -> float:
+        return self.assigned / self.desired if self.desired else 0.0
+
+
+class FairnessStats(BaseModel):
+    jain_index: float
+    min_ratio: float
+    max_ratio: float
+    ratio_stdev: float
+    below_min: int
+    above_max: int
+
+
+class SimulationResult(BaseModel):
+    seed: int
+    homeworks: int
+    overflow: int
+    loads: Sequence[ReviewerLoad]
+    stages: Sequence[Stage]
+    fairness: FairnessStats
+
+    @property
+    def duration(self) -> float:
+        return sum(stage.duration or 0.0 for stage in self.stages)
+
+
+def synthetic_homeworks(count: int) -> list[StudentHomework]:
+    return [
+        StudentHomework(
+            student_name=f"Student {i}",
+            student_vk_id=i,
+            student_soho_id=i,
+            submission_url=f"https://example.com/{i}",
+            homework_id=1,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def synthetic_reviewers(
+    count: int,
+    homeworks: int,
+    rnd: random.Random,
+) -> list[DistributionReviewer]:
+    # Capacities scatter around the fair share, so both scarce and
+    # overflowing runs show up across a sweep
+    average = max(homeworks // max(count, 1), 1)
+    reviewers = []
+    for i in range(1, count + 1):
+        desired = rnd.randint(average // 2, average)
+        max_ = rnd.randint(desired, average * 2)
+        reviewers.append(
+            DistributionReviewer(
+                id=i,
+                subject_id=1,
+                first_name=f"First{i}",
+                last_name=f"Last{i}",
+                email=f"reviewer{i}@example.com",
+                desired=desired,
+                max_=max_,
+                min_=rnd.randint(0, desired // 4),
+                abs_max=max_,
+                is_active=True,
+            )
+        )
+    return reviewers
+
+
+def recorded_inputs(
+    data: Mapping[str, Any],
+) -> tuple[list[StudentHomework], list[DistributionReviewer]]:
+    # `data` is Distribution.data of a saved distribution. Homeworks rejected
+    # before the allocator (no VK ID, expulsed, ...) are not replayed.
+    distribution = Distribution.load(data)
+    homeworks: list[StudentHomework] = []
+    reviewers: list[DistributionReviewer] = []
+    for reviewer in distribution.reviewers:
+        homeworks.extend(reviewer.student_homeworks)
+        reviewers.append(replace(reviewer, student_homeworks=[], actual=0, percent=0.0))
+    homeworks.extend(
+        e.homework
+        for e in distribution.error_homeworks
+        if e.error_message == DistributionErrorMessage.STACK_OVERFLOW
+    )
+    homeworks.extend(distribution.filtered_homeworks)
+    return homeworks, reviewers
+
+
+def simulate(
+    homeworks: Sequence[StudentHomework],
+    reviewers: Sequence[DistributionReviewer],
+    seed: int | None = None,
+) -> SimulationResult:
+    distribution = Distribution(
+        created_at=datetime.now(),
+        params=DistributionParams(
+            name=SIMULATION_NAME,
+            product_ids=[],
+            homeworks=[],
+            seed=seed,
+        ),
+        homeworks=[],
+        reviewers=[r.copy() for r in reviewers],
+        filtered_homeworks=list(homeworks),
+        error_homeworks=[],
+        seed=seed,
+    )
+    tracker = StageTracker()
+    distribution.distribute(stages=tracker)
+    loads = [
+        ReviewerLoad(
+            reviewer_id=r.id,
+            name=r.name,
+            min_=r.min_,
+            desired=r.optimal_desired,
+            max_=r.optimal_max,
+            assigned=len(r.student_homeworks),
+        )
+        for r in distribution.reviewers
+    ]
+    return SimulationResult(
+        seed=distribution.seed or 0,
+        homeworks=len(homeworks),
+        overflow=_count_overflow(distribution.error_homeworks),
+        loads=loads,
+        stages=tracker.stages,
+        fairness=fairness(loads),
+    )
+
+
+def fairness(loads: Sequence[ReviewerLoad]) -> FairnessStats:
+    ratios = [load.ratio for load in loads if load.desired > 0]
+    squares = sum(ratio * ratio for ratio in ratios)
+    return FairnessStats(
+        # Jain's index: 1.0 when every reviewer got the same share of desired
+        jain_index=sum(ratios) ** 2 / (len(ratios) * squares) if squares else 1.0,
+        min_ratio=min(ratios, default=0.0),
+        max_ratio=max(ratios, default=0.0),
+        ratio_stdev=statistics.pstdev(ratios) if ratios else 0.0,
+        below_min=sum(1 for load in loads if load.assigned < min(load.min_, load.max_)),
+        above_max=sum(1 for load in loads if load.assigned > load.max_),
+    )
+
+
+def _count_overflow(errors: Sequence[ErrorHomework]) -> int:
+    return sum(
+        1 for e in errors if e.error_message == DistributionErrorMessage.STACK_OVERFLOW
+    )
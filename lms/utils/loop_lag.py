@@ -0,0 +1,46 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+DEFAULT_INTERVAL = 0.01
+
+
+@dataclass(slots=True)
+class LoopLag:
+    samples: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.samples if self.samples else 0.0
+
+    def add(self, lag: float) -> None:
+        self.samples += 1
+        self.total += lag
+        self.max = max(self.max, lag)
+
+
+@contextlib.asynccontextmanager
+async def measure_loop_lag(
+    interval: float = DEFAULT_INTERVAL,
+) -> AsyncIterator[LoopLag]:
+    # A probe sleeps for `interval` in a loop, anything above that is the time
+    # the event loop was busy with something else
+    lag = LoopLag()
+    loop = asyncio.get_running_loop()
+
+    async def probe() -> None:
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag.add(max(loop.time() - started - interval, 0.0))
+
+    task = asyncio.create_task(probe())
+    try:
+        yield lag
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
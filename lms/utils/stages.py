@@ -0,0 +1,69 @@
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from lms.generals.enums import StageStatus
+
+log = logging.getLogger(__name__)
+
+StagesCallback = Callable[[Sequence["Stage"]], Awaitable[None]]
+
+
+class Stage(BaseModel):
+    name: str
+    status: StageStatus
+    started_at: datetime
+    finished_at: datetime | None = None
+    duration: float | None = None
+
+
+@dataclass(slots=True)
+class StageTracker:
+    on_change: StagesCallback | None = None
+    stages: list[Stage] = field(default_factory=list)
+
+    @asynccontextmanager
+    async def stage(self, name: str) -> AsyncIterator[Stage]:
+        try:
+            with self.measure(name) as stage:
+                await self._notify()
+                yield stage
+        finally:
+            await self._notify()
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[Stage]:
+        stage = Stage(
+            name=name,
+            status=StageStatus.RUNNING,
+            started_at=datetime.now(),
+        )
+        self.stages.append(stage)
+        started = time.perf_counter()
+        try:
+            yield stage
+        except BaseException:
+            stage.status = StageStatus.FAILED
+            raise
+        else:
+            stage.status = StageStatus.DONE
+        finally:
+            stage.finished_at = datetime.now()
+            stage.duration = time.perf_counter() - started
+            log.info("Stage %s finished in %.3fs", name, stage.duration)
+
+    def durations(self) -> dict[str, float]:
+        return {stage.name: stage.duration or 0.0 for stage in self.stages}
+
+    async def _notify(self) -> None:
+        if self.on_change is None:
+            return
+        try:
+            await self.on_change(self.stages)
+        except Exception:
+            log.exception("Failed to report stages")
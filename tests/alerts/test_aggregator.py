@@ -0,0 +1,95 @@
+import pytest
+
+from lms.adapters.telegram.alerts import AlertAggregator, AlertNotSentError
+
+
+class FakeTelegram:
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.fail = False
+
+    async def send_text(self, text: str) -> None:
+        if self.fail:
+            raise RuntimeError("Telegram is down")
+        self.sent.append(text)
+
+
+@pytest.fixture
+def telegram() -> FakeTelegram:
+    return FakeTelegram()
+
+
+@pytest.fixture
+def aggregator(telegram: FakeTelegram) -> AlertAggregator:
+    return AlertAggregator(
+        telegram=telegram,  # type: ignore[arg-type]
+        window=60,
+        rate_limit=100,
+        burst=1,
+    )
+
+
+async def test_flush__sends_one_digest(
+    aggregator: AlertAggregator,
+    telegram: FakeTelegram,
+):
+    aggregator.alert(1, "first")
+    aggregator.alert(2, "second")
+    await aggregator.flush()
+    await aggregator.flush()
+    assert telegram.sent == ["first\nsecond"]
+
+
+async def test_alert__same_key_is_counted(
+    aggregator: AlertAggregator,
+    telegram: FakeTelegram,
+):
+    for _ in range(3):
+        aggregator.alert(1, "first")
+    aggregator.alert(2, "second")
+    await aggregator.flush()
+    assert telegram.sent == ["first (x3)\nsecond"]
+
+
+async def test_flush__splits_long_digest(
+    aggregator: AlertAggregator,
+    telegram: FakeTelegram,
+):
+    for key in range(3):
+        aggregator.alert(key, str(key) * 2000)
+    await aggregator.flush()
+    assert [len(text) for text in telegram.sent] == [4001, 2000]
+
+
+async def test_exit__flushes_pending(telegram: FakeTelegram):
+    async with AlertAggregator(
+        telegram=telegram,  # type: ignore[arg-type]
+        window=60,
+        rate_limit=100,
+        burst=1,
+    ) as aggregator:
+        aggregator.alert(1, "first")
+    assert telegram.sent == ["first"]
+
+
+async def test_alert__done_once_digest_is_sent(
+    aggregator: AlertAggregator,
+    telegram: FakeTelegram,
+):
+    first = aggregator.alert(1, "first")
+    again = aggregator.alert(1, "first")
+    assert not first.done()
+    await aggregator.flush()
+    assert first.result() is None
+    assert again.result() is None
+
+
+async def test_alert__fails_with_digest(
+    aggregator: AlertAggregator,
+    telegram: FakeTelegram,
+):
+    telegram.fail = True
+    waiter = aggregator.alert(1, "first")
+    await aggregator.flush()
+    with pytest.raises(AlertNotSentError):
+        waiter.result()
@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+from aiohttp.test_utils import TestClient
+
+from lms.adapters.db.uow import UnitOfWork
+from lms.generals.models.distribution import DistributionParams
+
+
+def api_url(job_id: int) -> str:
+    return f"/v1/distributions/jobs/{job_id}/"
+
+
+async def test_unauthorized_user(api_client: TestClient, unauthorized_resp) -> None:
+    response = await api_client.get(api_url(1))
+    assert response.status == HTTPStatus.UNAUTHORIZED
+    assert await response.json() == unauthorized_resp
+
+
+async def test_invalid_token(api_client: TestClient, forbidden_resp) -> None:
+    response = await api_client.get(api_url(1), params={"token": "something"})
+    assert response.status == HTTPStatus.FORBIDDEN
+    assert await response.json() == forbidden_resp
+
+
+async def test_job_not_found(api_client: TestClient, token: str) -> None:
+    response = await api_client.get(api_url(1), params={"token": token})
+    assert response.status == HTTPStatus.NOT_FOUND
+    assert await response.json() == {
+        "ok": False,
+        "status_code": HTTPStatus.NOT_FOUND,
+        "message": "Distribution job not found",
+    }
+
+
+async def test_success(
+    api_client: TestClient,
+    token: str,
+    uow: UnitOfWork,
+    create_subject,
+) -> None:
+    subject = await create_subject()
+    params = DistributionParams(
+        name="Distribution",
+        product_ids=[1],
+        homeworks=[{"homework_id": 1, "filters": []}],
+    )
+    async with uow.start():
+        job = await uow.distribution_job.create(subject.id, params)
+        await uow.commit()
+
+    response = await api_client.get(api_url(job.id), params={"token": token})
+    assert response.status == HTTPStatus.OK
+    assert await response.json() == {
+        "id": job.id,
+        "subject_id": subject.id,
+        "status": "PENDING",
+        "params": params.model_dump(mode="json"),
+        "stages": [],
+        "error": None,
+        "distribution_id": None,
+        "started_at": None,
+        "finished_at": None,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+    }
@@ -0,0 +1,57 @@
+from http import HTTPStatus
+
+from aiohttp.test_utils import TestClient
+
+from lms.adapters.db.uow import UnitOfWork
+from tests.utils.distribution import make_assignment
+
+
+def api_url(reviewer_id: int) -> str:
+    return f"/v1/distributions/reviewers/{reviewer_id}/workload/"
+
+
+async def test_unauthorized_user(api_client: TestClient, unauthorized_resp) -> None:
+    response = await api_client.get(api_url(1))
+    assert response.status == HTTPStatus.UNAUTHORIZED
+    assert await response.json() == unauthorized_resp
+
+
+async def test_no_distributions(api_client: TestClient, token: str) -> None:
+    response = await api_client.get(api_url(1), params={"token": token})
+    assert response.status == HTTPStatus.OK
+    assert await response.json() == []
+
+
+async def test_success(
+    api_client: TestClient,
+    token: str,
+    uow: UnitOfWork,
+    create_subject,
+    create_reviewer,
+) -> None:
+    subject = await create_subject()
+    reviewer = await create_reviewer(subject_id=subject.id)
+    other = await create_reviewer(subject_id=subject.id)
+    async with uow.start():
+        distribution = await uow.distribution.create(subject.id, data=None)
+        await uow.distribution_assignment.create_many(
+            distribution_id=distribution.id,
+            assignments=[
+                make_assignment(reviewer.id, 1),
+                make_assignment(reviewer.id, 2),
+                make_assignment(other.id, 3),
+                make_assignment(None, 4),
+            ],
+        )
+        await uow.commit()
+
+    response = await api_client.get(api_url(reviewer.id), params={"token": token})
+    assert response.status == HTTPStatus.OK
+    assert await response.json() == [
+        {
+            "distribution_id": distribution.id,
+            "subject_id": subject.id,
+            "created_at": distribution.created_at.isoformat(),
+            "homeworks": 2,
+        }
+    ]
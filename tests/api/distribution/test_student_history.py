@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+from aiohttp.test_utils import TestClient
+from dirty_equals import IsInt, IsStr
+
+from lms.adapters.db.uow import UnitOfWork
+from lms.generals.enums import DistributionErrorMessage
+from tests.utils.distribution import make_assignment
+
+
+def api_url(soho_id: int) -> str:
+    return f"/v1/distributions/students/{soho_id}/history/"
+
+
+async def test_unauthorized_user(api_client: TestClient, unauthorized_resp) -> None:
+    response = await api_client.get(api_url(1))
+    assert response.status == HTTPStatus.UNAUTHORIZED
+    assert await response.json() == unauthorized_resp
+
+
+async def test_success(
+    api_client: TestClient,
+    token: str,
+    uow: UnitOfWork,
+    create_subject,
+    create_reviewer,
+) -> None:
+    subject = await create_subject()
+    reviewer = await create_reviewer(subject_id=subject.id)
+    overflow = make_assignment(None, 1)
+    overflow.error_message = DistributionErrorMessage.STACK_OVERFLOW
+    async with uow.start():
+        first = await uow.distribution.create(subject.id, data=None)
+        await uow.distribution_assignment.create_many(
+            distribution_id=first.id,
+            assignments=[make_assignment(reviewer.id, 1), make_assignment(None, 2)],
+        )
+        second = await uow.distribution.create(subject.id, data=None)
+        await uow.distribution_assignment.create_many(
+            distribution_id=second.id,
+            assignments=[overflow],
+        )
+        await uow.commit()
+
+    response = await api_client.get(api_url(1), params={"token": token})
+    assert response.status == HTTPStatus.OK
+    data = await response.json()
+    assert data["meta"] == {"page": 1, "pages": 1, "total": 2, "page_size": 20}
+    assert sorted(
+        (item["distribution_id"], item["reviewer_id"], item["error_message"])
+        for item in data["items"]
+    ) == [
+        (first.id, reviewer.id, None),
+        (second.id, None, DistributionErrorMessage.STACK_OVERFLOW),
+    ]
+    assert data["items"][0] == {
+        "id": IsInt,
+        "distribution_id": IsInt,
+        "reviewer_id": data["items"][0]["reviewer_id"],
+        "homework_id": 1,
+        "student_homework_id": None,
+        "student_soho_id": 1,
+        "student_vk_id": 1,
+        "submission_url": "https://example.com/1",
+        "error_message": data["items"][0]["error_message"],
+        "created_at": IsStr,
+    }
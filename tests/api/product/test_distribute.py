@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+from aiohttp.test_utils import TestClient
+from dirty_equals import IsPositiveInt
+
+from lms.adapters.db.uow import UnitOfWork
+from lms.generals.enums import DistributionJobStatus
+
+API_URL = "/v1/products/distribute/"
+
+
+def make_params(product_id: int) -> dict:
+    return {
+        "name": "Distribution",
+        "product_ids": [product_id],
+        "homeworks": [{"homework_id": 1, "filters": []}],
+    }
+
+
+async def test_unauthorized_user(api_client: TestClient, unauthorized_resp) -> None:
+    response = await api_client.post(API_URL, json=make_params(1))
+    assert response.status == HTTPStatus.UNAUTHORIZED
+    assert await response.json() == unauthorized_resp
+
+
+async def test_invalid_token(api_client: TestClient, forbidden_resp) -> None:
+    response = await api_client.post(
+        API_URL, json=make_params(1), params={"token": "something"}
+    )
+    assert response.status == HTTPStatus.FORBIDDEN
+    assert await response.json() == forbidden_resp
+
+
+async def test_product_not_found(api_client: TestClient, token: str) -> None:
+    response = await api_client.post(
+        API_URL, json=make_params(1), params={"token": token}
+    )
+    assert response.status == HTTPStatus.NOT_FOUND
+
+
+async def test_job_queued(
+    api_client: TestClient,
+    token: str,
+    uow: UnitOfWork,
+    create_product,
+) -> None:
+    product = await create_product()
+    response = await api_client.post(
+        API_URL, json=make_params(product.id), params={"token": token}
+    )
+    assert response.status == HTTPStatus.ACCEPTED
+    data = await response.json()
+    assert data == {
+        "ok": True,
+        "status_code": HTTPStatus.ACCEPTED,
+        "message": "The distribution job was queued",
+        "job_id": IsPositiveInt,
+    }
+    async with uow.start():
+        job = await uow.distribution_job.read_by_id(data["job_id"])
+    assert job.status == DistributionJobStatus.PENDING
+    assert job.subject_id == product.subject_id
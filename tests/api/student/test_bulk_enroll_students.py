@@ -0,0 +1,132 @@
+from http import HTTPStatus
+from typing import Any
+
+import pytest
+from aiohttp.test_utils import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from yarl import URL
+
+from lms.adapters.db.models import Student
+from lms.generals.enums import TeacherType
+
+API_URL = URL("/v1/students/bulk/")
+
+
+async def test_unauthorized_user_check_status(api_client: TestClient):
+    response = await api_client.post(API_URL)
+    assert response.status == HTTPStatus.UNAUTHORIZED
+
+
+async def test_invalid_token_check_status(api_client: TestClient):
+    response = await api_client.post(API_URL, params={"token": "something"})
+    assert response.status == HTTPStatus.FORBIDDEN
+
+
+@pytest.mark.parametrize(
+    "json_data",
+    (
+        None,
+        {},
+        {"enrollments": []},
+        {"enrollments": [{"student": {}, "offer_ids": [1]}]},
+    ),
+)
+async def test_validate_data(
+    api_client: TestClient,
+    token: str,
+    json_data: dict[str, Any] | None,
+):
+    response = await api_client.post(
+        API_URL,
+        params={"token": token},
+        json=json_data,
+    )
+    assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+async def test_per_item_results(
+    api_client: TestClient,
+    token: str,
+    create_offer,
+):
+    offer = await create_offer(teacher_type=None)
+    student = {
+        "raw_soho_flow_id": "1:1",
+        "soho_id": 1,
+        "email": "student@example.com",
+    }
+    response = await api_client.post(
+        API_URL,
+        params={"token": token},
+        json={
+            "enrollments": [
+                {"student": {**student, "vk_id": 1}, "offer_ids": [offer.id]},
+                {"student": {**student, "vk_id": 2, "soho_id": 2}, "offer_ids": [999]},
+            ]
+        },
+    )
+    assert response.status == HTTPStatus.OK
+    first, second = await response.json()
+    assert first["error"] is None
+    assert first["student_product"]["offer_id"] == offer.id
+    assert second == {
+        "vk_id": 2,
+        "offer_id": 999,
+        "student_product": None,
+        "error": "Offer not found",
+    }
+
+
+async def test_failed_row_keeps_the_rest_of_batch(
+    api_client: TestClient,
+    token: str,
+    session: AsyncSession,
+    create_product,
+    create_offer,
+    create_soho_account,
+):
+    product = await create_product()
+    teacher_offer = await create_offer(
+        product=product, teacher_type=TeacherType.CURATOR
+    )
+    alone_offer = await create_offer(product=product, teacher_type=None)
+    taken = await create_soho_account()
+
+    def enrollment(vk_id: int, soho_id: int, offer_id: int) -> dict[str, Any]:
+        return {
+            "student": {
+                "raw_soho_flow_id": "1:1",
+                "vk_id": vk_id,
+                "soho_id": soho_id,
+                "email": f"student{vk_id}@example.com",
+            },
+            "offer_ids": [offer_id],
+        }
+
+    response = await api_client.post(
+        API_URL,
+        params={"token": token},
+        json={
+            "enrollments": [
+                enrollment(1001, 1001, alone_offer.id),
+                # No curators: the student is not created, so the next row
+                # is enrolled one by one and hits the taken Soho account
+                enrollment(1002, taken.id, teacher_offer.id),
+                enrollment(1002, taken.id, alone_offer.id),
+                enrollment(1001, 1001, alone_offer.id),
+            ]
+        },
+    )
+    assert response.status == HTTPStatus.OK
+    results = await response.json()
+    assert [result["error"] is None for result in results] == [
+        True,
+        False,
+        False,
+        True,
+    ]
+    vk_ids = await session.scalars(
+        select(Student.vk_id).where(Student.vk_id.in_([1001, 1002]))
+    )
+    assert vk_ids.all() == [1001]
@@ -333,3 +333,60 @@ async def test_with_old_teacher_product(
     assert ta.student_product_id == student_product.id
     assert ta.removed_at is None
     assert ta.assignment_at is not None
+
+
+async def test_old_teacher_assignment_is_closed(
+    api_client: TestClient,
+    token: str,
+    session: AsyncSession,
+    create_student_product,
+    create_teacher_product,
+    create_teacher_assignment,
+    create_product,
+):
+    product = await create_product()
+    old_teacher_product = await create_teacher_product(
+        product=product,
+        type=TeacherType.CURATOR,
+        active_students=1,
+    )
+    new_teacher_product = await create_teacher_product(
+        product=product,
+        type=TeacherType.CURATOR,
+    )
+    student_product = await create_student_product(
+        product=product,
+        offer__product=product,
+        teacher_product=old_teacher_product,
+        teacher_type=TeacherType.CURATOR,
+    )
+    await create_teacher_assignment(
+        student_product=student_product,
+        teacher_product=old_teacher_product,
+    )
+
+    response = await api_client.post(
+        API_URL,
+        params={"token": token},
+        json={
+            "student_vk_id": student_product.student.vk_id,
+            "teacher_vk_id": new_teacher_product.teacher.vk_id,
+            "product_id": product.id,
+        },
+    )
+
+    assert response.status == HTTPStatus.OK
+    assignments = {
+        ta.teacher_product_id: ta
+        for ta in await session.scalars(
+            select(TeacherAssignment)
+            .filter_by(student_product_id=student_product.id)
+            .execution_options(populate_existing=True)
+        )
+    }
+    assert assignments[old_teacher_product.id].removed_at is not None
+    assert assignments[new_teacher_product.id].removed_at is None
+    await session.refresh(old_teacher_product)
+    await session.refresh(new_teacher_product)
+    assert old_teacher_product.active_students == 0
+    assert new_teacher_product.active_students == 1
@@ -1,10 +1,15 @@
+import asyncio
+from datetime import datetime
 from http import HTTPStatus
 from typing import Any
 
 import pytest
 from aiohttp.test_utils import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
 from yarl import URL
 
+from lms.generals.enums import TeacherType
+
 API_URL = URL("/v1/students/")
 
 
@@ -62,3 +67,81 @@ async def test_validate_data(
         json=json_data,
     )
     assert response.status == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def make_enrollment(vk_id: int, offer_id: int) -> dict[str, Any]:
+    return {
+        "student": {
+            "first_name": "First",
+            "last_name": "Last",
+            "raw_soho_flow_id": f"{offer_id}:1",
+            "vk_id": vk_id,
+            "soho_id": vk_id,
+            "email": f"student{vk_id}@example.com",
+        },
+        "offer_ids": [offer_id],
+    }
+
+
+async def test_concurrent_enrollments_reserve_different_teachers(
+    api_client: TestClient,
+    token: str,
+    create_product,
+    create_offer,
+    create_teacher_product,
+):
+    product = await create_product()
+    offer = await create_offer(product=product, teacher_type=TeacherType.CURATOR)
+    teacher_products = [
+        await create_teacher_product(
+            product=product, type=TeacherType.CURATOR, max_students=1
+        )
+        for _ in range(2)
+    ]
+
+    responses = await asyncio.gather(
+        *(
+            api_client.post(
+                API_URL,
+                params={"token": token},
+                json=make_enrollment(vk_id, offer.id),
+            )
+            for vk_id in (101, 102)
+        )
+    )
+
+    assert [r.status for r in responses] == [HTTPStatus.OK, HTTPStatus.OK]
+    reserved = {(await r.json())["teacher_product_id"] for r in responses}
+    assert reserved == {tp.id for tp in teacher_products}
+
+
+async def test_expelled_student_enrolled_again_is_counted(
+    api_client: TestClient,
+    token: str,
+    session: AsyncSession,
+    create_product,
+    create_offer,
+    create_student_product,
+):
+    product = await create_product()
+    alone_offer = await create_offer(product=product, teacher_type=None)
+    student_product = await create_student_product(
+        teacher_product__product=product,
+        teacher_product__type=TeacherType.CURATOR,
+        teacher_product__active_students=0,
+        offer__product=product,
+        teacher_type=TeacherType.CURATOR,
+        product=product,
+        expulsion_at=datetime.now(),
+    )
+
+    response = await api_client.post(
+        API_URL,
+        params={"token": token},
+        json=make_enrollment(student_product.student.vk_id, alone_offer.id),
+    )
+
+    assert response.status == HTTPStatus.OK
+    assert (await response.json())["expulsion_at"] is None
+    await session.refresh(student_product.teacher_product)
+    assert student_product.teacher_product.active_students == 1
@@ -252,6 +252,7 @@ async def test_successful_expulse_student_with_teacher(
     student_product = await create_student_product(
         teacher_product__product=product,
         teacher_product__type=teacher_type,
+        teacher_product__active_students=1,
         offer__product=product,
         teacher_type=teacher_type,
         product=product,
@@ -285,6 +286,9 @@ async def test_successful_expulse_student_with_teacher(
     await session.refresh(teacher_assignment)
     assert teacher_assignment.removed_at is not None
 
+    await session.refresh(student_product.teacher_product)
+    assert student_product.teacher_product.active_students == 0
+
 
 @pytest.mark.parametrize("teacher_type", (TeacherType.CURATOR, TeacherType.MENTOR))
 async def test_successful_expulse_with_teacher_if_not_assignment(
@@ -6,6 +6,7 @@ from aiohttp.test_utils import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from lms.generals.enums import TeacherType
+from lms.logic.grade_teacher import DUPLICATE_GRADE_ERROR
 
 
 async def test_unauthorized_user_check_status(api_client: TestClient) -> None:
@@ -289,3 +290,102 @@ async def test_successful(
     await session.refresh(student_product)
     assert student_product.teacher_grade == 2
     assert student_product.teacher_graded_at is not None
+
+
+async def test_bulk_grade(
+    api_client: TestClient,
+    token: str,
+    session: AsyncSession,
+    create_soho_account,
+    create_product,
+    create_student_product,
+    create_teacher_product,
+) -> None:
+    product = await create_product()
+    teacher_product = await create_teacher_product(
+        product=product,
+        type=TeacherType.CURATOR,
+        grade_counter=2,
+        average_grade=5,
+    )
+    sohos = []
+    for _ in range(2):
+        soho = await create_soho_account()
+        await create_student_product(
+            student=soho.student,
+            product=product,
+            teacher_type=TeacherType.CURATOR,
+            offer__teacher_type=TeacherType.CURATOR,
+            offer__product=product,
+            teacher_product=teacher_product,
+        )
+        sohos.append(soho)
+
+    response = await api_client.post(
+        "/v1/students/grade-teacher/bulk/",
+        params={"token": token},
+        json={
+            "grades": [
+                {"soho_id": sohos[0].id, "product_id": product.id, "grade": 4},
+                {"soho_id": 999, "product_id": product.id, "grade": 1},
+                {"soho_id": sohos[1].id, "product_id": product.id, "grade": 3},
+            ]
+        },
+    )
+    assert response.status == HTTPStatus.OK
+    assert [r["error"] for r in await response.json()] == [
+        None,
+        "SohoAccount not found",
+        None,
+    ]
+    await session.refresh(teacher_product)
+    assert teacher_product.grade_counter == 4
+    assert teacher_product.average_grade == (5 * 2 + 4 + 3) / 4
+
+
+async def test_bulk_grade__duplicate_is_rejected(
+    api_client: TestClient,
+    token: str,
+    session: AsyncSession,
+    create_soho_account,
+    create_product,
+    create_student_product,
+    create_teacher_product,
+) -> None:
+    product = await create_product()
+    teacher_product = await create_teacher_product(
+        product=product,
+        type=TeacherType.CURATOR,
+        grade_counter=0,
+        average_grade=0,
+    )
+    soho = await create_soho_account()
+    student_product = await create_student_product(
+        student=soho.student,
+        product=product,
+        teacher_type=TeacherType.CURATOR,
+        offer__teacher_type=TeacherType.CURATOR,
+        offer__product=product,
+        teacher_product=teacher_product,
+    )
+
+    response = await api_client.post(
+        "/v1/students/grade-teacher/bulk/",
+        params={"token": token},
+        json={
+            "grades": [
+                {"soho_id": soho.id, "product_id": product.id, "grade": 5},
+                {"soho_id": soho.id, "product_id": product.id, "grade": 1},
+            ]
+        },
+    )
+    assert response.status == HTTPStatus.OK
+    assert [r["error"] for r in await response.json()] == [
+        None,
+        DUPLICATE_GRADE_ERROR,
+    ]
+    await session.refresh(teacher_product)
+    await session.refresh(student_product)
+    assert teacher_product.grade_counter == 1
+    assert teacher_product.average_grade == 5
+    assert student_product.teacher_grade == 5
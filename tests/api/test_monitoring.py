@@ -7,3 +7,9 @@ async def test_ping_route(api_client: TestClient) -> None:
     response = await api_client.get("v1/monitoring/ping")
     assert response.status == HTTPStatus.OK
     assert await response.json() == {"db_status": "ok"}
+
+
+async def test_cache_stats_route(api_client: TestClient) -> None:
+    response = await api_client.get("v1/monitoring/cache")
+    assert response.status == HTTPStatus.OK
+    assert await response.json() == {"enabled": False, "regions": {}}
@@ -0,0 +1,25 @@
+import pytest
+
+from lms.utils.backoff import Backoff
+
+
+def test_pause__doubles_up_to_max_pause():
+    backoff = Backoff(base=0.5, max_pause=3, jitter=lambda: 1.0)
+    assert [backoff.pause(attempt) for attempt in range(5)] == [0.5, 1, 2, 3, 3]
+
+
+def test_pause__jitter_scales_pause():
+    backoff = Backoff(base=1, jitter=lambda: 0.25)
+    assert backoff.pause(2) == 1
+
+
+def test_pause__default_jitter_within_bounds():
+    backoff = Backoff(base=1, max_pause=4)
+    pauses = [backoff.pause(3) for _ in range(100)]
+    assert all(0 <= pause <= 4 for pause in pauses)
+
+
+@pytest.mark.parametrize("base,max_pause", [(-1, 1), (2, 1)])
+def test_init__invalid(base: float, max_pause: float):
+    with pytest.raises(ValueError):
+        Backoff(base=base, max_pause=max_pause)
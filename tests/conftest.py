@@ -12,6 +12,7 @@ pytest_plugins = (
     "tests.plugins.instances.autopilot",
     "tests.plugins.instances.database",
     "tests.plugins.instances.distributor",
+    "tests.plugins.instances.outbox",
     "tests.plugins.instances.rest",
     "tests.plugins.instances.soho",
     "tests.plugins.instances.telegram",
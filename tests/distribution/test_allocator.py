@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from lms.utils.distribution.allocator import (
+    Allocation,
+    ReviewerCapacity,
+    allocate,
+    apportion,
+)
+
+
+def capacity(min_: int = 0, desired: int = 10, max_: int = 20, assigned: int = 0):
+    return ReviewerCapacity(assigned=assigned, min_=min_, desired=desired, max_=max_)
+
+
+def test_apportion__largest_remainder():
+    assert apportion(10, [1, 1, 1], [0, 0, 0], [10, 10, 10]) == [4, 3, 3]
+    assert apportion(7, [3, 1], [0, 0], [10, 10]) == [5, 2]
+
+
+def test_apportion__respects_bounds():
+    assert apportion(10, [1, 100], [2, 0], [10, 5]) == [5, 5]
+
+
+def test_apportion__out_of_bounds():
+    with pytest.raises(ValueError):
+        apportion(11, [1], [0], [10])
+
+
+def test_allocate__not_enough_for_minimum_fills_in_order():
+    result = allocate(5, [capacity(min_=3), capacity(min_=3)])
+    assert result == Allocation(targets=[3, 2], overflow=0)
+
+
+def test_allocate__proportional_to_desired():
+    result = allocate(30, [capacity(desired=10), capacity(desired=30)])
+    assert result == Allocation(targets=[8, 22], overflow=0)
+
+
+def test_allocate__minimum_is_kept():
+    result = allocate(10, [capacity(min_=5, desired=5), capacity(desired=100)])
+    assert result.targets[0] >= 5
+    assert sum(result.targets) == 10
+
+
+def test_allocate__over_desired_up_to_max():
+    result = allocate(30, [capacity(desired=10, max_=20), capacity(desired=10)])
+    assert result == Allocation(targets=[15, 15], overflow=0)
+
+
+def test_allocate__overflow():
+    result = allocate(50, [capacity(max_=20), capacity(max_=20)])
+    assert result == Allocation(targets=[20, 20], overflow=10)
+
+
+def test_allocate__already_assigned():
+    result = allocate(10, [capacity(assigned=8), capacity()])
+    assert result.targets[0] >= 8
+    assert sum(result.targets) == 10
+
+
+def test_allocate__guarantees_random():
+    rnd = random.Random(0)
+    for _ in range(1000):
+        reviewers = []
+        for _ in range(rnd.randint(1, 8)):
+            max_ = rnd.randint(0, 25)
+            reviewers.append(
+                capacity(
+                    min_=rnd.randint(0, 5),
+                    desired=min(rnd.randint(0, 15), max_),
+                    max_=max_,
+                )
+            )
+        total = rnd.randint(0, 120)
+        result = allocate(total, reviewers)
+        floors = [min(r.min_, r.max_) for r in reviewers]
+        desired = [max(f, r.desired) for f, r in zip(floors, reviewers)]
+        maximum = [max(d, r.max_) for d, r in zip(desired, reviewers)]
+
+        assert sum(result.targets) + result.overflow == total
+        assert all(t <= m for t, m in zip(result.targets, maximum))
+        if total >= sum(floors):
+            assert all(t >= f for t, f in zip(result.targets, floors))
+        if total <= sum(desired):
+            assert all(t <= d for t, d in zip(result.targets, desired))
+        else:
+            assert all(t >= d for t, d in zip(result.targets, desired))
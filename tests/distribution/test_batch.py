@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime
+
+from lms.generals.models.distribution import Distribution, DistributionParams
+from lms.logic.batch_distribution import run_batch
+from lms.utils.stages import StageTracker
+
+
+def make_params(name: str, product_id: int) -> DistributionParams:
+    return DistributionParams(name=name, product_ids=[product_id], homeworks=[])
+
+
+def make_runner(running: list[str], peak: list[int], fail: str | None = None):
+    async def run(params: DistributionParams, tracker: StageTracker) -> Distribution:
+        running.append(params.name)
+        peak.append(len(running))
+        try:
+            async with tracker.stage("distribute"):
+                await asyncio.sleep(0.01)
+                if params.name == fail:
+                    raise RuntimeError("boom")
+        finally:
+            running.remove(params.name)
+        return Distribution(
+            id=int(params.name),
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            subject_id=1,
+            data=None,
+        )
+
+    return run
+
+
+async def test_run_batch__concurrency_cap():
+    running: list[str] = []
+    peak: list[int] = []
+    params_list = [make_params(str(i), product_id=i) for i in range(1, 7)]
+
+    results = await run_batch(
+        params_list=params_list,
+        run=make_runner(running, peak),
+        concurrency=2,
+        subject_ids={i: i for i in range(1, 7)},
+    )
+
+    assert max(peak) == 2
+    assert [r.distribution_id for r in results] == [1, 2, 3, 4, 5, 6]
+    assert all(r.ok and r.stages[0].name == "distribute" for r in results)
+
+
+async def test_run_batch__same_subject_runs_sequentially():
+    running: list[str] = []
+    peak: list[int] = []
+    params_list = [make_params("1", product_id=1), make_params("2", product_id=2)]
+
+    await run_batch(
+        params_list=params_list,
+        run=make_runner(running, peak),
+        concurrency=2,
+        subject_ids={1: 10, 2: 10},
+    )
+
+    assert max(peak) == 1
+
+
+async def test_run_batch__failure_does_not_stop_others():
+    params_list = [make_params("1", product_id=1), make_params("2", product_id=2)]
+
+    results = await run_batch(
+        params_list=params_list,
+        run=make_runner([], [], fail="1"),
+        concurrency=2,
+        subject_ids={1: 1, 2: 2},
+    )
+
+    assert results[0].error == "RuntimeError('boom')"
+    assert results[0].stages[0].status == "FAILED"
+    assert results[1].distribution_id == 2
@@ -0,0 +1,65 @@
+from lms.adapters.soho.soho import ClientSchema
+from lms.utils.distribution.clients import ClientDirectory
+
+
+def make_client(
+    id_: int,
+    vk_id: int | None = None,
+    emails: list[str] | None = None,
+) -> ClientSchema:
+    return ClientSchema.model_validate(
+        {
+            "id": id_,
+            "firstName": f"First{id_}",
+            "lastName": f"Last{id_}",
+            "emails": emails or [],
+            "vkId": vk_id,
+        }
+    )
+
+
+def test_from_clients__empty():
+    directory: ClientDirectory[ClientSchema] = ClientDirectory.from_clients([])
+    assert len(directory) == 0
+    assert directory.get(1) is None
+
+
+def test_get__by_soho_id():
+    client = make_client(1)
+    directory = ClientDirectory.from_clients([make_client(2), client])
+    assert directory.get(1) is client
+    assert 1 in directory
+    assert 3 not in directory
+
+
+def test_get_by_vk_id():
+    client = make_client(1, vk_id=100)
+    directory = ClientDirectory.from_clients([client, make_client(2)])
+    assert directory.get_by_vk_id(100) is client
+    assert directory.get_by_vk_id(0) is None
+
+
+def test_get_by_email__normalized():
+    client = make_client(1, emails=["Student@Example.com "])
+    directory = ClientDirectory.from_clients([client])
+    assert directory.get_by_email("student@example.com") is client
+
+
+def test_secondary_keys__first_client_wins():
+    first = make_client(1, vk_id=100, emails=["a@example.com"])
+    second = make_client(2, vk_id=100, emails=["a@example.com"])
+    directory = ClientDirectory.from_clients([first, second])
+    assert directory.get_by_vk_id(100) is first
+    assert directory.get_by_email("a@example.com") is first
+    assert directory.get(2) is second
+
+
+def test_find__fallback_order():
+    by_id = make_client(1)
+    by_vk = make_client(2, vk_id=200)
+    by_email = make_client(3, emails=["c@example.com"])
+    directory = ClientDirectory.from_clients([by_id, by_vk, by_email])
+    assert directory.find(soho_id=1, vk_id=200) is by_id
+    assert directory.find(soho_id=404, vk_id=200) is by_vk
+    assert directory.find(soho_id=404, email="c@example.com") is by_email
+    assert directory.find(soho_id=404, vk_id=404, email="x@example.com") is None
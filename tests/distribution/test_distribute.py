@@ -0,0 +1,55 @@
+from lms.generals.enums import DistributionErrorMessage
+from tests.utils.distribution import make_distribution, make_reviewer
+
+
+def test_distribute__every_homework_assigned_once():
+    distribution = make_distribution(
+        25,
+        [make_reviewer(1, 2, 10, 15), make_reviewer(2, 2, 10, 15)],
+    )
+    distribution.distribute()
+
+    assigned = [
+        hw.student_soho_id for r in distribution.reviewers for hw in r.student_homeworks
+    ]
+    assert sorted(assigned) == list(range(25))
+    assert distribution.error_homeworks == []
+    assert distribution.filtered_homeworks == []
+
+
+def test_distribute__overflow_goes_to_errors():
+    distribution = make_distribution(12, [make_reviewer(1, 0, 5, 10)])
+    distribution.distribute()
+
+    assert len(distribution.reviewers[0].student_homeworks) == 10
+    assert [e.error_message for e in distribution.error_homeworks] == [
+        DistributionErrorMessage.STACK_OVERFLOW
+    ] * 2
+    assert distribution.stats.distributed == 10
+    assert distribution.stats.errors == {DistributionErrorMessage.STACK_OVERFLOW: 2}
+    assert distribution.stats.duplicates == 0
+
+
+def test_distribute__same_seed_same_result():
+    results = []
+    for _ in range(2):
+        distribution = make_distribution(
+            30,
+            [make_reviewer(1, 0, 10, 20), make_reviewer(2, 0, 20, 20)],
+            seed=42,
+        )
+        distribution.distribute()
+        results.append(
+            [
+                [hw.student_soho_id for hw in r.student_homeworks]
+                for r in distribution.reviewers
+            ]
+        )
+    assert results[0] == results[1]
+
+
+def test_distribute__seed_is_saved():
+    distribution = make_distribution(3, [make_reviewer(1, 0, 5, 5)])
+    distribution.distribute()
+    assert distribution.seed is not None
+    assert distribution.dump()["seed"] == distribution.seed
@@ -0,0 +1,168 @@
+from dataclasses import replace
+from datetime import datetime
+
+from lms.generals.enums import DistributionErrorMessage
+from lms.generals.models.student_product import StudentEnrollment
+from lms.utils.distribution.filters import (
+    EnrollmentIndex,
+    deduplicate,
+    split_homeworks,
+)
+from lms.utils.distribution.models import SohoHomework, StudentDistributeData
+
+
+def make_homework(soho_id: int, vk_id: int | None = None, homework_id: int = 1):
+    return SohoHomework(
+        student_homework_id=soho_id * 10,
+        student_soho_id=soho_id,
+        sent_to_review_at=datetime(2024, 1, 1),
+        chat_url=f"https://example.com/{soho_id}",
+        student_vk_id=vk_id,
+        homework_id=homework_id,
+    )
+
+
+def make_student(soho_id: int) -> StudentDistributeData:
+    return StudentDistributeData(
+        vk_id=0,
+        first_name="First",
+        last_name=f"Last{soho_id}",
+        homework_id=1,
+        soho_id=soho_id,
+    )
+
+
+def make_enrollment(
+    soho_id: int | None,
+    vk_id: int,
+    flow_id: int | None = 1,
+    expelled: bool = False,
+    is_premium: bool = False,
+) -> StudentEnrollment:
+    return StudentEnrollment(
+        soho_id=soho_id,
+        student_id=vk_id,
+        vk_id=vk_id,
+        product_id=1,
+        flow_id=flow_id,
+        expulsion_at=datetime(2024, 1, 1) if expelled else None,
+        is_premium=is_premium,
+    )
+
+
+def split(homeworks, enrollments, flow_filters=None, previous_reviewers=None):
+    # soho id 404 stands for a student missing from the Soho client directory
+    student_map = {
+        hw.student_soho_id: make_student(hw.student_soho_id)
+        for hw in homeworks
+        if hw.student_soho_id != 404
+    }
+    return split_homeworks(
+        homeworks=homeworks,
+        student_map=student_map,
+        enrollments=EnrollmentIndex.from_enrollments(enrollments),
+        flow_filters=flow_filters or {},
+        previous_reviewers=previous_reviewers or {},
+    )
+
+
+def test_without_filters__unknown_students_accepted():
+    accepted, errors = split([make_homework(1, vk_id=100)], [])
+    assert [hw.student_soho_id for hw in accepted] == [1]
+    assert accepted[0].student_vk_id == 100
+    assert accepted[0].student_homework_id == 10
+    assert errors == []
+
+
+def test_without_filters__expelled_rejected():
+    accepted, errors = split(
+        [make_homework(1)],
+        [make_enrollment(1, vk_id=100, expelled=True)],
+    )
+    assert accepted == []
+    assert errors[0].error_message == DistributionErrorMessage.STUDENT_WAS_EXPULSED
+    assert errors[0].homework.student_vk_id == 100
+
+
+def test_missing_soho_client__error_instead_of_key_error():
+    accepted, errors = split([make_homework(404)], [])
+    assert accepted == []
+    assert errors[0].error_message == DistributionErrorMessage.STUDENT_NOT_FOUND_IN_SOHO
+
+
+def test_flow_filters():
+    homeworks = [
+        make_homework(1),
+        make_homework(2),
+        make_homework(3, vk_id=300),
+        make_homework(4),
+        make_homework(5, vk_id=500),
+        make_homework(6, homework_id=2),
+    ]
+    enrollments = [
+        make_enrollment(1, vk_id=100, flow_id=7),
+        make_enrollment(2, vk_id=200, flow_id=8),
+        make_enrollment(None, vk_id=300, flow_id=7),
+        make_enrollment(5, vk_id=500, flow_id=7, expelled=True),
+    ]
+    accepted, errors = split(homeworks, enrollments, flow_filters={1: frozenset({7})})
+    assert [hw.student_soho_id for hw in accepted] == [1, 3, 6]
+    assert [(e.homework.student_soho_id, e.error_message) for e in errors] == [
+        (2, DistributionErrorMessage.STUDENT_NOT_IN_FLOW),
+        (4, DistributionErrorMessage.HOMEWORK_WITHOUT_VK_ID),
+        (5, DistributionErrorMessage.STUDENT_WAS_EXPULSED),
+    ]
+
+
+def test_flow_filters__any_active_enrollment_matches():
+    accepted, errors = split(
+        [make_homework(1)],
+        [
+            make_enrollment(1, vk_id=100, flow_id=8),
+            make_enrollment(1, vk_id=100, flow_id=7),
+        ],
+        flow_filters={1: frozenset({7})},
+    )
+    assert len(accepted) == 1
+    assert errors == []
+
+
+def test_premium_and_previous_reviewer_marked():
+    accepted, errors = split(
+        [make_homework(1, vk_id=100), make_homework(2, vk_id=200)],
+        [make_enrollment(1, 100, is_premium=True), make_enrollment(2, 200)],
+        previous_reviewers={(2, 1): 7},
+    )
+    assert [(hw.is_premium, hw.previous_reviewer_id) for hw in accepted] == [
+        (True, None),
+        (False, 7),
+    ]
+    assert errors == []
+
+
+def test_deduplicate__by_submission_and_by_student():
+    first = make_homework(1, homework_id=1)
+    same_submission = replace(make_homework(2, homework_id=2), student_homework_id=10)
+    same_student = replace(first, student_homework_id=11)
+    other_homework = replace(make_homework(1, homework_id=2), student_homework_id=12)
+    unique, duplicates = deduplicate(
+        [first, same_submission, same_student, other_homework]
+    )
+    assert unique == [first, other_homework]
+    assert duplicates == [same_submission, same_student]
+
+
+def test_duplicates_reported_as_errors():
+    homework = make_homework(1, vk_id=100)
+    accepted, errors = split_homeworks(
+        homeworks=[homework],
+        student_map={1: make_student(1)},
+        enrollments=EnrollmentIndex(),
+        flow_filters={},
+        previous_reviewers={},
+        duplicates=[replace(homework, student_homework_id=11)],
+    )
+    assert [hw.student_homework_id for hw in accepted] == [10]
+    assert [(e.homework.student_homework_id, e.error_message) for e in errors] == [
+        (11, DistributionErrorMessage.DUPLICATE_HOMEWORK)
+    ]
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from lms.adapters.db.uow import UnitOfWork
+from lms.generals.enums import DistributionJobStatus
+from lms.generals.models.distribution import DistributionParams
+
+PARAMS = DistributionParams(
+    name="Distribution",
+    product_ids=[1],
+    homeworks=[{"homework_id": 1, "filters": []}],
+)
+
+
+async def test_claim_next__empty_queue(uow: UnitOfWork):
+    async with uow.start():
+        assert await uow.distribution_job.claim_next() is None
+
+
+async def test_claim_next__oldest_first(uow: UnitOfWork, create_subject):
+    subject = await create_subject()
+    async with uow.start():
+        first = await uow.distribution_job.create(subject.id, PARAMS)
+        await uow.distribution_job.create(subject.id, PARAMS)
+        job = await uow.distribution_job.claim_next()
+
+    assert job is not None
+    assert job.id == first.id
+    assert job.status == DistributionJobStatus.RUNNING
+    assert job.started_at is not None
+
+
+async def test_claim_next__one_running_job_per_subject(
+    uow: UnitOfWork,
+    create_subject,
+):
+    subject = await create_subject()
+    other_subject = await create_subject()
+    async with uow.start():
+        await uow.distribution_job.create(subject.id, PARAMS)
+        await uow.distribution_job.create(subject.id, PARAMS)
+        other = await uow.distribution_job.create(other_subject.id, PARAMS)
+        await uow.distribution_job.claim_next()
+        second = await uow.distribution_job.claim_next()
+        third = await uow.distribution_job.claim_next()
+
+    assert second is not None
+    assert second.id == other.id
+    assert third is None
+
+
+async def test_finish(uow: UnitOfWork, create_subject):
+    subject = await create_subject()
+    async with uow.start():
+        job = await uow.distribution_job.create(subject.id, PARAMS)
+        await uow.distribution_job.claim_next()
+        finished = await uow.distribution_job.finish(
+            job_id=job.id,
+            status=DistributionJobStatus.FAILED,
+            error="boom",
+        )
+
+    assert finished.status == DistributionJobStatus.FAILED
+    assert finished.error == "boom"
+    assert finished.finished_at is not None
+
+
+async def test_fail_stale(uow: UnitOfWork, create_subject):
+    subject = await create_subject()
+    async with uow.start():
+        job = await uow.distribution_job.create(subject.id, PARAMS)
+        await uow.distribution_job.claim_next()
+        fresh = await uow.distribution_job.fail_stale(
+            updated_before=datetime.now() - timedelta(hours=1),
+            error="interrupted",
+        )
+        stale = await uow.distribution_job.fail_stale(
+            updated_before=datetime.now() + timedelta(hours=1),
+            error="interrupted",
+        )
+        failed = await uow.distribution_job.read_by_id(job.id)
+
+    assert fresh == 0
+    assert stale == 1
+    assert failed.status == DistributionJobStatus.FAILED
+    assert failed.error == "interrupted"
+    assert failed.finished_at is not None
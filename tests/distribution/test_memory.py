@@ -0,0 +1,169 @@
+import gc
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+from lms.generals.models.distribution import DistributionParams
+from lms.generals.models.student_product import StudentEnrollment
+from lms.utils.distribution.filters import (
+    EnrollmentIndex,
+    deduplicate,
+    split_homeworks,
+)
+from lms.utils.distribution.models import (
+    Distribution,
+    SohoHomework,
+    StudentDistributeData,
+)
+from tests.utils.distribution import make_reviewer
+
+HOMEWORKS = 50_000
+# The working set as pydantic models took well over a kilobyte a homework,
+# the slotted records stay below a third of that
+MAX_BYTES_PER_HOMEWORK = 400
+# Measured against the same homeworks in the old layout, so the bound holds
+# whatever the interpreter version does to object sizes
+MIN_SAVING_RATIO = 3
+
+SENT_AT = datetime(2024, 1, 1)
+
+
+class LegacySohoHomework(BaseModel):
+    student_homework_id: int
+    student_soho_id: int
+    sent_to_review_at: datetime
+    chat_url: str
+    student_vk_id: int | None
+    homework_id: int
+
+
+class LegacyStudentHomework(BaseModel):
+    student_name: str
+    student_vk_id: int
+    student_soho_id: int
+    submission_url: str
+    homework_id: int
+
+
+def make_inputs() -> tuple[
+    list[tuple[int, str]],
+    dict[int, StudentDistributeData],
+    EnrollmentIndex,
+]:
+    # Everything the pipeline gets from Soho and the database
+    responses = [(i, f"https://example.com/{i}") for i in range(HOMEWORKS)]
+    student_map = {
+        i: StudentDistributeData(
+            vk_id=i,
+            first_name="First",
+            last_name="Last",
+            homework_id=1,
+            soho_id=i,
+        )
+        for i in range(HOMEWORKS)
+    }
+    enrollments = EnrollmentIndex.from_enrollments(
+        StudentEnrollment(
+            soho_id=i,
+            student_id=i,
+            vk_id=i,
+            product_id=1,
+            flow_id=1,
+            expulsion_at=None,
+            is_premium=False,
+        )
+        for i in range(HOMEWORKS)
+    )
+    return responses, student_map, enrollments
+
+
+def build_distribution(
+    responses: list[tuple[int, str]],
+    student_map: dict[int, StudentDistributeData],
+    enrollments: EnrollmentIndex,
+) -> Distribution:
+    # The same steps as Distributor.make_distribution
+    fetched = [
+        SohoHomework(
+            student_homework_id=i,
+            student_soho_id=i,
+            sent_to_review_at=SENT_AT,
+            chat_url=chat_url,
+            student_vk_id=i,
+            homework_id=1,
+        )
+        for i, chat_url in responses
+    ]
+    homeworks, duplicates = deduplicate(fetched)
+    filtered_homeworks, error_homeworks = split_homeworks(
+        homeworks=homeworks,
+        student_map=student_map,
+        enrollments=enrollments,
+        flow_filters={},
+        previous_reviewers={},
+        duplicates=duplicates,
+    )
+    return Distribution(
+        created_at=SENT_AT,
+        params=DistributionParams(name="Test", product_ids=[1], homeworks=[]),
+        homeworks=fetched,
+        reviewers=[make_reviewer(1, 0, HOMEWORKS, HOMEWORKS)],
+        filtered_homeworks=filtered_homeworks,
+        error_homeworks=error_homeworks,
+    )
+
+
+def build_legacy_working_set(
+    responses: list[tuple[int, str]],
+    student_map: dict[int, StudentDistributeData],
+    enrollments: EnrollmentIndex,
+) -> list[Any]:
+    # Pydantic models for every fetched and every filtered homework, as the
+    # distribution kept them before the slotted records
+    fetched = [
+        LegacySohoHomework(
+            student_homework_id=i,
+            student_soho_id=i,
+            sent_to_review_at=SENT_AT,
+            chat_url=chat_url,
+            student_vk_id=i,
+            homework_id=1,
+        )
+        for i, chat_url in responses
+    ]
+    filtered = [
+        LegacyStudentHomework(
+            student_name=student_map[hw.student_soho_id].name,
+            student_vk_id=student_map[hw.student_soho_id].vk_id,
+            student_soho_id=hw.student_soho_id,
+            submission_url=hw.chat_url,
+            homework_id=hw.homework_id,
+        )
+        for hw in fetched
+    ]
+    return [fetched, filtered]
+
+
+def measure_peak(build: Callable[..., Any], *inputs: Any) -> tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build(*inputs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def test_working_set_memory():
+    inputs = make_inputs()
+    distribution, peak = measure_peak(build_distribution, *inputs)
+    assert len(distribution.filtered_homeworks) == HOMEWORKS
+    del distribution
+    _, legacy_peak = measure_peak(build_legacy_working_set, *inputs)
+
+    assert peak / HOMEWORKS < MAX_BYTES_PER_HOMEWORK
+    assert legacy_peak / peak > MIN_SAVING_RATIO
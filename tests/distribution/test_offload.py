@@ -0,0 +1,117 @@
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any
+
+import orjson
+import pytest
+
+from lms.adapters.google.sheets import new_sheet_requests
+from lms.logic.distribute_homeworks import (
+    SHEET_HEADER_ROWS,
+    SHEET_INDEX,
+    Distributor,
+    _encode_sheet,
+)
+from lms.utils.distribution.packing import allocate, pack, unpack
+from tests.utils.distribution import make_distribution, make_reviewer
+
+
+@pytest.fixture(scope="module")
+def process_pool() -> Iterator[ProcessPoolExecutor]:
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        yield pool
+
+
+@pytest.fixture
+def distributor(process_pool: ProcessPoolExecutor) -> Distributor:
+    return Distributor(
+        uow=None,
+        google_sheets=None,
+        google_drive=None,
+        soho=None,
+        executor=process_pool,
+    )
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=1)
+        self.calls: list[Callable] = []
+
+    def submit(self, fn: Callable, /, *args: Any, **kwargs: Any) -> Future:
+        self.calls.append(fn)
+        return super().submit(fn, *args, **kwargs)
+
+
+def assignments(distribution):
+    reviewers = distribution.reviewers
+    errors = distribution.error_homeworks
+    return (
+        [[hw.student_soho_id for hw in r.student_homeworks] for r in reviewers],
+        [(e.homework.student_soho_id, e.error_message) for e in errors],
+        [(r.actual, r.percent) for r in reviewers],
+    )
+
+
+def test_packed_allocation__same_as_in_place():
+    reviewers = [make_reviewer(1, 0, 10, 20), make_reviewer(2, 2, 5, 5)]
+    reviewers[0].is_premium = True
+    expected = make_distribution(40, [r.copy() for r in reviewers], seed=3)
+    expected.filtered_homeworks = [
+        replace(hw, is_premium=hw.student_soho_id % 3 == 0)
+        for hw in expected.filtered_homeworks
+    ]
+    packed = make_distribution(40, reviewers, seed=3)
+    packed.filtered_homeworks = list(expected.filtered_homeworks)
+
+    expected.distribute()
+    unpack(packed, allocate(pack(packed)))
+
+    assert assignments(packed) == assignments(expected)
+    assert packed.filtered_homeworks == []
+
+
+async def test_distribute__in_process(distributor: Distributor):
+    distribution = make_distribution(25, [make_reviewer(1, 0, 10, 20)])
+
+    await distributor._distribute(distribution)
+
+    assert len(distribution.reviewers[0].student_homeworks) == 20
+    assert len(distribution.error_homeworks) == 5
+    assert distribution.seed is not None
+
+
+async def test_encode_sheet__in_process(distributor: Distributor):
+    columns = [["Name", "12345", "=A1"], [], ["x"]]
+
+    body = await distributor._run_in_executor(_encode_sheet, columns, 7, "Sheet")
+
+    assert orjson.loads(body) == {
+        "requests": new_sheet_requests(
+            sheet_id=7,
+            title="Sheet",
+            index=SHEET_INDEX,
+            columns=columns,
+            header_rows=SHEET_HEADER_ROWS,
+        )
+    }
+
+
+async def test_cpu_bound_work_runs_in_executor():
+    executor = RecordingExecutor()
+    distributor = Distributor(
+        uow=None,
+        google_sheets=None,
+        google_drive=None,
+        soho=None,
+        executor=executor,
+    )
+    distribution = make_distribution(25, [make_reviewer(1, 0, 10, 20)])
+    try:
+        await distributor._distribute(distribution)
+        await distributor._run_in_executor(_encode_sheet, [["x"]], 7, "Sheet")
+    finally:
+        executor.shutdown()
+
+    assert executor.calls == [allocate, _encode_sheet]
@@ -0,0 +1,82 @@
+from dataclasses import replace
+
+from lms.utils.distribution.models import assign_by_capacity
+from tests.utils.distribution import make_distribution, make_homeworks, make_reviewer
+
+
+def assigned(reviewers) -> dict[int, list[int]]:
+    return {r.id: [hw.student_soho_id for hw in r.student_homeworks] for r in reviewers}
+
+
+def test_assign_by_capacity__desired_then_max():
+    reviewers = [make_reviewer(1, 0, 1, 3), make_reviewer(2, 0, 3, 3)]
+    rest = assign_by_capacity(make_homeworks(7), reviewers)
+    assert [len(r.student_homeworks) for r in reviewers] == [3, 3]
+    assert [hw.student_soho_id for hw in rest] == [6]
+
+
+def test_assign_by_capacity__skips_previous_reviewer():
+    reviewers = [make_reviewer(1, 0, 5, 5), make_reviewer(2, 0, 1, 1)]
+    homeworks = [
+        replace(hw, previous_reviewer_id=1 if hw.student_soho_id < 2 else None)
+        for hw in make_homeworks(3)
+    ]
+    rest = assign_by_capacity(homeworks, reviewers)
+    assert assigned(reviewers) == {1: [2], 2: [0]}
+    assert [hw.student_soho_id for hw in rest] == [1]
+
+
+def test_premium_goes_to_premium_reviewers():
+    premium = make_reviewer(1, 0, 5, 5)
+    premium.is_premium = True
+    regular = make_reviewer(2, 0, 5, 5)
+    distribution = make_distribution(0, [premium, regular], seed=1)
+    distribution.filtered_homeworks = [
+        replace(hw, is_premium=hw.student_soho_id < 3) for hw in make_homeworks(6)
+    ]
+    distribution.distribute()
+    assert sorted(assigned([premium])[1][:3]) == [0, 1, 2]
+    assert sum(len(r.student_homeworks) for r in distribution.reviewers) == 6
+
+
+def test_rechecks_avoid_previous_reviewer():
+    first = make_reviewer(1, 0, 10, 10)
+    second = make_reviewer(2, 0, 10, 10)
+    checker = make_reviewer(3, 0, 2, 2)
+    checker.recheck = True
+    distribution = make_distribution(0, [first, second, checker], seed=1)
+    distribution.filtered_homeworks = [
+        replace(hw, previous_reviewer_id=hw.student_soho_id % 2 + 1)
+        for hw in make_homeworks(6)
+    ]
+    distribution.distribute()
+    assert len(checker.student_homeworks) == 2
+    for r in distribution.reviewers:
+        assert all(hw.previous_reviewer_id != r.id for hw in r.student_homeworks)
+    assert distribution.error_homeworks == []
+
+
+def test_leftover_recheck_never_goes_to_previous_reviewer():
+    previous = make_reviewer(1, 0, 5, 5)
+    full = make_reviewer(2, 0, 0, 0)
+    distribution = make_distribution(0, [previous, full], seed=1)
+    distribution.filtered_homeworks = [
+        replace(hw, previous_reviewer_id=1) for hw in make_homeworks(1)
+    ]
+    distribution.distribute()
+    assert assigned(distribution.reviewers) == {1: [], 2: []}
+    assert [e.homework.student_soho_id for e in distribution.error_homeworks] == [0]
+
+
+def test_rechecks_keep_minimum_of_other_reviewers():
+    checker = make_reviewer(1, 0, 7, 7)
+    checker.recheck = True
+    guaranteed = make_reviewer(2, 5, 5, 5)
+    previous = make_reviewer(3, 0, 5, 5)
+    distribution = make_distribution(0, [checker, guaranteed, previous], seed=1)
+    distribution.filtered_homeworks = [
+        replace(hw, previous_reviewer_id=3) for hw in make_homeworks(8)
+    ]
+    distribution.distribute()
+    assert [len(r.student_homeworks) for r in distribution.reviewers] == [3, 5, 0]
+    assert distribution.error_homeworks == []
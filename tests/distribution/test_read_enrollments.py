@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from lms.adapters.db.uow import UnitOfWork
+
+
+async def test_read_enrollments__by_soho_and_vk_id(
+    uow: UnitOfWork,
+    create_student_product,
+    create_soho_account,
+) -> None:
+    by_soho = await create_student_product()
+    soho_account = await create_soho_account(student=by_soho.student)
+    by_vk = await create_student_product(expulsion_at=datetime(2024, 1, 1))
+    await create_student_product()
+
+    async with uow.start():
+        enrollments = await uow.student_product.read_enrollments(
+            product_ids=[by_soho.product_id, by_vk.product_id],
+            soho_ids=[soho_account.id],
+            vk_ids=[by_vk.student.vk_id],
+        )
+
+    assert {e.vk_id: (e.soho_id, e.flow_id, e.is_active) for e in enrollments} == {
+        by_soho.student.vk_id: (soho_account.id, by_soho.flow_id, True),
+        by_vk.student.vk_id: (None, by_vk.flow_id, False),
+    }
+
+
+async def test_read_enrollments__other_products_ignored(
+    uow: UnitOfWork,
+    create_student_product,
+) -> None:
+    student_product = await create_student_product()
+
+    async with uow.start():
+        enrollments = await uow.student_product.read_enrollments(
+            product_ids=[student_product.product_id + 1000],
+            soho_ids=[],
+            vk_ids=[student_product.student.vk_id],
+        )
+
+    assert enrollments == []
+
+
+async def test_read_enrollments__premium_offer(
+    uow: UnitOfWork,
+    create_student_product,
+) -> None:
+    premium = await create_student_product(offer__is_premium=True)
+    regular = await create_student_product(product=premium.product)
+
+    async with uow.start():
+        enrollments = await uow.student_product.read_enrollments(
+            product_ids=[premium.product_id],
+            soho_ids=[],
+            vk_ids=[premium.student.vk_id, regular.student.vk_id],
+        )
+
+    assert {e.vk_id: e.is_premium for e in enrollments} == {
+        premium.student.vk_id: True,
+        regular.student.vk_id: False,
+    }
@@ -0,0 +1,34 @@
+from lms.adapters.db.uow import UnitOfWork
+from tests.utils.distribution import make_assignment
+
+
+async def test_read_last_assignments__latest_reviewer_wins(
+    uow: UnitOfWork,
+    create_subject,
+    create_reviewer,
+) -> None:
+    subject = await create_subject()
+    first = await create_reviewer(subject_id=subject.id)
+    second = await create_reviewer(subject_id=subject.id)
+    for assignments in (
+        [make_assignment(first.id, 1), make_assignment(first.id, 2)],
+        [make_assignment(second.id, 1), make_assignment(None, 2)],
+    ):
+        async with uow.start():
+            distribution = await uow.distribution.create(subject.id, data=None)
+            await uow.distribution_assignment.create_many(
+                distribution_id=distribution.id,
+                assignments=assignments,
+            )
+            await uow.commit()
+
+    async with uow.start():
+        assignments = await uow.distribution_assignment.read_last_assignments(
+            student_soho_ids=[1, 2, 3],
+            homework_ids=[1],
+        )
+
+    assert {a.student_soho_id: a.reviewer_id for a in assignments} == {
+        1: second.id,
+        2: first.id,
+    }
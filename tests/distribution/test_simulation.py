@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from lms.utils.distribution.simulation import (
+    ReviewerLoad,
+    fairness,
+    recorded_inputs,
+    simulate,
+    synthetic_homeworks,
+    synthetic_reviewers,
+)
+from tests.utils.distribution import make_distribution, make_reviewer
+
+
+def make_load(assigned: int, min_: int = 0, desired: int = 10, max_: int = 20):
+    return ReviewerLoad(
+        reviewer_id=1,
+        name="Reviewer",
+        min_=min_,
+        desired=desired,
+        max_=max_,
+        assigned=assigned,
+    )
+
+
+def test_simulate__reports_stages_and_allocation():
+    reviewers = [make_reviewer(1, 0, 10, 10), make_reviewer(2, 0, 10, 10)]
+    result = simulate(synthetic_homeworks(25), reviewers, seed=1)
+    assert [stage.name for stage in result.stages] == [
+        "shuffle",
+        "premium",
+        "rechecks",
+        "main",
+    ]
+    assert [load.assigned for load in result.loads] == [10, 10]
+    assert result.overflow == 5
+    assert result.fairness.jain_index == pytest.approx(1.0)
+    assert result.seed == 1
+
+
+def test_simulate__does_not_touch_inputs():
+    reviewers = [make_reviewer(1, 0, 10, 10)]
+    homeworks = synthetic_homeworks(5)
+    simulate(homeworks, reviewers)
+    assert reviewers[0].student_homeworks == []
+    assert len(homeworks) == 5
+
+
+def test_simulate__seed_is_reproducible():
+    rnd = random.Random(0)
+    homeworks = synthetic_homeworks(300)
+    reviewers = synthetic_reviewers(7, 300, rnd)
+    first = simulate(homeworks, reviewers, seed=42)
+    second = simulate(homeworks, reviewers, seed=42)
+    assert first.loads == second.loads
+
+
+def test_recorded_inputs__replays_saved_distribution():
+    distribution = make_distribution(
+        30,
+        [make_reviewer(1, 0, 10, 10), make_reviewer(2, 0, 10, 10)],
+        seed=3,
+    )
+    distribution.distribute()
+    homeworks, reviewers = recorded_inputs(distribution.dump())
+    assert len(homeworks) == 30
+    assert all(not r.student_homeworks for r in reviewers)
+
+    result = simulate(homeworks, reviewers, seed=3)
+    assert [load.assigned for load in result.loads] == [10, 10]
+    assert result.overflow == 10
+
+
+def test_fairness__uneven_loads():
+    stats = fairness([make_load(10), make_load(0, min_=2), make_load(25)])
+    assert stats.jain_index == pytest.approx(3.5**2 / (3 * 7.25))
+    assert stats.min_ratio == 0.0
+    assert stats.max_ratio == 2.5
+    assert stats.below_min == 1
+    assert stats.above_max == 1
+
+
+def test_fairness__empty():
+    stats = fairness([])
+    assert stats.jain_index == 1.0
+    assert stats.ratio_stdev == 0.0
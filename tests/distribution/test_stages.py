@@ -0,0 +1,58 @@
+import pytest
+
+from lms.generals.enums import StageStatus
+from lms.utils.stages import Stage, StageTracker
+
+
+async def test_stage__done():
+    tracker = StageTracker()
+    async with tracker.stage("fetch"):
+        pass
+    assert [stage.name for stage in tracker.stages] == ["fetch"]
+    assert tracker.stages[0].status == StageStatus.DONE
+    assert tracker.stages[0].finished_at is not None
+    assert tracker.stages[0].duration is not None
+
+
+async def test_stage__failed():
+    tracker = StageTracker()
+    with pytest.raises(ValueError):
+        async with tracker.stage("fetch"):
+            raise ValueError
+    assert tracker.stages[0].status == StageStatus.FAILED
+
+
+async def test_stage__notifies_on_start_and_finish():
+    snapshots: list[list[StageStatus]] = []
+
+    async def on_change(stages: list[Stage]) -> None:
+        snapshots.append([stage.status for stage in stages])
+
+    tracker = StageTracker(on_change=on_change)
+    async with tracker.stage("first"):
+        pass
+    async with tracker.stage("second"):
+        pass
+    assert snapshots == [
+        [StageStatus.RUNNING],
+        [StageStatus.DONE],
+        [StageStatus.DONE, StageStatus.RUNNING],
+        [StageStatus.DONE, StageStatus.DONE],
+    ]
+
+
+async def test_stage__callback_error_is_ignored():
+    async def on_change(stages: list[Stage]) -> None:
+        raise RuntimeError
+
+    tracker = StageTracker(on_change=on_change)
+    async with tracker.stage("fetch"):
+        pass
+    assert tracker.stages[0].status == StageStatus.DONE
+
+
+def test_measure__durations():
+    tracker = StageTracker()
+    with tracker.measure("allocate"):
+        pass
+    assert list(tracker.durations()) == ["allocate"]
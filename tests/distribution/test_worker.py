@@ -0,0 +1,41 @@
+from lms.adapters.db.uow import UnitOfWork
+from lms.generals.enums import DistributionJobStatus, StageStatus
+from lms.generals.models.distribution import DistributionParams
+from lms.presentation.worker.service import DistributionWorker
+from tests.utils.srvmocker.models import MockService
+from tests.utils.srvmocker.responses import JsonResponse
+
+
+async def test_execute__failed_job_keeps_stages(
+    uow: UnitOfWork,
+    distribution_worker: DistributionWorker,
+    soho_service: MockService,
+    create_product,
+):
+    product = await create_product()
+    soho_service.register("homeworks", JsonResponse({"homeworks": []}))
+    soho_service.register(
+        "client_list", JsonResponse({"clients": [], "limit": 100, "offset": 0})
+    )
+    params = DistributionParams(
+        name="Distribution",
+        product_ids=[product.id],
+        homeworks=[{"homework_id": 1, "filters": []}],
+    )
+    async with uow.start():
+        job = await uow.distribution_job.create(product.subject_id, params)
+        await uow.commit()
+
+    claimed = await distribution_worker._claim()
+    assert claimed is not None
+    await distribution_worker._execute(claimed)
+
+    async with uow.start():
+        result = await uow.distribution_job.read_by_id(job.id)
+
+    assert result.status == DistributionJobStatus.FAILED
+    assert result.error
+    assert result.finished_at is not None
+    assert result.stages[0].name == "fetch_homeworks"
+    assert result.stages[0].status == StageStatus.DONE
+    assert result.stages[-1].status == StageStatus.FAILED
@@ -0,0 +1,167 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from lms.adapters.db.identity_map import IdentityMap
+from lms.adapters.db.models import TeacherAssignment
+from lms.exceptions import IdempotencyKeyReusedError
+from lms.generals.enums import TeacherType
+from lms.generals.models.offer import Offer
+from lms.generals.models.product import Product
+from lms.generals.models.student import NewStudent
+from lms.logic.enroll_student import Enroller
+from tests.utils.database import count_queries
+
+# student, student insert, soho insert, offer with product and subject,
+# student_product, flow, teacher product reservation, student_product insert,
+# teacher_assignment insert, teacher_product_stats upsert, active_students update,
+# outbox insert
+ENROLL_QUERIES = 12
+
+
+def make_new_student(vk_id: int = 101) -> NewStudent:
+    return NewStudent(
+        vk_id=vk_id,
+        soho_id=vk_id,
+        email=f"student{vk_id}@example.com",
+        first_name="First",
+        last_name="Last",
+        flow_id=1,
+    )
+
+
+def test_identity_map_keys_by_type_and_id():
+    identity_map = IdentityMap()
+    now = datetime.now()
+    offer = Offer(
+        id=1,
+        product_id=1,
+        name="Offer",
+        cohort=1,
+        teacher_type=None,
+        created_at=now,
+        updated_at=now,
+    )
+    assert identity_map.add(offer) is offer
+    assert identity_map.get(Offer, 1) is offer
+    assert identity_map.get(Product, 1) is None
+    identity_map.discard(Offer, 1)
+    assert identity_map.get(Offer, 1) is None
+
+
+async def test_enroll_student_query_count(
+    enroller: Enroller,
+    engine: AsyncEngine,
+    create_offer,
+    create_product,
+    create_teacher_product,
+):
+    product = await create_product()
+    offer = await create_offer(product=product, teacher_type=TeacherType.CURATOR)
+    teacher_product = await create_teacher_product(
+        product=product, type=TeacherType.CURATOR
+    )
+
+    async with enroller.uow.start():
+        with count_queries(engine) as statements:
+            student_product = await enroller.enroll_student(
+                new_student=make_new_student(),
+                offer_ids=[offer.id],
+            )
+        await enroller.uow.commit()
+
+    assert student_product.teacher_product_id == teacher_product.id
+    assert len(statements) == ENROLL_QUERIES, statements
+
+    async with enroller.uow.start():
+        teacher_product = await enroller.uow.teacher_product.read_by_id(
+            teacher_product.id
+        )
+    assert teacher_product.active_students == 1
+
+
+async def test_enroll_student_serves_repeated_reads_from_memory(
+    enroller: Enroller,
+    engine: AsyncEngine,
+    create_offer,
+    create_product,
+    create_teacher_product,
+):
+    product = await create_product()
+    offer = await create_offer(product=product, teacher_type=TeacherType.CURATOR)
+    teacher_product = await create_teacher_product(
+        product=product, type=TeacherType.CURATOR
+    )
+
+    async with enroller.uow.start():
+        await enroller.enroll_student(
+            new_student=make_new_student(),
+            offer_ids=[offer.id],
+        )
+        with count_queries(engine) as statements:
+            await enroller.uow.offer.read_by_id(offer.id)
+            await enroller.uow.subject.find_by_product(product.id)
+            await enroller.uow.teacher_product.read_by_id(teacher_product.id)
+            await enroller.uow.teacher.find_teacher_by_teacher_product(
+                teacher_product.id
+            )
+
+    assert statements == []
+
+
+async def test_enroll_student_once_returns_stored_response(
+    enroller: Enroller,
+    engine: AsyncEngine,
+    session: AsyncSession,
+    create_offer,
+    create_product,
+    create_teacher_product,
+):
+    product = await create_product()
+    offer = await create_offer(product=product, teacher_type=TeacherType.CURATOR)
+    await create_teacher_product(product=product, type=TeacherType.CURATOR)
+
+    results = []
+    for _ in range(2):
+        async with enroller.uow.start():
+            with count_queries(engine) as statements:
+                results.append(
+                    await enroller.enroll_student_once(
+                        idempotency_key="key",
+                        request_hash="hash",
+                        new_student=make_new_student(),
+                        offer_ids=[offer.id],
+                    )
+                )
+            await enroller.uow.commit()
+
+    assert results[0] == results[1]
+    # claim and read of the stored response
+    assert len(statements) == 2, statements
+    assert await session.scalar(select(func.count(TeacherAssignment.id))) == 1
+
+
+async def test_enroll_student_once_rejects_other_request(
+    enroller: Enroller,
+    create_offer,
+):
+    offer = await create_offer(teacher_type=None)
+    async with enroller.uow.start():
+        await enroller.enroll_student_once(
+            idempotency_key="key",
+            request_hash="hash",
+            new_student=make_new_student(),
+            offer_ids=[offer.id],
+        )
+        await enroller.uow.commit()
+
+    async with enroller.uow.start():
+        with pytest.raises(IdempotencyKeyReusedError):
+            await enroller.enroll_student_once(
+                idempotency_key="key",
+                request_hash="other",
+                new_student=make_new_student(102),
+                offer_ids=[offer.id],
+            )
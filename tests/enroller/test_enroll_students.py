@@ -0,0 +1,185 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lms.adapters.db.models import (
+    OutboxMessage,
+    SohoAccount,
+    StudentProduct,
+    TeacherAssignment,
+)
+from lms.generals.enums import OutboxMessageKind, TeacherType
+from lms.generals.models.student import NewEnrollment, NewStudent
+from lms.generals.models.teacher_product import EnrollCandidate
+from lms.logic.enroll_student import Enroller, pick_teacher_product
+
+
+def make_new_enrollment(vk_id: int, offer_id: int) -> NewEnrollment:
+    return NewEnrollment(
+        student=NewStudent(
+            vk_id=vk_id,
+            soho_id=vk_id,
+            email=f"student{vk_id}@example.com",
+            first_name="First",
+            last_name="Last",
+            flow_id=1,
+        ),
+        offer_id=offer_id,
+    )
+
+
+def make_candidate(id_: int, **kwargs) -> EnrollCandidate:
+    values = {
+        "id": id_,
+        "teacher_id": id_,
+        "product_id": 1,
+        "type": TeacherType.CURATOR,
+        "max_students": 10,
+        "average_grade": 5.0,
+        "actual_students": 0,
+        "total_students": 0,
+        "removal_students": 0,
+        "flow_ids": frozenset(),
+        "teacher_vk_id": id_,
+        "teacher_name": "First Last",
+    }
+    values.update(kwargs)
+    return EnrollCandidate(**values)
+
+
+def test_rating_coef_matches_teacher_product_formula():
+    candidate = make_candidate(
+        1,
+        average_grade=4.0,
+        actual_students=5,
+        total_students=10,
+        removal_students=2,
+    )
+    assert candidate.rating_coef == 4.0 * (1 - 5 / 10) * (8 / 10)
+
+
+def test_rating_coef_of_ungraded_teacher():
+    assert make_candidate(1, average_grade=0).rating_coef == 5.0
+
+
+def test_pick_teacher_product_prefers_flow():
+    best = make_candidate(1)
+    in_flow = make_candidate(2, actual_students=9, flow_ids=frozenset({7}))
+    picked = pick_teacher_product([best, in_flow], TeacherType.CURATOR, flow_id=7)
+    assert picked is in_flow
+
+
+def test_pick_teacher_product_falls_back_without_flow():
+    best = make_candidate(1)
+    other = make_candidate(2, actual_students=9, flow_ids=frozenset({7}))
+    picked = pick_teacher_product([best, other], TeacherType.CURATOR, flow_id=8)
+    assert picked is best
+
+
+def test_pick_teacher_product_filters_type():
+    mentor = make_candidate(1, type=TeacherType.MENTOR)
+    assert pick_teacher_product([mentor], TeacherType.CURATOR, flow_id=None) is None
+
+
+def test_assign_spreads_students():
+    first, second = make_candidate(1), make_candidate(2)
+    picked = []
+    for _ in range(4):
+        candidate = pick_teacher_product([first, second], TeacherType.CURATOR, None)
+        assert candidate is not None
+        candidate.assign()
+        picked.append(candidate.id)
+    assert sorted(picked) == [1, 1, 2, 2]
+
+
+async def test_enroll_students_inserts_batch(
+    enroller: Enroller,
+    session: AsyncSession,
+    create_offer,
+    create_product,
+    create_teacher_product,
+):
+    product = await create_product()
+    offer = await create_offer(product=product, teacher_type=TeacherType.CURATOR)
+    first = await create_teacher_product(product=product, type=TeacherType.CURATOR)
+    second = await create_teacher_product(product=product, type=TeacherType.CURATOR)
+
+    async with enroller.uow.start():
+        results = await enroller.enroll_students(
+            [make_new_enrollment(vk_id, offer.id) for vk_id in (101, 102, 103, 104)]
+        )
+        await enroller.uow.commit()
+
+    assert [r.error for r in results] == [None] * 4
+    assert [r.vk_id for r in results] == [101, 102, 103, 104]
+    teacher_product_ids = [r.student_product.teacher_product_id for r in results]
+    assert sorted(teacher_product_ids) == sorted([first.id, second.id] * 2)
+
+    assignments = await session.scalar(select(func.count(TeacherAssignment.id)))
+    soho_accounts = await session.scalar(select(func.count(SohoAccount.id)))
+    assert assignments == 4
+    assert soho_accounts == 4
+
+    messages = (await session.scalars(select(OutboxMessage))).all()
+    assert [m.kind for m in messages] == [OutboxMessageKind.SEND_TEACHER] * 4
+    assert sorted(m.payload["student_vk_id"] for m in messages) == [101, 102, 103, 104]
+
+
+async def test_enroll_students_reports_missing_offer(
+    enroller: Enroller,
+    create_offer,
+):
+    offer = await create_offer(teacher_type=None)
+
+    async with enroller.uow.start():
+        results = await enroller.enroll_students(
+            [make_new_enrollment(101, offer.id), make_new_enrollment(102, 999)]
+        )
+        await enroller.uow.commit()
+
+    assert results[0].error is None
+    assert results[0].student_product.teacher_product_id is None
+    assert results[1].error == "Offer not found"
+    assert results[1].student_product is None
+
+
+async def test_enroll_students_reports_missing_teacher_product(
+    enroller: Enroller,
+    session: AsyncSession,
+    create_offer,
+):
+    offer = await create_offer(teacher_type=TeacherType.MENTOR)
+
+    async with enroller.uow.start():
+        results = await enroller.enroll_students([make_new_enrollment(101, offer.id)])
+        await enroller.uow.commit()
+
+    assert results[0].error == "TeacherProduct not found"
+    assert await session.scalar(select(func.count(StudentProduct.id))) == 0
+
+
+async def test_enroll_students_enrolls_again(
+    enroller: Enroller,
+    session: AsyncSession,
+    create_offer,
+    create_student_product,
+):
+    student_product = await create_student_product(
+        teacher_product=None,
+        teacher_type=None,
+        expulsion_at=datetime.now(),
+    )
+    offer = await create_offer(product=student_product.product, teacher_type=None)
+
+    async with enroller.uow.start():
+        results = await enroller.enroll_students(
+            [make_new_enrollment(student_product.student.vk_id, offer.id)]
+        )
+        await enroller.uow.commit()
+
+    assert results[0].error is None
+    assert results[0].student_product.id == student_product.id
+    await session.refresh(student_product)
+    assert student_product.expulsion_at is None
+    assert student_product.offer_id == offer.id
@@ -0,0 +1,130 @@
+import pytest
+
+from lms.adapters.db.cache import CacheScope, EntityCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Loader:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        return self.calls
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def cache(clock: Clock) -> EntityCache:
+    cache = EntityCache(ttl=10, max_size=2, clock=clock)
+    cache.enabled = True
+    return cache
+
+
+async def test_read_through__caches_value(cache: EntityCache):
+    scope, load = CacheScope(cache), Loader()
+    assert await scope.read_through("offer", ["offer"], 1, load) == 1
+    assert await scope.read_through("offer", ["offer"], 1, load) == 1
+    assert load.calls == 1
+    assert cache.stats() == {"offer": {"hits": 1, "misses": 1, "size": 1}}
+
+
+async def test_read_through__expires(cache: EntityCache, clock: Clock):
+    scope, load = CacheScope(cache), Loader()
+    await scope.read_through("offer", ["offer"], 1, load)
+    clock.now = 10
+    assert await scope.read_through("offer", ["offer"], 1, load) == 2
+
+
+async def test_read_through__evicts_least_recently_used(cache: EntityCache):
+    scope, load = CacheScope(cache), Loader()
+    for key in (1, 2, 1, 3):
+        await scope.read_through("offer", ["offer"], key, load)
+    assert load.calls == 3
+    assert await scope.read_through("offer", ["offer"], 1, load) == 1
+    assert await scope.read_through("offer", ["offer"], 2, load) == 4
+
+
+async def test_read_through__disabled(cache: EntityCache):
+    cache.enabled = False
+    scope, load = CacheScope(cache), Loader()
+    await scope.read_through("offer", ["offer"], 1, load)
+    await scope.read_through("offer", ["offer"], 1, load)
+    assert load.calls == 2
+
+
+async def test_invalidate__drops_dependent_regions(cache: EntityCache):
+    scope, load = CacheScope(cache), Loader()
+    await scope.read_through("offer", ["offer"], 1, load)
+    await scope.read_through("subject", ["product", "subject"], 1, load)
+    cache.invalidate("product")
+    assert await scope.read_through("offer", ["offer"], 1, load) == 1
+    assert await scope.read_through("subject", ["product", "subject"], 1, load) == 3
+
+
+async def test_invalidate__during_load_is_not_cached(cache: EntityCache):
+    scope = CacheScope(cache)
+
+    async def load() -> str:
+        cache.invalidate("setting")
+        return "stale"
+
+    await scope.read_through("setting", ["setting"], "key", load)
+    assert cache.stats()["setting"]["size"] == 0
+
+
+async def test_scope__written_tables_bypass_cache_until_commit(cache: EntityCache):
+    other, load = CacheScope(cache), Loader()
+    await other.read_through("setting", ["setting"], "key", load)
+
+    scope = CacheScope(cache)
+    scope.written("setting")
+    assert await scope.read_through("setting", ["setting"], "key", load) == 2
+    assert await other.read_through("setting", ["setting"], "key", load) == 1
+
+    scope.commit()
+    assert await other.read_through("setting", ["setting"], "key", load) == 3
+
+
+async def test_scope__rollback_keeps_cache(cache: EntityCache):
+    other, load = CacheScope(cache), Loader()
+    await other.read_through("setting", ["setting"], "key", load)
+
+    scope = CacheScope(cache)
+    scope.written("setting")
+    scope.rollback()
+    assert await scope.read_through("setting", ["setting"], "key", load) == 1
+
+
+async def test_scope__rollback_drops_filled_regions(cache: EntityCache):
+    scope, load = CacheScope(cache), Loader()
+    await scope.read_through("offer", ["offer"], 1, load)
+    await scope.read_through("setting", ["setting"], "key", load)
+    scope.rollback()
+    assert cache.stats()["offer"]["size"] == 0
+    assert cache.stats()["setting"]["size"] == 0
+
+
+async def test_read_through__hands_out_copies(cache: EntityCache):
+    scope = CacheScope(cache)
+
+    async def load() -> dict[str, list[str]]:
+        return {"folder_ids": ["a"]}
+
+    loaded = await scope.read_through("subject", ["subject"], 1, load)
+    loaded["folder_ids"].append("b")
+    cached = await scope.read_through("subject", ["subject"], 1, load)
+    cached["folder_ids"].append("c")
+    again = await scope.read_through("subject", ["subject"], 1, load)
+    assert again == {"folder_ids": ["a"]}
@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock
+
+import orjson
+import pytest
+from googleapiclient.http import HttpMock
+
+from lms.adapters.google.sheets import (
+    batch_update_encoded,
+    cell_data,
+    encode_requests,
+    update_cells_request,
+)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (None, {}),
+        ("", {}),
+        (5, {"userEnteredValue": {"numberValue": 5}}),
+        ("12345", {"userEnteredValue": {"numberValue": 12345}}),
+        ("=A1", {"userEnteredValue": {"formulaValue": "=A1"}}),
+        ("Name", {"userEnteredValue": {"stringValue": "Name"}}),
+        (True, {"userEnteredValue": {"boolValue": True}}),
+    ],
+)
+def test_cell_data(value, expected):
+    assert cell_data(value) == expected
+
+
+def test_update_cells_request__transposes_columns():
+    request = update_cells_request(sheet_id=7, columns=[["a", "b"], [], ["c"]])
+    rows = request["updateCells"]["rows"]
+    assert [[cell.get("userEnteredValue") for cell in r["values"]] for r in rows] == [
+        [{"stringValue": "a"}, None, {"stringValue": "c"}],
+        [{"stringValue": "b"}, None, None],
+    ]
+
+
+def test_batch_update_encoded__sends_body_as_is():
+    http = HttpMock(headers={"status": "200"})
+    google_sheets = MagicMock()
+    batch_update = google_sheets.service.spreadsheets.return_value.batchUpdate
+    template = batch_update.return_value
+    template.http = http
+    template.postproc = lambda response, content: content
+    template.uri = "https://sheets.googleapis.com/v4/spreadsheets/1:batchUpdate"
+    template.method = "POST"
+    template.headers = {"content-type": "application/json", "content-length": "2"}
+    template.methodId = "sheets.spreadsheets.batchUpdate"
+    body = encode_requests([{"deleteSheet": {"sheetId": 1}}])
+
+    batch_update_encoded(
+        google_sheets=google_sheets,
+        spreadsheet_id="1",
+        body=body,
+    )
+
+    batch_update.assert_called_once_with(spreadsheetId="1", body={})
+    template.execute.assert_not_called()
+    assert http.uri == template.uri
+    assert http.method == "POST"
+    assert http.body == body
+    assert http.headers["content-type"] == "application/json"
+    assert http.headers["content-length"] == str(len(body))
+    assert orjson.loads(http.body) == {"requests": [{"deleteSheet": {"sheetId": 1}}]}
@@ -0,0 +1,107 @@
+import json
+import math
+import statistics
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+# Slowdown allowed against the baseline before a run is reported as a
+# regression, runs on a shared machine are noisy
+TOLERANCE = 0.25
+
+
+@dataclass(frozen=True, slots=True)
+class LoadReport:
+    requests: int
+    concurrency: int
+    errors: int
+    p50: float
+    p95: float
+    p99: float
+    throughput: float
+    queries_per_request: float
+    # Worst spread of students over the teacher products of one product,
+    # 0 is a perfect balance
+    balance_skew: float
+
+    def format(self) -> str:
+        return (
+            f"requests={self.requests} concurrency={self.concurrency} "
+            f"errors={self.errors}\n"
+            f"latency p50={self.p50 * 1000:.1f}ms p95={self.p95 * 1000:.1f}ms "
+            f"p99={self.p99 * 1000:.1f}ms\n"
+            f"throughput={self.throughput:.1f} rps "
+            f"queries/request={self.queries_per_request:.1f} "
+            f"balance skew={self.balance_skew:.3f}"
+        )
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+def balance_skew(students: Sequence[int]) -> float:
+    mean = statistics.fmean(students)
+    if not mean:
+        return 0.0
+    return (max(students) - min(students)) / mean
+
+
+def make_report(
+    latencies: Sequence[float],
+    elapsed: float,
+    concurrency: int,
+    errors: int,
+    queries: int,
+    students_by_product: Iterable[Sequence[int]],
+) -> LoadReport:
+    return LoadReport(
+        requests=len(latencies),
+        concurrency=concurrency,
+        errors=errors,
+        p50=percentile(latencies, 50),
+        p95=percentile(latencies, 95),
+        p99=percentile(latencies, 99),
+        throughput=len(latencies) / elapsed,
+        queries_per_request=queries / len(latencies),
+        balance_skew=max(map(balance_skew, students_by_product)),
+    )
+
+
+def load_baseline(path: Path) -> LoadReport | None:
+    if not path.exists():
+        return None
+    return LoadReport(**json.loads(path.read_text()))
+
+
+def save_baseline(path: Path, report: LoadReport) -> None:
+    path.write_text(json.dumps(asdict(report), indent=2) + "\n")
+
+
+def compare(report: LoadReport, baseline: LoadReport) -> list[str]:
+    regressions = []
+    for name in ("p50", "p95", "p99"):
+        current, base = getattr(report, name), getattr(baseline, name)
+        if current > base * (1 + TOLERANCE):
+            regressions.append(
+                f"{name} {current * 1000:.1f}ms > baseline {base * 1000:.1f}ms"
+            )
+    if report.throughput < baseline.throughput * (1 - TOLERANCE):
+        regressions.append(
+            f"throughput {report.throughput:.1f} rps "
+            f"< baseline {baseline.throughput:.1f} rps"
+        )
+    # Query counts are deterministic, any growth is a regression
+    if report.queries_per_request > baseline.queries_per_request + 0.5:
+        regressions.append(
+            f"queries/request {report.queries_per_request:.1f} "
+            f"> baseline {baseline.queries_per_request:.1f}"
+        )
+    if report.balance_skew > baseline.balance_skew + 0.1:
+        regressions.append(
+            f"balance skew {report.balance_skew:.3f} "
+            f"> baseline {baseline.balance_skew:.3f}"
+        )
+    return regressions
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import defaultdict
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+
+import pytest
+from aiohttp.test_utils import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from lms.adapters.db.cache import EntityCache
+from lms.adapters.db.models import TeacherProduct
+from lms.generals.enums import TeacherType
+from tests.load.report import compare, load_baseline, make_report, save_baseline
+from tests.utils.database import count_queries
+
+log = logging.getLogger(__name__)
+
+# Needs a local Postgres and takes a while, run with make load
+pytestmark = pytest.mark.skipif(
+    not os.getenv("APP_LOAD_TEST"),
+    reason="set APP_LOAD_TEST=1 to run load tests",
+)
+
+REQUESTS = int(os.getenv("APP_LOAD_TEST_REQUESTS", "500"))
+CONCURRENCY = int(os.getenv("APP_LOAD_TEST_CONCURRENCY", "20"))
+BASELINE = Path(
+    os.getenv("APP_LOAD_TEST_BASELINE", Path(__file__).parent / "baseline.json")
+)
+UPDATE_BASELINE = bool(os.getenv("APP_LOAD_TEST_UPDATE_BASELINE"))
+
+PRODUCTS = 4
+TEACHERS_PER_PRODUCT = 25
+# Share of requests repeating an earlier payload, as Soho does on timeouts
+RETRY_RATIO = 0.05
+
+API_URL = "/v1/students/"
+
+
+@pytest.fixture
+def entity_cache() -> EntityCache:
+    # Served as in production. Nothing writes the cached reference tables
+    # during the run, so the NOTIFY listener is not needed to keep it fresh
+    cache = EntityCache(ttl=60, max_size=1000)
+    cache.enabled = True
+    return cache
+
+
+async def seed(create_product, create_offer, create_teacher_product) -> list[int]:
+    max_students = REQUESTS // TEACHERS_PER_PRODUCT + 1
+    offer_ids = []
+    for _ in range(PRODUCTS):
+        product = await create_product()
+        offer = await create_offer(product=product, teacher_type=TeacherType.CURATOR)
+        for _ in range(TEACHERS_PER_PRODUCT):
+            await create_teacher_product(
+                product=product,
+                type=TeacherType.CURATOR,
+                max_students=max_students,
+            )
+        offer_ids.append(offer.id)
+    return offer_ids
+
+
+def make_payloads(offer_ids: list[int], rnd: random.Random) -> list[dict[str, Any]]:
+    payloads: list[dict[str, Any]] = []
+    for vk_id in range(1, REQUESTS + 1):
+        if payloads and rnd.random() < RETRY_RATIO:
+            payloads.append(rnd.choice(payloads))
+            continue
+        offer_id = rnd.choice(offer_ids)
+        payloads.append(
+            {
+                "student": {
+                    "first_name": "First",
+                    "last_name": "Last",
+                    "raw_soho_flow_id": f"{offer_id}:1",
+                    "vk_id": vk_id,
+                    "soho_id": vk_id,
+                    "email": f"student{vk_id}@example.com",
+                },
+                "offer_ids": [offer_id],
+            }
+        )
+    return payloads
+
+
+async def test_enroll_student_load(
+    api_client: TestClient,
+    token: str,
+    engine: AsyncEngine,
+    session: AsyncSession,
+    create_product,
+    create_offer,
+    create_teacher_product,
+):
+    offer_ids = await seed(create_product, create_offer, create_teacher_product)
+    payloads = make_payloads(offer_ids, random.Random(0))
+
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies: list[float] = []
+    errors = 0
+
+    async def enroll(payload: dict[str, Any]) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await api_client.post(
+                API_URL, params={"token": token}, json=payload
+            )
+            await response.read()
+            latencies.append(time.perf_counter() - started)
+            if response.status != HTTPStatus.OK:
+                errors += 1
+
+    with count_queries(engine) as statements:
+        started = time.perf_counter()
+        await asyncio.gather(*(enroll(payload) for payload in payloads))
+        elapsed = time.perf_counter() - started
+
+    students_by_product = defaultdict(list)
+    rows = await session.execute(
+        select(TeacherProduct.product_id, TeacherProduct.active_students)
+    )
+    for product_id, active_students in rows:
+        students_by_product[product_id].append(active_students)
+    report = make_report(
+        latencies=latencies,
+        elapsed=elapsed,
+        concurrency=CONCURRENCY,
+        errors=errors,
+        queries=len(statements),
+        students_by_product=students_by_product.values(),
+    )
+    log.info("enrollment load:\n%s", report.format())
+
+    assert report.errors == 0
+    baseline = load_baseline(BASELINE)
+    if baseline is None or UPDATE_BASELINE:
+        save_baseline(BASELINE, report)
+        return
+    log.info("baseline:\n%s", baseline.format())
+    regressions = compare(report, baseline)
+    assert not regressions, regressions
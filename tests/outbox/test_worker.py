@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lms.adapters.db.models import OutboxMessage
+from lms.adapters.db.uow import UnitOfWork
+from lms.adapters.telegram.alerts import AlertAggregator
+from lms.generals.enums import OutboxMessageStatus, TeacherType
+from lms.generals.models.outbox import SendTeacherPayload, TeacherOverflowPayload
+from lms.presentation.worker.service import OutboxWorker
+from tests.utils.srvmocker.models import MockService
+from tests.utils.srvmocker.responses import JsonResponse
+
+OVERFLOW = TeacherOverflowPayload(
+    teacher_product_id=1,
+    name="First Last",
+    max_students=1,
+    vk_id=1,
+    product_id=1,
+)
+SEND_TEACHER = SendTeacherPayload(
+    target_path="enroll",
+    student_vk_id=1,
+    teacher_vk_id=2,
+    teacher_type=TeacherType.CURATOR,
+)
+
+
+async def read_message(session: AsyncSession) -> OutboxMessage:
+    return (await session.scalars(select(OutboxMessage))).one()
+
+
+async def test_deliver_batch__sent(
+    uow: UnitOfWork,
+    session: AsyncSession,
+    outbox_worker: OutboxWorker,
+    alerts: AlertAggregator,
+    telegram_service: MockService,
+):
+    telegram_service.register(
+        "send_message",
+        JsonResponse(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": 1,
+                    "from": {
+                        "id": 1,
+                        "is_bot": True,
+                        "first_name": "Bot",
+                        "username": "bot",
+                    },
+                    "chat": {"id": 0, "username": "chat", "type": "private"},
+                    "date": 0,
+                    "text": "text",
+                },
+            }
+        ),
+    )
+    async with uow.start():
+        await uow.outbox.add([OVERFLOW])
+        await uow.commit()
+
+    assert await outbox_worker.deliver_batch() == 1
+    assert await outbox_worker.deliver_batch() == 0
+
+    # Claimed until its digest is sent
+    message = await read_message(session)
+    assert message.status == OutboxMessageStatus.PENDING
+    assert len(telegram_service.history) == 0
+
+    await alerts.flush()
+    await asyncio.gather(*outbox_worker._deferred)
+    assert len(telegram_service.history) == 1
+
+    await session.refresh(message)
+    assert message.status == OutboxMessageStatus.SENT
+    assert message.sent_at is not None
+
+
+async def test_deliver_batch__failed_digest_is_retried_later(
+    uow: UnitOfWork,
+    session: AsyncSession,
+    outbox_worker: OutboxWorker,
+    alerts: AlertAggregator,
+):
+    async with uow.start():
+        await uow.outbox.add([OVERFLOW])
+        await uow.commit()
+
+    assert await outbox_worker.deliver_batch() == 1
+    await alerts.flush()
+    await asyncio.gather(*outbox_worker._deferred)
+
+    message = await read_message(session)
+    assert message.status == OutboxMessageStatus.PENDING
+    assert message.attempts == 1
+    assert message.error
+    assert message.available_at > datetime.now()
+
+
+async def test_deliver_batch__failed_message_is_retried_later(
+    uow: UnitOfWork,
+    session: AsyncSession,
+    outbox_worker: OutboxWorker,
+):
+    async with uow.start():
+        await uow.outbox.add([SEND_TEACHER])
+        await uow.commit()
+
+    assert await outbox_worker.deliver_batch() == 1
+    # Not available again until the retry pause has passed
+    assert await outbox_worker.deliver_batch() == 0
+
+    message = await read_message(session)
+    assert message.status == OutboxMessageStatus.PENDING
+    assert message.attempts == 1
+    assert message.error
+    assert message.available_at > datetime.now()
+
+
+async def test_deliver_batch__gives_up_after_max_attempts(
+    uow: UnitOfWork,
+    session: AsyncSession,
+    outbox_worker: OutboxWorker,
+):
+    outbox_worker.max_attempts = 1
+    async with uow.start():
+        await uow.outbox.add([SEND_TEACHER])
+        await uow.commit()
+
+    await outbox_worker.deliver_batch()
+
+    message = await read_message(session)
+    assert message.status == OutboxMessageStatus.FAILED
+    assert message.attempts == 1
+
+
+async def test_outbox_rolled_back_with_transaction(
+    uow: UnitOfWork,
+    session: AsyncSession,
+):
+    async with uow.start():
+        await uow.outbox.add([SEND_TEACHER, OVERFLOW])
+        await uow.rollback()
+
+    assert (await session.scalars(select(OutboxMessage))).all() == []
@@ -15,9 +15,10 @@ class OfferFactory(factory.Factory):
         model = Offer
 
     id = factory.Sequence(lambda n: n + 1)
-    name = "Offer-1"
+    name = factory.Sequence(lambda n: f"Offer-{n + 1}")
     cohort = 1
     teacher_type = fuzzy.FuzzyChoice(list(TeacherType) + [None])
+    is_premium = False
 
     product = factory.SubFactory(ProductFactory)
 
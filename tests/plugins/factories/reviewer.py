@@ -19,6 +19,8 @@ class ReviewerFactory(factory.Factory):
     min_ = 5
     abs_max = 30
     is_active = True
+    is_premium = False
+    recheck = False
 
 
 @pytest.fixture
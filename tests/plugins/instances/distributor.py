@@ -1,13 +1,14 @@
 import base64
+from collections.abc import Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
 
 import pytest
 from google_api_service_helper import GoogleDrive, GoogleSheets
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from lms.adapters.db.uow import UnitOfWork
 from lms.adapters.soho.soho import Soho
-from lms.logic.distribute_homeworks import Distributor
 from lms.presentation.rest.config import Config
+from lms.presentation.worker.service import DistributionWorker
 
 
 @pytest.fixture
@@ -46,19 +47,27 @@ def google_drive(config: Config) -> GoogleDrive:
 
 
 @pytest.fixture
-async def get_distributor(
+def process_pool() -> Iterator[Executor]:
+    # Threads are enough for tests, pickling is covered in test_offload
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        yield pool
+
+
+@pytest.fixture
+def distribution_worker(
     sessionmaker: async_sessionmaker[AsyncSession],
     soho: Soho,
     google_drive: GoogleDrive,
     google_sheets: GoogleSheets,
-):
-    def new_distributor() -> Distributor:
-        uow = UnitOfWork(sessionmaker=sessionmaker)
-        return Distributor(
-            uow=uow,
-            google_drive=google_drive,
-            google_sheets=google_sheets,
-            soho=soho,
-        )
-
-    return new_distributor
+    process_pool: Executor,
+) -> DistributionWorker:
+    return DistributionWorker(
+        concurrency=1,
+        poll_interval=0.1,
+        stale_timeout=60,
+        session_factory=sessionmaker,
+        soho=soho,
+        google_sheets=google_sheets,
+        google_drive=google_drive,
+        process_pool=process_pool,
+    )
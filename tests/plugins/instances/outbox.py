@@ -0,0 +1,40 @@
+from collections.abc import AsyncGenerator
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from lms.adapters.autopilot.client import Autopilot
+from lms.adapters.telegram.alerts import AlertAggregator
+from lms.adapters.telegram.telegram import Telegram
+from lms.presentation.worker.service import OutboxWorker
+
+
+@pytest.fixture
+async def alerts(telegram: Telegram) -> AsyncGenerator[AlertAggregator, None]:
+    async with AlertAggregator(
+        telegram=telegram,
+        window=60,
+        rate_limit=10,
+        burst=1,
+    ) as alerts:
+        yield alerts
+
+
+@pytest.fixture
+def outbox_worker(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    autopilot: Autopilot,
+    alerts: AlertAggregator,
+) -> OutboxWorker:
+    return OutboxWorker(
+        batch_size=10,
+        concurrency=2,
+        poll_interval=0.1,
+        max_attempts=3,
+        retry_pause=1,
+        lease_timeout=60,
+        retention=60,
+        session_factory=sessionmaker,
+        autopilot=autopilot,
+        alerts=alerts,
+    )
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from yarl import URL
 
 from lms.adapters.autopilot.client import Autopilot
+from lms.adapters.db.cache import EntityCache
 from lms.adapters.db.uow import UnitOfWork
 from lms.adapters.soho.soho import Soho
 from lms.adapters.telegram.telegram import Telegram
@@ -26,16 +27,14 @@ def rest_port(aiomisc_unused_port_factory) -> int:
 
 
 @pytest.fixture
-def enroller(
-    sessionmaker: async_sessionmaker[AsyncSession],
-    autopilot: Autopilot,
-    telegram: Telegram,
-) -> Enroller:
-    return Enroller(
-        uow=UnitOfWork(sessionmaker=sessionmaker),
-        autopilot=autopilot,
-        telegram=telegram,
-    )
+def entity_cache() -> EntityCache:
+    # Not connected to the notifications, so every read goes to the database
+    return EntityCache(ttl=60, max_size=100)
+
+
+@pytest.fixture
+def enroller(sessionmaker: async_sessionmaker[AsyncSession]) -> Enroller:
+    return Enroller(uow=UnitOfWork(sessionmaker=sessionmaker))
 
 
 @pytest.fixture
@@ -45,9 +44,8 @@ def rest_service(
     autopilot: Autopilot,
     soho: Soho,
     telegram: Telegram,
-    enroller: Enroller,
+    entity_cache: EntityCache,
     sessionmaker: async_sessionmaker[AsyncSession],
-    get_distributor,
 ) -> REST:
     return REST(
         debug=config.app.debug,
@@ -55,6 +53,7 @@ def rest_service(
         description=config.http.description,
         version=config.http.version,
         secret_key=config.security.secret_key,
+        idempotency_ttl=config.http.idempotency_ttl,
         host=config.http.host,
         port=config.http.port,
         engine=engine,
@@ -62,8 +61,7 @@ def rest_service(
         soho=soho,
         telegram=telegram,
         session_factory=sessionmaker,
-        get_distributor=get_distributor,
-        enroller=enroller,
+        entity_cache=entity_cache,
     )
 
 
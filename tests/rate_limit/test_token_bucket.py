@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from lms.utils.rate_limit import TokenBucket
+
+
+async def test_acquire__burst_up_to_capacity():
+    bucket = TokenBucket(rate=1, capacity=3)
+    for _ in range(3):
+        assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+async def test_acquire__waits_for_refill():
+    bucket = TokenBucket(rate=20, capacity=1)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await bucket.acquire()
+    await bucket.acquire()
+    await bucket.acquire()
+    assert loop.time() - started >= 0.09
+
+
+@pytest.mark.parametrize("rate,capacity", [(0, 1), (1, 0)])
+def test_init__invalid(rate: float, capacity: float):
+    with pytest.raises(ValueError):
+        TokenBucket(rate=rate, capacity=capacity)
@@ -0,0 +1,180 @@
+import asyncio
+import json
+from functools import partial
+from http import HTTPStatus
+
+import pytest
+from yarl import URL
+
+from lms.adapters.soho import soho as soho_module
+from lms.adapters.soho.soho import Soho
+from lms.utils.backoff import Backoff
+from lms.utils.http import create_web_session
+from tests.utils.srvmocker.models import MockService
+from tests.utils.srvmocker.responses import (
+    ContentResponse,
+    JsonResponse,
+    LatencyResponse,
+    MockSeqResponse,
+)
+
+
+def homeworks_response(client_homework_id: int) -> JsonResponse:
+    return JsonResponse(
+        {
+            "homeworks": [
+                {
+                    "clientHomeworkId": client_homework_id,
+                    "clientId": 1,
+                    "sentToReviewAt": "2024-01-01T00:00:00",
+                    "chatUrl": "https://example.com/chat",
+                    "vkId": 1,
+                }
+            ]
+        }
+    )
+
+
+@pytest.fixture
+async def fast_soho(soho_url: URL, soho_api_token: str):
+    async with create_web_session() as session:
+        yield Soho(
+            url=soho_url,
+            session=session,
+            auth_token=soho_api_token,
+            client_name="soho",
+            max_concurrency=2,
+            rate_limit=1000,
+            max_tries=3,
+            retry_pause=0,
+        )
+
+
+async def test_homeworks_many__keeps_input_order(
+    fast_soho: Soho,
+    soho_service: MockService,
+):
+    soho_service.register(
+        "homeworks",
+        MockSeqResponse(
+            [
+                LatencyResponse(wrapped=homeworks_response(1), latency=0.1),
+                homeworks_response(2),
+                homeworks_response(3),
+            ]
+        ),
+    )
+    responses = await fast_soho.homeworks_many([10, 20, 30])
+
+    requested = [
+        json.loads(h.body)["homeworkId"] for h in soho_service.history_map["homeworks"]
+    ]
+    served = {hw_id: i for i, hw_id in enumerate(requested, start=1)}
+    assert [r.homeworks[0].student_homework_id for r in responses] == [
+        served[10],
+        served[20],
+        served[30],
+    ]
+
+
+async def test_homeworks_many__deduplicates_ids(
+    fast_soho: Soho,
+    soho_service: MockService,
+):
+    soho_service.register("homeworks", homeworks_response(1))
+    responses = await fast_soho.homeworks_many([10, 10])
+
+    assert len(responses) == 2
+    assert len(soho_service.history_map["homeworks"]) == 1
+
+
+async def test_homeworks_many__retries_failed_request(
+    fast_soho: Soho,
+    soho_service: MockService,
+):
+    soho_service.register(
+        "homeworks",
+        MockSeqResponse(
+            [
+                ContentResponse(status=HTTPStatus.BAD_GATEWAY),
+                homeworks_response(1),
+            ]
+        ),
+    )
+    responses = await fast_soho.homeworks_many([10])
+
+    assert responses[0].homeworks[0].student_homework_id == 1
+    assert len(soho_service.history_map["homeworks"]) == 2
+
+
+async def test_homeworks_many__raises_after_max_tries(
+    fast_soho: Soho,
+    soho_service: MockService,
+):
+    soho_service.register(
+        "homeworks", ContentResponse(status=HTTPStatus.INTERNAL_SERVER_ERROR)
+    )
+    with pytest.raises(Exception):
+        await fast_soho.homeworks_many([10])
+
+    assert len(soho_service.history_map["homeworks"]) == 3
+
+
+async def test_homeworks_many__client_error_is_not_retried(
+    fast_soho: Soho,
+    soho_service: MockService,
+):
+    soho_service.register("homeworks", ContentResponse(status=HTTPStatus.NOT_FOUND))
+    with pytest.raises(Exception):
+        await fast_soho.homeworks_many([10])
+
+    assert len(soho_service.history_map["homeworks"]) == 1
+
+
+async def test_homeworks_many__retries_rate_limited_request(
+    fast_soho: Soho,
+    soho_service: MockService,
+):
+    soho_service.register(
+        "homeworks",
+        MockSeqResponse(
+            [
+                ContentResponse(status=HTTPStatus.TOO_MANY_REQUESTS),
+                homeworks_response(1),
+            ]
+        ),
+    )
+    responses = await fast_soho.homeworks_many([10])
+
+    assert responses[0].homeworks[0].student_homework_id == 1
+    assert len(soho_service.history_map["homeworks"]) == 2
+
+
+async def test_homeworks_many__backs_off_exponentially(
+    soho_url: URL,
+    soho_api_token: str,
+    soho_service: MockService,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    # Without jitter the pauses are 0.05 and 0.1
+    monkeypatch.setattr(soho_module, "Backoff", partial(Backoff, jitter=lambda: 1.0))
+    soho_service.register(
+        "homeworks", ContentResponse(status=HTTPStatus.INTERNAL_SERVER_ERROR)
+    )
+    loop = asyncio.get_running_loop()
+    async with create_web_session() as session:
+        soho = Soho(
+            url=soho_url,
+            session=session,
+            auth_token=soho_api_token,
+            client_name="soho",
+            rate_limit=1000,
+            max_tries=3,
+            retry_pause=0.05,
+        )
+        started = loop.time()
+        with pytest.raises(Exception):
+            await soho.homeworks_many([10])
+
+    assert loop.time() - started >= 0.15
+    assert len(soho_service.history_map["homeworks"]) == 3
@@ -0,0 +1,122 @@
+from dirty_equals import IsListOrTuple
+
+from lms.adapters.db.uow import UnitOfWork
+from lms.adapters.soho.soho import Soho
+from lms.logic.sync_soho_clients import (
+    SOHO_CLIENTS_OFFSET_KEY,
+    SOHO_CLIENTS_REFRESH_OFFSET_KEY,
+    SohoClientSynchronizer,
+)
+from tests.utils.srvmocker.models import MockService
+from tests.utils.srvmocker.responses import JsonResponse, MockSeqResponse
+
+
+def client_page(ids: range, limit: int, offset: int = 0) -> JsonResponse:
+    clients = [
+        {
+            "id": i,
+            "firstName": f"First{i}",
+            "lastName": f"Last{i}",
+            "emails": [f"client{i}@example.com"],
+            "vkId": 1000 + i,
+        }
+        for i in ids
+    ]
+    return JsonResponse({"clients": clients, "limit": limit, "offset": offset})
+
+
+async def test_sync__full(
+    uow: UnitOfWork,
+    soho: Soho,
+    soho_service: MockService,
+):
+    soho_service.register(
+        "client_list",
+        MockSeqResponse(
+            [
+                client_page(range(1, 3), limit=2),
+                client_page(range(3, 4), limit=2, offset=2),
+            ]
+        ),
+    )
+    async with uow.start():
+        synced = await SohoClientSynchronizer(
+            uow=uow, soho=soho, page_size=2, page_pause=0
+        ).sync(full=True)
+        clients = await uow.soho_client.read_by_ids([1, 2, 3])
+        offset = await uow.setting.get(SOHO_CLIENTS_OFFSET_KEY)
+
+    assert synced == 3
+    assert sorted(client.id for client in clients) == [1, 2, 3]
+    assert offset == "3"
+
+
+async def test_sync__incremental_starts_from_watermark(
+    uow: UnitOfWork,
+    soho: Soho,
+    soho_service: MockService,
+):
+    soho_service.register("client_list", client_page(range(3, 5), limit=100))
+    async with uow.start():
+        await uow.setting.set(key=SOHO_CLIENTS_OFFSET_KEY, value="102")
+        await uow.commit()
+        await SohoClientSynchronizer(uow=uow, soho=soho, page_pause=0).sync()
+        offset = await uow.setting.get(SOHO_CLIENTS_OFFSET_KEY)
+
+    assert b'"offset":2' in soho_service.history[0].body
+    assert offset == "4"
+
+
+async def test_sync__incremental_refreshes_existing_clients(
+    uow: UnitOfWork,
+    soho: Soho,
+    soho_service: MockService,
+):
+    renamed = client_page(range(1, 3), limit=2)
+    renamed.body["clients"][0]["firstName"] = "Renamed"
+    soho_service.register(
+        "client_list",
+        MockSeqResponse(
+            [
+                client_page(range(1, 3), limit=2),
+                client_page(range(3, 4), limit=2, offset=2),
+                # Incremental runs: the end of the directory, then one
+                # refresh page, the second one wraps the refresh around
+                client_page(range(3, 4), limit=2, offset=2),
+                renamed,
+                client_page(range(3, 4), limit=2, offset=2),
+                client_page(range(3, 4), limit=2, offset=2),
+            ]
+        ),
+    )
+    synchronizer = SohoClientSynchronizer(
+        uow=uow, soho=soho, page_size=2, page_pause=0, refresh_pages=1
+    )
+    async with uow.start():
+        await synchronizer.sync(full=True)
+        await synchronizer.sync()
+        clients = await uow.soho_client.read_by_ids([1])
+        refresh_offset = await uow.setting.get(SOHO_CLIENTS_REFRESH_OFFSET_KEY)
+        await synchronizer.sync()
+        wrapped_offset = await uow.setting.get(SOHO_CLIENTS_REFRESH_OFFSET_KEY)
+
+    assert clients[0].first_name == "Renamed"
+    assert refresh_offset == "2"
+    assert wrapped_offset == "0"
+
+
+async def test_upsert_many__updates_changed_clients(
+    uow: UnitOfWork,
+    soho: Soho,
+    soho_service: MockService,
+):
+    soho_service.register("client_list", client_page(range(1, 2), limit=100))
+    async with uow.start():
+        await SohoClientSynchronizer(uow=uow, soho=soho).sync(full=True)
+        response = await soho.client_list()
+        renamed = response.clients[0].model_copy(update={"first_name": "Renamed"})
+        await uow.soho_client.upsert_many([renamed])
+        clients = await uow.soho_client.read_by_ids([1])
+
+    assert clients == IsListOrTuple(length=1)
+    assert clients[0].first_name == "Renamed"
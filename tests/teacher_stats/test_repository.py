@@ -0,0 +1,153 @@
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from lms.adapters.db.models import TeacherProduct, TeacherProductStats
+from lms.adapters.db.repositories.teacher_product_stats import (
+    ASSIGNED,
+    REMOVED,
+    StatsChange,
+)
+from lms.adapters.db.uow import UnitOfWork
+from lms.generals.enums import TeacherType
+
+
+async def read_stats(
+    session: AsyncSession,
+    teacher_product_id: int,
+) -> tuple[int, int, int] | None:
+    row = (
+        await session.execute(
+            select(
+                TeacherProductStats.actual_students,
+                TeacherProductStats.total_students,
+                TeacherProductStats.removal_students,
+            ).where(TeacherProductStats.teacher_product_id == teacher_product_id)
+        )
+    ).one_or_none()
+    return None if row is None else tuple(row)
+
+
+def test_stats_change_add():
+    assert ASSIGNED + REMOVED == StatsChange(actual=0, total=1, removal=1)
+
+
+async def test_apply_merges_changes(
+    uow: UnitOfWork,
+    session: AsyncSession,
+    create_teacher_product,
+):
+    teacher_product = await create_teacher_product()
+
+    async with uow.start():
+        await uow.teacher_product_stats.apply(
+            [(teacher_product.id, ASSIGNED), (teacher_product.id, ASSIGNED)]
+        )
+        await uow.teacher_product_stats.apply([(teacher_product.id, REMOVED)])
+        await uow.commit()
+
+    assert await read_stats(session, teacher_product.id) == (1, 2, 1)
+
+
+async def test_recalculate_matches_column_properties(
+    uow: UnitOfWork,
+    session: AsyncSession,
+    create_teacher_product,
+    create_teacher_assignment,
+):
+    teacher_product = await create_teacher_product()
+    empty = await create_teacher_product()
+    await create_teacher_assignment(teacher_product=teacher_product)
+    await create_teacher_assignment(
+        teacher_product=teacher_product, removed_at=datetime.now()
+    )
+    await create_teacher_assignment(
+        teacher_product=teacher_product, removed_at=datetime(2020, 1, 1)
+    )
+
+    async with uow.start():
+        await uow.teacher_product_stats.recalculate()
+        await uow.commit()
+
+    expected = (
+        await session.execute(
+            select(
+                TeacherProduct.actual_students,
+                TeacherProduct.total_students,
+                TeacherProduct.removal_students,
+            ).where(TeacherProduct.id == teacher_product.id)
+        )
+    ).one()
+    assert await read_stats(session, teacher_product.id) == tuple(expected) == (1, 3, 1)
+    assert await read_stats(session, empty.id) == (0, 0, 0)
+
+
+async def test_reserve_for_enroll_reads_stats(
+    uow: UnitOfWork,
+    create_product,
+    create_teacher_product,
+):
+    product = await create_product()
+    busy = await create_teacher_product(
+        product=product, type=TeacherType.CURATOR, max_students=10
+    )
+    free = await create_teacher_product(
+        product=product, type=TeacherType.CURATOR, max_students=10
+    )
+
+    async with uow.start():
+        await uow.teacher_product_stats.apply([(busy.id, StatsChange(actual=5))])
+        result = await uow.teacher_product.reserve_for_enroll(
+            product_id=product.id, teacher_type=TeacherType.CURATOR
+        )
+
+    assert result.id == free.id
+
+
+async def test_reserve_for_enroll_skips_reserved_teacher(
+    sessionmaker,
+    create_product,
+    create_teacher_product,
+):
+    product = await create_product()
+    first = await create_teacher_product(
+        product=product, type=TeacherType.CURATOR, average_grade=5
+    )
+    second = await create_teacher_product(
+        product=product, type=TeacherType.CURATOR, average_grade=4
+    )
+
+    first_uow = UnitOfWork(sessionmaker=sessionmaker)
+    second_uow = UnitOfWork(sessionmaker=sessionmaker)
+    async with first_uow.start(), second_uow.start():
+        reserved = await first_uow.teacher_product.reserve_for_enroll(
+            product_id=product.id, teacher_type=TeacherType.CURATOR
+        )
+        concurrent = await second_uow.teacher_product.reserve_for_enroll(
+            product_id=product.id, teacher_type=TeacherType.CURATOR
+        )
+
+    assert reserved.id == first.id
+    assert concurrent.id == second.id
+
+
+async def test_reconcile_active_students(
+    uow: UnitOfWork,
+    session: AsyncSession,
+    create_teacher_product,
+    create_student_product,
+):
+    teacher_product = await create_teacher_product(active_students=5)
+    await create_student_product(teacher_product=teacher_product, expulsion_at=None)
+    await create_student_product(
+        teacher_product=teacher_product, expulsion_at=datetime.now()
+    )
+
+    async with uow.start():
+        fixed = await uow.teacher_product.reconcile_active_students()
+        await uow.commit()
+
+    assert fixed == 1
+    await session.refresh(teacher_product)
+    assert teacher_product.active_students == 1
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from lms.generals.models.distribution import (
+    CreateDistributionAssignmentModel,
+    DistributionParams,
+)
+from lms.utils.distribution.models import (
+    Distribution,
+    DistributionReviewer,
+    StudentHomework,
+)
+
+
+def make_reviewer(id_: int, min_: int, desired: int, max_: int) -> DistributionReviewer:
+    return DistributionReviewer(
+        id=id_,
+        subject_id=1,
+        first_name=f"First{id_}",
+        last_name=f"Last{id_}",
+        email=f"reviewer{id_}@example.com",
+        desired=desired,
+        max_=max_,
+        min_=min_,
+        abs_max=max_,
+        is_active=True,
+    )
+
+
+def make_homeworks(count: int) -> list[StudentHomework]:
+    return [
+        StudentHomework(
+            student_name=f"Student {i}",
+            student_vk_id=i,
+            student_soho_id=i,
+            submission_url=f"https://example.com/{i}",
+            homework_id=1,
+        )
+        for i in range(count)
+    ]
+
+
+def make_distribution(
+    homeworks_count: int,
+    reviewers: list[DistributionReviewer],
+    seed: int | None = None,
+) -> Distribution:
+    return Distribution(
+        created_at=datetime(2024, 1, 1),
+        params=DistributionParams(name="Test", product_ids=[1], homeworks=[]),
+        homeworks=[],
+        reviewers=reviewers,
+        filtered_homeworks=make_homeworks(homeworks_count),
+        error_homeworks=[],
+        seed=seed,
+    )
+
+
+def make_assignment(
+    reviewer_id: int | None,
+    soho_id: int,
+) -> CreateDistributionAssignmentModel:
+    return CreateDistributionAssignmentModel(
+        reviewer_id=reviewer_id,
+        homework_id=1,
+        student_homework_id=None,
+        student_soho_id=soho_id,
+        student_vk_id=soho_id,
+        submission_url=f"https://example.com/{soho_id}",
+    )